@@ -0,0 +1,19 @@
+# Generated by Django 5.1.2 on 2026-10-19 04:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0003_alter_companymember_role'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(fields=['-created_at', '-id'], name='company_created_id'),
+        ),
+    ]
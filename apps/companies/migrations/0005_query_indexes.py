@@ -0,0 +1,19 @@
+# Generated by Django 5.1.2 on 2026-10-19 05:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('companies', '0004_company_company_created_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='companymember',
+            index=models.Index(fields=['company', 'role'], name='member_company_role'),
+        ),
+    ]
@@ -25,6 +25,9 @@ class Company(TimeStampedModel):
     )
     class Meta:
         verbose_name_plural = "Companies"
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='company_created_id'),
+        ]
         
 
 class CompanyInvitation(TimeStampedModel):
@@ -121,6 +124,9 @@ class CompanyMember(TimeStampedModel):
 
     class Meta:
         unique_together = ('user', 'company') 
+        indexes = [
+            models.Index(fields=['company', 'role'], name='member_company_role'),
+        ]
 
     def __str__(self):
         return f"{self.user} - {self.company} ({self.role})"    
\ No newline at end of file
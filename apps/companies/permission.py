@@ -1,14 +1,15 @@
 from rest_framework import permissions
 
-from .models import Company, CompanyMember
+from .models import Company
+from .utils import is_company_member, is_company_owner
 
 
 class IsOwner(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in permissions.SAFE_METHODS:
-            return obj.visibility == Company.Visibility.VISIBLE or obj.owner == request.user
+            return obj.visibility == Company.Visibility.VISIBLE or obj.owner_id == request.user.id
         
-        return obj.owner == request.user
+        return obj.owner_id == request.user.id
     
     
 class IsOwnerOfCompany(permissions.BasePermission):
@@ -16,7 +17,7 @@ class IsOwnerOfCompany(permissions.BasePermission):
         if not request.data:
             try:
                 invitation = view.get_object()
-                return invitation.company.owner == request.user
+                return is_company_owner(request.user, invitation.company_id, request)
             except Exception:
                 return False
 
@@ -24,21 +25,11 @@ class IsOwnerOfCompany(permissions.BasePermission):
         if not company_id:
             return False
         
-        try:
-            company = Company.objects.get(id=company_id)
-            return company.owner == request.user
-        except Company.DoesNotExist:
-            return False
+        return is_company_owner(request.user, company_id, request)
     
     
 class IsMemberOfCompany(permissions.BasePermission):
     def has_permission(self, request, view):
         company_id = request.data.get('company')
-        
-        try:
-            return CompanyMember.objects.filter(
-                user=request.user,
-                company=company_id
-            ).exists()
-        except CompanyMember.DoesNotExist:
-            return False
\ No newline at end of file
+
+        return is_company_member(request.user, company_id, request)
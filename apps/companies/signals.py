@@ -3,7 +3,8 @@ import logging
 from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import Company
+from .models import Company, CompanyMember
+from .utils import invalidate_company_info, invalidate_member_role
 
 logger = logging.getLogger("company_change")
 
@@ -18,4 +19,16 @@ def log_company_save(sender, instance, created, **kwargs):
 
 @receiver(post_delete, sender=Company)
 def log_company_delete(sender, instance, **kwargs):
-    logger.info(f"Company deleted: {instance.name}, owned by {instance.owner.username}")
\ No newline at end of file
+    logger.info(f"Company deleted: {instance.name}, owned by {instance.owner.username}")
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+def invalidate_company_cache(sender, instance, **kwargs):
+    invalidate_company_info(instance.id)
+
+
+@receiver(post_save, sender=CompanyMember)
+@receiver(post_delete, sender=CompanyMember)
+def invalidate_member_role_cache(sender, instance, **kwargs):
+    invalidate_member_role(instance.user_id, instance.company_id)
@@ -1,8 +1,13 @@
+from types import SimpleNamespace
+
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
 from rest_framework import status
 from rest_framework.test import APITestCase
 
 from apps.companies.models import Company, CompanyInvitation, CompanyMember, CompanyRequest
+from apps.companies.utils import get_company_info, get_member_role
 
 User = get_user_model()
 
@@ -692,4 +697,71 @@ class CompanyMemberViewSetTests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         print(response.data)
         self.assertEqual(list(response.data), [])
-        
\ No newline at end of file
+
+
+class CompanyAccessCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.owner = User.objects.create_user(
+            username="owner",
+            password="1Qaz_2wsx_3edc",
+            email="owner@example.com"
+        )
+        self.member = User.objects.create_user(
+            username="member",
+            password="1Qaz_2wsx_3edc",
+            email="member@example.com"
+        )
+        self.company = Company.objects.create(
+            name="Test company",
+            description="Test description",
+            owner=self.owner
+        )
+        self.membership = CompanyMember.objects.create(
+            user=self.member,
+            company=self.company,
+            role=CompanyMember.Role.MEMBER
+        )
+
+    def test_role_is_cached(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(get_member_role(self.member, self.company.id), CompanyMember.Role.MEMBER)
+        with self.assertNumQueries(0):
+            self.assertEqual(get_member_role(self.member, str(self.company.id)), CompanyMember.Role.MEMBER)
+
+    def test_request_memo(self):
+        request = SimpleNamespace()
+        get_member_role(self.member, self.company.id, request)
+        cache.clear()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_member_role(self.member, self.company.id, request), CompanyMember.Role.MEMBER)
+
+    def test_non_member_is_cached(self):
+        get_member_role(self.owner, self.company.id)
+
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_member_role(self.owner, self.company.id))
+
+    def test_role_change_invalidates_cache(self):
+        get_member_role(self.member, self.company.id)
+
+        self.membership.role = CompanyMember.Role.ADMIN
+        self.membership.save()
+        self.assertEqual(get_member_role(self.member, self.company.id), CompanyMember.Role.ADMIN)
+
+        self.membership.delete()
+        self.assertIsNone(get_member_role(self.member, self.company.id))
+
+    def test_company_change_invalidates_cache(self):
+        self.assertEqual(get_company_info(self.company.id)['visibility'], Company.Visibility.VISIBLE)
+
+        self.company.visibility = Company.Visibility.HIDDEN
+        self.company.save()
+        self.assertEqual(get_company_info(self.company.id)['visibility'], Company.Visibility.HIDDEN)
+
+        company_id = self.company.id
+        self.company.delete()
+        self.assertIsNone(get_company_info(company_id))
+        self.assertIsNone(get_member_role(self.member, company_id))
@@ -0,0 +1,105 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from tools.metrics import record_cache_lookup
+
+from .models import Company, CompanyMember
+
+ADMIN_ROLES = (CompanyMember.Role.OWNER, CompanyMember.Role.ADMIN)
+NOT_MEMBER = ''
+
+
+def _to_id(value) -> int | None:
+    if isinstance(value, Company):
+        return value.id
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _role_cache_key(user_id: int, company_id: int) -> str:
+    return f'company_role:{company_id}:{user_id}'
+
+
+def _company_cache_key(company_id: int) -> str:
+    return f'company_info:{company_id}'
+
+
+def _request_memo(request) -> dict:
+    if request is None:
+        return {}
+    memo = getattr(request, '_company_access_memo', None)
+    if memo is None:
+        memo = {}
+        request._company_access_memo = memo
+    return memo
+
+
+def get_company_info(company_id, request=None) -> dict | None:
+    company_id = _to_id(company_id)
+    if company_id is None:
+        return None
+
+    memo = _request_memo(request)
+    key = _company_cache_key(company_id)
+    if key in memo:
+        return memo[key]
+
+    company_info = cache.get(key)
+    record_cache_lookup('company_info', company_info is not None)
+    if company_info is None:
+        company_info = Company.objects.filter(id=company_id).values('owner_id', 'visibility').first() or {}
+        cache.set(key, company_info, settings.COMPANY_ACCESS_CACHE_TIMEOUT)
+
+    memo[key] = company_info or None
+    return memo[key]
+
+
+def get_member_role(user, company_id, request=None) -> str | None:
+    company_id = _to_id(company_id)
+    if company_id is None or not user.is_authenticated:
+        return None
+
+    memo = _request_memo(request)
+    key = _role_cache_key(user.id, company_id)
+    if key in memo:
+        return memo[key]
+
+    role = cache.get(key)
+    record_cache_lookup('member_role', role is not None)
+    if role is None:
+        role = CompanyMember.objects.filter(
+            user_id=user.id, company_id=company_id
+        ).values_list('role', flat=True).first() or NOT_MEMBER
+        cache.set(key, role, settings.COMPANY_ACCESS_CACHE_TIMEOUT)
+
+    memo[key] = role or None
+    return memo[key]
+
+
+def is_company_member(user, company_id, request=None) -> bool:
+    return get_member_role(user, company_id, request) is not None
+
+
+def is_company_admin_or_owner(user, company_id, request=None) -> bool:
+    return get_member_role(user, company_id, request) in ADMIN_ROLES
+
+
+def is_company_owner(user, company_id, request=None) -> bool:
+    company_info = get_company_info(company_id, request)
+    return company_info is not None and company_info['owner_id'] == user.id
+
+
+def _invalidate(keys: list) -> None:
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def invalidate_member_role(user_id: int, company_id: int) -> None:
+    _invalidate([_role_cache_key(user_id, company_id)])
+
+
+def invalidate_company_info(company_id: int) -> None:
+    _invalidate([_company_cache_key(company_id)])
@@ -1,4 +1,4 @@
-from django.db.models import Subquery
+from django.db.models import OuterRef, Subquery
 from django.shortcuts import get_object_or_404
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
@@ -11,6 +11,7 @@ from apps.quizzes.models import QuizResult
 from ..models import Company, CompanyMember
 from ..permission import IsMemberOfCompany, IsOwnerOfCompany
 from ..serializers import CompanyMemberSerializer, MemberLastQuizSerializer
+from ..utils import ADMIN_ROLES, get_company_info, get_member_role
 
 
 class CompanyMemberViewSet(viewsets.ModelViewSet):
@@ -32,13 +33,16 @@ class CompanyMemberViewSet(viewsets.ModelViewSet):
     def leave_company(self, request):
         company_id = request.data.get('company')
         
-        company = get_object_or_404(Company, id=company_id)
-                            
-        if company.owner == request.user:
+        company_info = get_company_info(company_id, request)
+
+        if company_info is None:
+            return Response({"detail": "Company not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        if company_info['owner_id'] == request.user.id:
             return Response({"detail": "Owner cannot leave the company."}, status=status.HTTP_403_FORBIDDEN)       
 
         try:
-            membership = CompanyMember.objects.get(user=request.user, company=company_id)
+            membership = CompanyMember.objects.get(user=request.user, company_id=company_id)
             membership.delete()
             return Response({"detail": "You have successfully left the company."}, status=status.HTTP_200_OK)
         except CompanyMember.DoesNotExist:
@@ -52,9 +56,12 @@ class CompanyMemberViewSet(viewsets.ModelViewSet):
         if not company_id or not user_id:
             return Response({"detail": "Company ID and User ID are required."}, status=status.HTTP_400_BAD_REQUEST)
         
-        company = get_object_or_404(Company, id=company_id)
+        company_info = get_company_info(company_id, request)
 
-        if company.owner.id == user_id:
+        if company_info is None:
+            return Response({"detail": "Company not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        if company_info['owner_id'] == user_id:
             return Response({"detail": "You cannot kick the owner of the company."}, status=status.HTTP_403_FORBIDDEN)
 
         membership = CompanyMember.objects.filter(user=user_id, company=company_id).first()
@@ -108,23 +115,22 @@ class CompanyMemberViewSet(viewsets.ModelViewSet):
         if not company_id:
             return Response({"detail": "Company ID is required."}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            company = Company.objects.get(id=company_id)
+        company_info = get_company_info(company_id, request)
 
-            if company.visibility != Company.Visibility.VISIBLE:
-                is_owner_or_member = CompanyMember.objects.filter(company=company, user=request.user).exists()
-                if not is_owner_or_member and company.owner != request.user:
-                    raise PermissionDenied()
+        if company_info is None:
+            return Response({"detail": "Company not found."}, status=status.HTTP_404_NOT_FOUND)
 
-            admins = CompanyMember.objects.filter(company_id=company_id, role=CompanyMember.Role.ADMIN)
+        if company_info['visibility'] != Company.Visibility.VISIBLE:
+            is_owner_or_member = get_member_role(request.user, company_id, request) is not None
+            if not is_owner_or_member and company_info['owner_id'] != request.user.id:
+                raise PermissionDenied()
 
-            if not admins.exists():
-                return Response([], status=status.HTTP_200_OK)
+        admins = CompanyMember.objects.filter(
+            company_id=company_id, role=CompanyMember.Role.ADMIN
+        ).select_related('user')
 
-            serializer = CompanyMemberSerializer(admins, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
-        except Company.DoesNotExist:
-            return Response({"detail": "Company not found."}, status=status.HTTP_404_NOT_FOUND)
+        serializer = CompanyMemberSerializer(admins, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
 
     @action(detail=False, methods=['get'], url_path='members')
     def list_members(self, request):
@@ -134,31 +140,23 @@ class CompanyMemberViewSet(viewsets.ModelViewSet):
         if not company_id:
             return Response({"detail": "Company ID is required."}, status=status.HTTP_400_BAD_REQUEST)
 
-        member_info = CompanyMember.objects.filter(
-            user=user, company_id=company_id
-        ).select_related('company').values('company__visibility', 'role').first()
+        role = get_member_role(user, company_id, request)
 
-        if member_info is None:
+        if role is None:
             return Response([], status=status.HTTP_200_OK)
 
-        visibility = member_info .get('company__visibility')
-        role = member_info .get('role')
-
-        if visibility != Company.Visibility.VISIBLE and not role:
-            raise PermissionDenied()
-
-        if role == CompanyMember.Role.OWNER or role == CompanyMember.Role.ADMIN:
+        if role in ADMIN_ROLES:
             quiz_results = QuizResult.objects.filter(
-                quiz__company=company_id).order_by('user', '-created_at').distinct('user')
+                quiz__company=company_id, user=OuterRef('user')).order_by('-created_at')
 
-            members = CompanyMember.objects.filter(company=company_id).annotate(
+            members = CompanyMember.objects.filter(company=company_id).select_related('user').annotate(
                 last_quiz=Subquery(quiz_results.values('created_at')[:1])
             )
 
             serializer = MemberLastQuizSerializer(members, many=True)
             return Response(serializer.data, status=status.HTTP_200_OK)
         else:
-            members = CompanyMember.objects.filter(company=company_id)
+            members = CompanyMember.objects.filter(company=company_id).select_related('user')
             serializer = CompanyMemberSerializer(members, many=True)
             return Response(serializer.data, status=status.HTTP_200_OK)
 
@@ -177,13 +175,8 @@ class CompanyMemberViewSet(viewsets.ModelViewSet):
         if not company_id:
             return Response({"detail": "Company ID is required."}, status=status.HTTP_400_BAD_REQUEST)
 
-        is_member = CompanyMember.objects.filter(user=request.user, company=company_id).exists()
-        if not is_member:
-            return Response({"role": None}, status=status.HTTP_200_OK)
-        
-        member_role = CompanyMember.objects.filter(
-            user=request.user, company=company_id).values_list('role', flat=True).first()
-        
+        member_role = get_member_role(request.user, company_id, request)
+
         return Response({"role": member_role}, status=status.HTTP_200_OK)
     
     def list(self, request, *args, **kwargs):
@@ -1,17 +1,18 @@
 from django.db.models import Q
 from rest_framework import viewsets
 from rest_framework.decorators import action
-from rest_framework.pagination import PageNumberPagination
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
+from tools.pagination import CreatedAtCursorPagination
+
 from ..models import Company, CompanyMember
 from ..permission import IsOwner
 from ..serializers import CompanyListSerializer, CompanyNamesSerializer, CompanySerializer
 
 
 class CompanyViewSet(viewsets.ModelViewSet):
-    pagination_class = PageNumberPagination
+    pagination_class = CreatedAtCursorPagination
     permission_classes = [IsAuthenticated, IsOwner] 
     
     def get_serializer_class(self):       
@@ -36,7 +37,7 @@ class CompanyViewSet(viewsets.ModelViewSet):
             Q(owner=user) | 
             Q(visibility=Company.Visibility.VISIBLE) | 
             Q(id__in=company_ids)
-        )
+        ).select_related('owner')
 
         return companies    
     
@@ -15,7 +15,9 @@ class CompanyInvitationViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
-        return CompanyInvitation.objects.filter(sender=user)
+        return CompanyInvitation.objects.filter(sender=user).select_related(
+            'sender', 'receiver', 'company'
+        ).order_by('id')
 
     @action(detail=True, methods=['patch'], url_path='accept')
     def accept_invitation(self, request, *args, **kwargs):
@@ -86,7 +88,9 @@ class CompanyInvitationViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'], url_path='user-invitations')
     def list_user_invitations(self, request, *args, **kwargs):
-        invitations = CompanyInvitation.objects.filter(receiver=request.user)
+        invitations = CompanyInvitation.objects.filter(receiver=request.user).select_related(
+            'sender', 'receiver', 'company'
+        ).order_by('id')
         return Response(CompanyInvitationSerializer(invitations, many=True).data)
     
     def destroy(self, request, *args, **kwargs):
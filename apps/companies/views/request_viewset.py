@@ -15,7 +15,9 @@ class CompanyRequestViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         user = self.request.user
-        return CompanyRequest.objects.filter(receiver=user)
+        return CompanyRequest.objects.filter(receiver=user).select_related(
+            'sender', 'receiver', 'company'
+        ).order_by('id')
 
     @action(detail=True, methods=['patch'], url_path='approve', permission_classes=[IsOwnerOfCompany])
     def approve_request(self, request, *args, **kwargs):
@@ -69,7 +71,9 @@ class CompanyRequestViewSet(viewsets.ModelViewSet):
 
     @action(detail=False, methods=['get'], url_path='user-requests')
     def list_user_requests(self, request, *args, **kwargs):
-        requests = CompanyRequest.objects.filter(sender=request.user)
+        requests = CompanyRequest.objects.filter(sender=request.user).select_related(
+            'sender', 'receiver', 'company'
+        ).order_by('id')
         return Response(CompanyRequestSerializer(requests, many=True).data)
     
     def destroy(self, request, *args, **kwargs):
@@ -0,0 +1,114 @@
+import math
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import lru_cache
+
+import redis
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+
+probe_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='health-probe')
+readiness_lock = threading.Lock()
+cached_readiness = {'expires_at': 0.0, 'result': None}
+
+
+@lru_cache
+def get_broker_client(url: str) -> redis.Redis:
+    timeout = settings.HEALTH_CHECK_TIMEOUT
+    return redis.Redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+
+
+def get_probe_connection():
+    default_connection = connections['default']
+    settings_dict = {
+        **default_connection.settings_dict,
+        'OPTIONS': {
+            **default_connection.settings_dict['OPTIONS'],
+            'connect_timeout': max(1, math.ceil(settings.HEALTH_CHECK_TIMEOUT)),
+        },
+    }
+    return default_connection.__class__(settings_dict, alias='health-check')
+
+
+def probe_database():
+    probe_connection = get_probe_connection()
+    try:
+        with probe_connection.cursor() as cursor:
+            cursor.execute('SET statement_timeout = %s', [int(settings.HEALTH_CHECK_TIMEOUT * 1000)])
+            cursor.execute('SELECT 1')
+    finally:
+        probe_connection.close()
+
+
+def probe_cache():
+    key = f'health-check:{uuid.uuid4().hex}'
+    cache.set(key, 'ok', timeout=settings.HEALTH_CHECK_CACHE_SECONDS + 1)
+    if cache.get(key) != 'ok':
+        raise RuntimeError('Cache did not return the value it stored.')
+    cache.delete(key)
+
+
+def probe_channel_layer():
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        raise RuntimeError('No channel layer is configured.')
+    async_to_sync(channel_layer.group_send)('health-check', {'type': 'health.check'})
+
+
+def probe_broker():
+    get_broker_client(settings.CELERY_BROKER_URL).ping()
+
+
+PROBES = {
+    'database': probe_database,
+    'cache': probe_cache,
+    'channel_layer': probe_channel_layer,
+    'broker': probe_broker,
+}
+
+
+def timed_probe(probe) -> dict:
+    started_at = time.perf_counter()
+    try:
+        probe()
+    except Exception as exc:
+        return {
+            'status': 'error',
+            'latency_ms': round((time.perf_counter() - started_at) * 1000, 1),
+            'error': f'{type(exc).__name__}: {exc}',
+        }
+    return {'status': 'ok', 'latency_ms': round((time.perf_counter() - started_at) * 1000, 1)}
+
+
+def run_probes(names: list[str]) -> dict:
+    futures = {name: probe_executor.submit(timed_probe, PROBES[name]) for name in names}
+    wait(futures.values(), timeout=settings.HEALTH_CHECK_TIMEOUT)
+
+    checks = {}
+    for name, future in futures.items():
+        if future.done():
+            checks[name] = future.result()
+        else:
+            checks[name] = {'status': 'timeout', 'latency_ms': settings.HEALTH_CHECK_TIMEOUT * 1000}
+
+    is_ready = all(check['status'] == 'ok' for check in checks.values())
+    return {'status': 'ok' if is_ready else 'unavailable', 'checks': checks}
+
+
+def check_readiness() -> dict:
+    with readiness_lock:
+        if cached_readiness['result'] is None or cached_readiness['expires_at'] <= time.monotonic():
+            cached_readiness['result'] = run_probes(settings.HEALTH_CHECK_PROBES)
+            cached_readiness['expires_at'] = time.monotonic() + settings.HEALTH_CHECK_CACHE_SECONDS
+
+        return cached_readiness['result']
+
+
+def reset_readiness_cache() -> None:
+    with readiness_lock:
+        cached_readiness['result'] = None
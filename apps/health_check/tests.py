@@ -1,2 +1,72 @@
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+from .probes import get_probe_connection, reset_readiness_cache
+
+
+@override_settings(METRICS_TOKEN='secret')
+class MetricsEndpointTestCase(TestCase):
+    def test_metrics_are_exposed(self):
+        self.client.get('/')
+
+        response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(
+            b'http_request_duration_seconds_count{method="GET",status="200",view="health_check"}', response.content
+        )
+        self.assertIn(b'http_request_db_queries_count{view="health_check"}', response.content)
+
+    def test_metrics_token_is_required(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 401)
+        self.assertEqual(self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong').status_code, 401)
+
+    @override_settings(METRICS_TOKEN='')
+    def test_metrics_are_disabled_without_token(self):
+        self.assertEqual(self.client.get('/metrics').status_code, 404)
+
+
+@override_settings(HEALTH_CHECK_PROBES=['database', 'cache', 'channel_layer'])
+class ReadinessTestCase(TestCase):
+    def setUp(self):
+        reset_readiness_cache()
+        self.addCleanup(reset_readiness_cache)
+
+    def test_liveness_does_not_probe_dependencies(self):
+        response = self.client.get('/health/live')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'status': 'ok'})
+
+    def test_ready_reports_each_dependency_latency(self):
+        response = self.client.get('/health/ready')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.json()['checks']), {'database', 'cache', 'channel_layer'})
+        for check in response.json()['checks'].values():
+            self.assertEqual(check['status'], 'ok')
+            self.assertGreaterEqual(check['latency_ms'], 0)
+
+    @override_settings(HEALTH_CHECK_PROBES=['cache', 'broker'], CELERY_BROKER_URL='redis://127.0.0.1:1/0')
+    def test_unreachable_dependency_fails_readiness(self):
+        response = self.client.get('/health/ready')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json()['status'], 'unavailable')
+        self.assertEqual(response.json()['checks']['cache']['status'], 'ok')
+        self.assertIn(response.json()['checks']['broker']['status'], ('error', 'timeout'))
+
+    def test_probe_result_is_cached(self):
+        self.assertEqual(self.client.get('/health/ready').status_code, 200)
+
+        with self.settings(HEALTH_CHECK_PROBES=['broker'], CELERY_BROKER_URL='redis://127.0.0.1:1/0'):
+            response = self.client.get('/health/ready')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('broker', response.json()['checks'])
+
+    @override_settings(HEALTH_CHECK_TIMEOUT=2.5)
+    def test_database_probe_uses_connect_timeout(self):
+        probe_connection = get_probe_connection()
+
+        self.assertEqual(probe_connection.settings_dict['OPTIONS']['connect_timeout'], 3)
+        self.assertEqual(probe_connection.alias, 'health-check')
@@ -3,5 +3,8 @@ from django.urls import path
 from . import views
 
 urlpatterns = [
-    path('', views.health_check, name='health_check')
+    path('', views.health_check, name='health_check'),
+    path('health/live', views.liveness, name='health_live'),
+    path('health/ready', views.readiness, name='health_ready'),
+    path('metrics', views.metrics, name='metrics'),
 ]
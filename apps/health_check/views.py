@@ -1,4 +1,10 @@
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from prometheus_client import CONTENT_TYPE_LATEST
+
+from tools.metrics import render_metrics
+
+from .probes import check_readiness
 
 
 def health_check(request):
@@ -7,3 +13,22 @@ def health_check(request):
         "detail": "ok",
         "result": "working"
     })
+
+
+def liveness(request):
+    return JsonResponse({"status": "ok"})
+
+
+def readiness(request):
+    result = check_readiness()
+    return JsonResponse(result, status=200 if result['status'] == 'ok' else 503)
+
+
+def metrics(request):
+    if not settings.METRICS_TOKEN:
+        return JsonResponse({"detail": "Metrics are disabled until METRICS_TOKEN is set."}, status=404)
+
+    if request.headers.get('Authorization') != f'Bearer {settings.METRICS_TOKEN}':
+        return JsonResponse({"detail": "Invalid metrics token."}, status=401)
+
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE_LATEST)
@@ -5,6 +5,8 @@ from channels.generic.websocket import WebsocketConsumer
 from django.contrib.auth.models import AnonymousUser
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
+from tools.metrics import websocket_connections
+
 
 class NotificationConsumer(WebsocketConsumer):
     def connect(self):
@@ -33,6 +35,7 @@ class NotificationConsumer(WebsocketConsumer):
             self.channel_name
         )
         self.accept()
+        websocket_connections.labels(consumer='notifications').inc()
 
     def disconnect(self, close_code):
 
@@ -41,6 +44,7 @@ class NotificationConsumer(WebsocketConsumer):
                 self.group_name,
                 self.channel_name
             )
+            websocket_connections.labels(consumer='notifications').dec()
             
     def new_notification(self, notification):
         notification_data = notification["notification"]
@@ -15,6 +15,29 @@ class Notification(TimeStampedModel):
         on_delete=models.CASCADE,
         related_name='notifications'
     )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='notification_status_created'),
+            models.Index(fields=['user', '-created_at', '-id'], name='notification_user_created_id'),
+            models.Index(fields=['user', 'status'], name='notification_user_status'),
+        ]
     
     def __str__(self):
-        return f"Notification for {self.user.username}: {self.text[:20]}"
\ No newline at end of file
+        return f"Notification for {self.user.username}: {self.text[:20]}"
+
+
+class NotificationArchive(models.Model):
+    text = models.TextField()
+    status = models.CharField(max_length=10, choices=Notification.Status.choices)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='archived_notifications'
+    )
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"Archived notification for {self.user.username}: {self.text[:20]}"
@@ -0,0 +1,71 @@
+import logging
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.utils.timezone import now
+
+from .models import Notification, NotificationArchive
+
+logger = logging.getLogger("notification-retention")
+
+
+@shared_task
+def archive_read_notifications():
+    batch_size = settings.NOTIFICATION_RETENTION_BATCH_SIZE
+    cutoff = now() - timedelta(days=settings.NOTIFICATION_RETENTION_DAYS)
+
+    expired_notifications = Notification.objects.filter(
+        status=Notification.Status.READ,
+        created_at__lt=cutoff
+    ).order_by('id')
+
+    moved_count = 0
+    while True:
+        with transaction.atomic():
+            batch = list(expired_notifications.select_for_update(skip_locked=True)[:batch_size])
+
+            if not batch:
+                break
+
+            if settings.NOTIFICATION_ARCHIVE_ENABLED:
+                NotificationArchive.objects.bulk_create([
+                    NotificationArchive(
+                        text=notification.text,
+                        status=notification.status,
+                        user_id=notification.user_id,
+                        created_at=notification.created_at,
+                        updated_at=notification.updated_at
+                    )
+                    for notification in batch
+                ])
+
+            Notification.objects.filter(id__in=[notification.id for notification in batch]).delete()
+
+        moved_count += len(batch)
+
+    purged_count = purge_notification_archive(batch_size)
+
+    logger.info(f"Notification retention: {moved_count} removed from hot table, {purged_count} purged from archive")
+    return moved_count
+
+
+def purge_notification_archive(batch_size: int) -> int:
+    if not settings.NOTIFICATION_ARCHIVE_RETENTION_DAYS:
+        return 0
+
+    cutoff = now() - timedelta(days=settings.NOTIFICATION_ARCHIVE_RETENTION_DAYS)
+    expired_archive = NotificationArchive.objects.filter(archived_at__lt=cutoff).order_by('id')
+
+    purged_count = 0
+    while True:
+        ids = list(expired_archive.values_list('id', flat=True)[:batch_size])
+
+        if not ids:
+            break
+
+        NotificationArchive.objects.filter(id__in=ids).delete()
+        purged_count += len(ids)
+
+    return purged_count
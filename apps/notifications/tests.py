@@ -1,2 +1,142 @@
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from prometheus_client import REGISTRY
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from ..companies.models import Company, CompanyMember
+from .models import Notification, NotificationArchive
+from .tasks import archive_read_notifications
+from .utils import send_notifications
+
+User = get_user_model()
+
+
+class NotificationRetentionTestCase(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="user",
+            password="1Q_az_2wsx_3edc",
+            email="user@example.com"
+        )
+        old_date = timezone.now() - timedelta(days=100)
+
+        self.old_read = [
+            Notification.objects.create(user=self.user, text=f"old read {i}", status=Notification.Status.READ)
+            for i in range(3)
+        ]
+        self.old_unread = Notification.objects.create(user=self.user, text="old unread")
+        self.recent_read = Notification.objects.create(
+            user=self.user, text="recent read", status=Notification.Status.READ
+        )
+
+        Notification.objects.filter(
+            id__in=[notification.id for notification in self.old_read] + [self.old_unread.id]
+        ).update(created_at=old_date)
+
+    @override_settings(NOTIFICATION_RETENTION_DAYS=90, NOTIFICATION_RETENTION_BATCH_SIZE=2)
+    def test_archive_read_notifications(self):
+        moved_count = archive_read_notifications()
+
+        self.assertEqual(moved_count, 3)
+        self.assertEqual(
+            set(Notification.objects.values_list('id', flat=True)),
+            {self.old_unread.id, self.recent_read.id}
+        )
+        self.assertEqual(NotificationArchive.objects.filter(user=self.user).count(), 3)
+        archived = NotificationArchive.objects.get(text="old read 0")
+        self.assertEqual(archived.status, Notification.Status.READ)
+        self.assertLess(archived.created_at, timezone.now() - timedelta(days=90))
+
+    @override_settings(NOTIFICATION_RETENTION_DAYS=90, NOTIFICATION_ARCHIVE_ENABLED=False)
+    def test_drop_read_notifications_without_archive(self):
+        moved_count = archive_read_notifications()
+
+        self.assertEqual(moved_count, 3)
+        self.assertEqual(Notification.objects.count(), 2)
+        self.assertFalse(NotificationArchive.objects.exists())
+
+    @override_settings(NOTIFICATION_ARCHIVE_RETENTION_DAYS=30)
+    def test_purge_expired_archive(self):
+        archived = NotificationArchive.objects.create(
+            user=self.user,
+            text="archived",
+            status=Notification.Status.READ,
+            created_at=timezone.now(),
+            updated_at=timezone.now()
+        )
+        NotificationArchive.objects.filter(id=archived.id).update(archived_at=timezone.now() - timedelta(days=31))
+
+        archive_read_notifications()
+
+        self.assertFalse(NotificationArchive.objects.filter(id=archived.id).exists())
+
+
+class NotificationPaginationTestCase(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="user",
+            password="1Q_az_2wsx_3edc",
+            email="user@example.com"
+        )
+        Notification.objects.bulk_create([
+            Notification(user=self.user, text=f"notification {i}") for i in range(25)
+        ])
+
+    def test_list_notifications_by_cursor(self):
+        self.client.force_authenticate(user=self.user)
+        url = '/api/v1/notifications/?page_size=10'
+        received_ids = []
+
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            self.assertLessEqual(len(response.data['results']), 10)
+            received_ids += [notification['id'] for notification in response.data['results']]
+            url = response.data['next']
+
+        expected_ids = list(
+            Notification.objects.filter(user=self.user).order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(received_ids, expected_ids)
+
+
+class NotificationFanoutMetricsTestCase(TestCase):
+
+    def setUp(self):
+        self.owner = User.objects.create_user(
+            username="owner",
+            password="1Q_az_2wsx_3edc",
+            email="owner@example.com"
+        )
+        self.company = Company.objects.create(name="Test", description="Test description", owner=self.owner)
+        CompanyMember.objects.get_or_create(user=self.owner, company=self.company)
+
+    def get_sample(self, name):
+        return REGISTRY.get_sample_value(name) or 0
+
+    def test_fanout_duration_is_observed(self):
+        before = self.get_sample('notification_fanout_duration_seconds_count')
+
+        send_notifications(self.company.id, "Quiz", self.company.name)
+
+        self.assertEqual(self.get_sample('notification_fanout_duration_seconds_count'), before + 1)
+        self.assertEqual(Notification.objects.filter(user=self.owner).count(), 1)
+
+    def test_fanout_failures_are_counted(self):
+        before = self.get_sample('notification_fanout_failures_total')
+        channel_layer = mock.Mock()
+        channel_layer.group_send = mock.AsyncMock(side_effect=RuntimeError("layer is down"))
+
+        with mock.patch('apps.notifications.utils.get_channel_layer', return_value=channel_layer):
+            send_notifications(self.company.id, "Quiz", self.company.name)
+
+        self.assertEqual(self.get_sample('notification_fanout_failures_total'), before + 1)
+        self.assertFalse(Notification.objects.filter(user=self.owner).exists())
@@ -3,6 +3,8 @@ import logging
 from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
 
+from tools.metrics import notification_fanout_duration, notification_fanout_failures
+
 from ..companies.models import CompanyMember
 from .models import Notification
 from .serializers import NotificationSerializer
@@ -10,6 +12,7 @@ from .serializers import NotificationSerializer
 logger = logging.getLogger("create-notification")
 
 
+@notification_fanout_duration.time()
 def send_notifications(company_id: int, quiz_title: str, quiz_company_name: str) -> None:
     members = CompanyMember.objects.filter(company_id=company_id).select_related('user').only('user')
     channel_layer = get_channel_layer()
@@ -38,6 +41,7 @@ def send_notifications(company_id: int, quiz_title: str, quiz_company_name: str)
             notifications_to_save.append(notification)
 
         except Exception as e:
+            notification_fanout_failures.inc()
             logger.error(f"Error sending notification for user {member.user}: {e}")
 
     Notification.objects.bulk_create(notifications_to_save)
\ No newline at end of file
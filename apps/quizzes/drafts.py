@@ -0,0 +1,88 @@
+from django.core.cache import cache
+
+from .models import QuizVersion, UserQuizSession
+from .sessions import session_time_limit
+from .versioning import get_quiz_version, get_session_questions
+
+
+def draft_session_key(session_id: int) -> str:
+    return f'quiz_draft:{session_id}'
+
+
+def draft_answer_key(session_id: int, question_id: int) -> str:
+    return f'quiz_draft:{session_id}:{question_id}'
+
+
+def remember_draft_session(session_id: int, user_id: int, version: QuizVersion, question_ids: list,
+                           timeout: int) -> dict:
+    draft_session = {'user_id': user_id, 'version_id': version.id, 'question_ids': question_ids, 'timeout': timeout}
+    cache.set(draft_session_key(session_id), draft_session, timeout)
+    return draft_session
+
+
+def get_draft_session(session_id: int, user_id: int) -> dict | None:
+    draft_session = cache.get(draft_session_key(session_id))
+
+    if draft_session is None or 'question_ids' not in draft_session:
+        quiz_session = UserQuizSession.objects.filter(
+            id=session_id, user_id=user_id, status=UserQuizSession.Status.STARTED
+        ).select_related('quiz').only(
+            'id', 'user_id', 'version_id', 'question_sample_size', 'quiz__id', 'quiz__time_limit_minutes'
+        ).first()
+
+        if quiz_session is None:
+            return None
+
+        version = get_quiz_version(quiz_session.version_id) if quiz_session.version_id else None
+        if version is None:
+            return {'user_id': user_id, 'version_id': None, 'question_ids': None}
+
+        questions = get_session_questions(version, quiz_session.id, quiz_session.question_sample_size)
+        timeout = int(session_time_limit(quiz_session.quiz).total_seconds())
+        draft_session = remember_draft_session(
+            quiz_session.id, user_id, version, [question['id'] for question in questions], timeout
+        )
+
+    if draft_session['user_id'] != user_id:
+        return None
+
+    return draft_session
+
+
+def save_draft_answers(session_id: int, draft_session: dict, user_answers: list) -> None:
+    cache.set_many(
+        {draft_answer_key(session_id, answer['id']): answer['correct_answer'] for answer in user_answers},
+        draft_session['timeout']
+    )
+
+
+def get_draft_answers(session_id: int, question_ids: list) -> list:
+    keys = {draft_answer_key(session_id, question_id): question_id for question_id in question_ids}
+    drafts = cache.get_many(keys)
+    return [{'id': keys[key], 'correct_answer': answers} for key, answers in drafts.items()]
+
+
+def get_draft_question_ids(session_id: int, user_id: int | None = None) -> list:
+    draft_session = cache.get(draft_session_key(session_id))
+
+    if draft_session is None or (user_id is not None and draft_session['user_id'] != user_id):
+        return []
+
+    return draft_session.get('question_ids') or []
+
+
+def merge_draft_answers(session_id: int, user_id: int, user_answers: list) -> list:
+    question_ids = get_draft_question_ids(session_id, user_id)
+
+    if not question_ids:
+        return user_answers
+
+    answers = {answer['id']: answer for answer in get_draft_answers(session_id, question_ids)}
+    answers.update({answer['id']: answer for answer in user_answers})
+    return list(answers.values())
+
+
+def clear_drafts(session_id: int) -> None:
+    keys = [draft_session_key(session_id)]
+    keys.extend(draft_answer_key(session_id, question_id) for question_id in get_draft_question_ids(session_id))
+    cache.delete_many(keys)
@@ -0,0 +1,194 @@
+import json
+import logging
+import os
+import socket
+from functools import lru_cache
+
+import redis
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import UserQuizSession
+from .sessions import expire_sessions, session_deadline_expression
+from .utils import grade_submission, persist_graded_submissions
+
+logger = logging.getLogger("quiz-ingestion")
+
+
+@lru_cache
+def get_stream_client() -> redis.Redis:
+    return redis.Redis.from_url(settings.QUIZ_RESULT_STREAM_URL, decode_responses=True)
+
+
+def submission_marker_key(session_id: int) -> str:
+    return f'{settings.QUIZ_RESULT_STREAM}:session:{session_id}'
+
+
+def encode_submission(submission: dict) -> str:
+    return json.dumps(submission, cls=DjangoJSONEncoder)
+
+
+def decode_submission(payload: str) -> dict:
+    submission = json.loads(payload)
+    submission['end_time'] = parse_datetime(submission['end_time'])
+    return submission
+
+
+def enqueue_quiz_submission(user_id: int, session_id: int, user_answers: list,
+                            idempotency_key: str | None = None) -> tuple[dict | None, bool]:
+    end_time = timezone.now()
+    quiz_session = UserQuizSession.objects.filter(
+        id=session_id, user_id=user_id, status=UserQuizSession.Status.STARTED
+    ).annotate(deadline=session_deadline_expression()).only(
+        'id', 'user_id', 'quiz_id', 'version_id', 'question_sample_size', 'start_session_time'
+    ).first()
+
+    client = get_stream_client()
+    marker_key = submission_marker_key(session_id)
+
+    if quiz_session is not None and quiz_session.deadline < end_time and not client.exists(marker_key):
+        expire_sessions([quiz_session.id])
+        return None, False
+
+    if quiz_session is not None and quiz_session.deadline >= end_time:
+        submission = grade_submission(quiz_session, user_answers, end_time, idempotency_key)
+        payload = encode_submission(submission)
+
+        if client.set(marker_key, payload, nx=True, ex=settings.QUIZ_RESULT_SUBMISSION_TTL):
+            try:
+                client.xadd(settings.QUIZ_RESULT_STREAM, {'submission': payload})
+            except redis.RedisError:
+                client.delete(marker_key)
+                raise
+            return decode_submission(payload), True
+
+    previous_payload = client.get(marker_key)
+    if previous_payload and idempotency_key:
+        previous_submission = decode_submission(previous_payload)
+        if previous_submission['user_id'] == user_id and previous_submission['idempotency_key'] == idempotency_key:
+            return previous_submission, False
+
+    return None, False
+
+
+def get_queued_session_ids(session_ids: list) -> set:
+    if not session_ids:
+        return set()
+
+    markers = get_stream_client().mget([submission_marker_key(session_id) for session_id in session_ids])
+    return {session_id for session_id, marker in zip(session_ids, markers) if marker is not None}
+
+
+def ensure_consumer_group(client: redis.Redis) -> None:
+    try:
+        client.xgroup_create(settings.QUIZ_RESULT_STREAM, settings.QUIZ_RESULT_STREAM_GROUP, id='0', mkstream=True)
+    except redis.ResponseError as e:
+        if 'BUSYGROUP' not in str(e):
+            raise
+
+
+def persist_stream_submissions(submissions: dict) -> tuple[dict, set]:
+    try:
+        return persist_graded_submissions(list(submissions.values())), set()
+    except Exception:
+        logger.exception("Persisting a batch of quiz submissions failed, retrying entries one by one")
+
+    persisted = {}
+    failed_entry_ids = set()
+    for entry_id, submission in submissions.items():
+        try:
+            persisted.update(persist_graded_submissions([submission]))
+        except Exception:
+            logger.exception(f"Failed to persist quiz submission {entry_id}, leaving it pending")
+            failed_entry_ids.add(entry_id)
+
+    return persisted, failed_entry_ids
+
+
+def process_stream_entries(client: redis.Redis, entries: list) -> int:
+    submissions = {}
+
+    for entry_id, fields in entries:
+        try:
+            submissions[entry_id] = decode_submission(fields['submission'])
+        except (KeyError, TypeError, ValueError):
+            logger.error(f"Dropping malformed quiz submission {entry_id}")
+
+    persisted, failed_entry_ids = persist_stream_submissions(submissions) if submissions else ({}, set())
+
+    for entry_id, submission in submissions.items():
+        if entry_id not in failed_entry_ids and submission['session_id'] not in persisted:
+            logger.warning(
+                f"Dropping quiz submission for session {submission['session_id']} "
+                f"of user {submission['user_id']}: session is no longer open or the submission was late"
+            )
+
+    entry_ids = [entry_id for entry_id, _ in entries if entry_id not in failed_entry_ids]
+    if entry_ids:
+        client.xack(settings.QUIZ_RESULT_STREAM, settings.QUIZ_RESULT_STREAM_GROUP, *entry_ids)
+        client.xdel(settings.QUIZ_RESULT_STREAM, *entry_ids)
+
+    return len(persisted)
+
+
+def dead_letter_stream_entries(client: redis.Redis, batch_size: int) -> int:
+    pending = client.xpending_range(
+        settings.QUIZ_RESULT_STREAM,
+        settings.QUIZ_RESULT_STREAM_GROUP,
+        min='-',
+        max='+',
+        count=batch_size,
+        idle=settings.QUIZ_RESULT_STREAM_CLAIM_IDLE_MS
+    )
+    exhausted = [entry for entry in pending if entry['times_delivered'] >= settings.QUIZ_RESULT_STREAM_MAX_DELIVERIES]
+
+    for entry in exhausted:
+        entry_id = entry['message_id']
+        for _, fields in client.xrange(settings.QUIZ_RESULT_STREAM, min=entry_id, max=entry_id):
+            client.xadd(settings.QUIZ_RESULT_DEAD_LETTER_STREAM, {**fields, 'entry_id': entry_id})
+        logger.error(
+            f"Moving quiz submission {entry_id} to {settings.QUIZ_RESULT_DEAD_LETTER_STREAM} "
+            f"after {entry['times_delivered']} deliveries"
+        )
+
+    entry_ids = [entry['message_id'] for entry in exhausted]
+    if entry_ids:
+        client.xack(settings.QUIZ_RESULT_STREAM, settings.QUIZ_RESULT_STREAM_GROUP, *entry_ids)
+        client.xdel(settings.QUIZ_RESULT_STREAM, *entry_ids)
+
+    return len(entry_ids)
+
+
+def flush_submission_stream(batch_size: int | None = None, max_batches: int = 20) -> int:
+    if not settings.QUIZ_RESULT_WRITE_BEHIND:
+        return 0
+
+    batch_size = batch_size or settings.QUIZ_RESULT_STREAM_BATCH_SIZE
+    client = get_stream_client()
+    consumer = f'{socket.gethostname()}-{os.getpid()}'
+    ensure_consumer_group(client)
+    dead_letter_stream_entries(client, batch_size)
+
+    _, claimed, *_ = client.xautoclaim(
+        settings.QUIZ_RESULT_STREAM,
+        settings.QUIZ_RESULT_STREAM_GROUP,
+        consumer,
+        min_idle_time=settings.QUIZ_RESULT_STREAM_CLAIM_IDLE_MS,
+        count=batch_size
+    )
+    persisted = process_stream_entries(client, claimed) if claimed else 0
+
+    for _ in range(max_batches):
+        response = client.xreadgroup(
+            settings.QUIZ_RESULT_STREAM_GROUP, consumer, {settings.QUIZ_RESULT_STREAM: '>'}, count=batch_size
+        )
+        entries = response[0][1] if response else []
+
+        if not entries:
+            break
+
+        persisted += process_stream_entries(client, entries)
+
+    return persisted
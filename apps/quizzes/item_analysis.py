@@ -0,0 +1,191 @@
+from dataclasses import dataclass
+
+import numpy as np
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import Question, QuestionStats, QuizAnswer
+
+FETCH_SIZE = 50_000
+ROW_CHUNK_SIZE = 10_000
+IRT_MAX_ITERATIONS = 50
+IRT_TOLERANCE = 1e-4
+IRT_ABILITY_LIMIT = 6.0
+
+
+@dataclass
+class OutcomeMatrix:
+    question_ids: np.ndarray
+    outcomes: np.ndarray
+    answered: np.ndarray
+
+
+@dataclass
+class ItemStatistics:
+    question_ids: np.ndarray
+    attempts: np.ndarray
+    difficulty: np.ndarray
+    discrimination: np.ndarray
+    irt_difficulty: np.ndarray | None = None
+
+
+def load_outcome_matrix(quiz_id: int) -> OutcomeMatrix:
+    table = QuizAnswer._meta.db_table
+    chunks = []
+
+    with transaction.atomic(), connection.chunked_cursor() as cursor:
+        cursor.execute(
+            f'SELECT result_id, question_id, is_correct::int FROM {table} WHERE quiz_id = %s',
+            [quiz_id]
+        )
+        while rows := cursor.fetchmany(FETCH_SIZE):
+            chunks.append(np.array(rows, dtype=np.int64))
+
+    if not chunks:
+        empty = np.zeros((0, 0), dtype=np.float32)
+        return OutcomeMatrix(np.zeros(0, dtype=np.int64), empty, empty.astype(bool))
+
+    data = np.concatenate(chunks)
+    _, rows = np.unique(data[:, 0], return_inverse=True)
+    question_ids, columns = np.unique(data[:, 1], return_inverse=True)
+
+    outcomes = np.zeros((rows.max() + 1, len(question_ids)), dtype=np.float32)
+    answered = np.zeros(outcomes.shape, dtype=bool)
+    outcomes[rows, columns] = data[:, 2]
+    answered[rows, columns] = True
+
+    return OutcomeMatrix(question_ids, outcomes, answered)
+
+
+def classical_statistics(outcomes: np.ndarray, answered: np.ndarray) -> tuple:
+    attempts = answered.sum(axis=0)
+    correct = outcomes.sum(axis=0)
+    difficulty = np.divide(correct, attempts, out=np.full(attempts.shape, np.nan), where=attempts > 0)
+
+    # Corrected item-total (point-biserial) correlation: each item against the
+    # total score without that item, derived from cov(item, total) so the
+    # rest-score matrix is never materialised. Every moment for item j is taken
+    # over the attempts that answered j only, like difficulty, so sampled
+    # sessions do not count unseen items as wrong.
+    n = outcomes.shape[0]
+    totals = outcomes.sum(axis=1, dtype=np.float64)
+    centered_totals = totals - totals.mean() if n else totals
+
+    sum_totals = np.zeros(outcomes.shape[1])
+    sum_squared_totals = np.zeros(outcomes.shape[1])
+    sum_item_totals = np.zeros(outcomes.shape[1])
+    for start in range(0, n, ROW_CHUNK_SIZE):
+        rows = slice(start, start + ROW_CHUNK_SIZE)
+        answered_rows = answered[rows].T.astype(np.float64)
+        sum_totals += answered_rows @ centered_totals[rows]
+        sum_squared_totals += answered_rows @ np.square(centered_totals[rows])
+        sum_item_totals += outcomes[rows].T.astype(np.float64) @ centered_totals[rows]
+
+    item_attempts = np.maximum(attempts, 1)
+    item_means = correct / item_attempts
+    item_var = item_means * (1 - item_means)
+    total_means = sum_totals / item_attempts
+    total_var = sum_squared_totals / item_attempts - np.square(total_means)
+    item_total_cov = sum_item_totals / item_attempts - item_means * total_means
+
+    rest_cov = item_total_cov - item_var
+    rest_var = total_var + item_var - 2 * item_total_cov
+    denominator = np.sqrt(np.maximum(item_var * rest_var, 0))
+    discrimination = np.divide(
+        rest_cov, denominator, out=np.full(rest_cov.shape, np.nan), where=denominator > 1e-12
+    )
+
+    return attempts, difficulty, discrimination
+
+
+def rasch_difficulty(outcomes: np.ndarray, answered: np.ndarray) -> np.ndarray:
+    n_attempts, n_items = outcomes.shape
+    item_attempts = answered.sum(axis=0)
+    person_attempts = answered.sum(axis=1)
+
+    item_p = np.clip(outcomes.sum(axis=0) / np.maximum(item_attempts, 1), 0.01, 0.99)
+    person_p = np.clip(outcomes.sum(axis=1) / np.maximum(person_attempts, 1), 0.01, 0.99)
+    difficulty = -np.log(item_p / (1 - item_p)).astype(np.float32)
+    ability = np.log(person_p / (1 - person_p)).astype(np.float32)
+    difficulty -= difficulty.mean()
+
+    for _ in range(IRT_MAX_ITERATIONS):
+        item_residual = np.zeros(n_items)
+        item_information = np.zeros(n_items)
+
+        for start in range(0, n_attempts, ROW_CHUNK_SIZE):
+            rows = slice(start, start + ROW_CHUNK_SIZE)
+            probability = 1 / (1 + np.exp(difficulty[None, :] - ability[rows, None]))
+            residual = (outcomes[rows] - probability) * answered[rows]
+            information = probability * (1 - probability) * answered[rows]
+
+            ability[rows] += residual.sum(axis=1) / np.maximum(information.sum(axis=1), 1e-6)
+            item_residual += residual.sum(axis=0)
+            item_information += information.sum(axis=0)
+
+        np.clip(ability, -IRT_ABILITY_LIMIT, IRT_ABILITY_LIMIT, out=ability)
+
+        step = (item_residual / np.maximum(item_information, 1e-6)).astype(np.float32)
+        difficulty -= step
+        np.clip(difficulty, -IRT_ABILITY_LIMIT, IRT_ABILITY_LIMIT, out=difficulty)
+        difficulty -= difficulty.mean()
+
+        if np.abs(step).max() < IRT_TOLERANCE:
+            break
+
+    # Joint maximum likelihood overestimates item spread by about n/(n-1).
+    if n_items > 1:
+        difficulty *= (n_items - 1) / n_items
+
+    return difficulty.astype(np.float64)
+
+
+def compute_item_statistics(matrix: OutcomeMatrix, irt: bool = False) -> ItemStatistics:
+    attempts, difficulty, discrimination = classical_statistics(matrix.outcomes, matrix.answered)
+    statistics = ItemStatistics(matrix.question_ids, attempts, difficulty, discrimination)
+
+    if irt and matrix.outcomes.size:
+        statistics.irt_difficulty = rasch_difficulty(matrix.outcomes, matrix.answered)
+
+    return statistics
+
+
+def _to_float(value) -> float | None:
+    return None if np.isnan(value) else round(float(value), 4)
+
+
+def save_item_statistics(statistics: ItemStatistics) -> int:
+    question_ids = set(
+        Question.objects.filter(id__in=statistics.question_ids.tolist()).values_list('id', flat=True)
+    )
+    analyzed_at = timezone.now()
+
+    with transaction.atomic():
+        QuestionStats.objects.bulk_create(
+            [QuestionStats(question_id=question_id) for question_id in question_ids],
+            ignore_conflicts=True
+        )
+        question_stats = list(QuestionStats.objects.select_for_update().filter(question_id__in=question_ids))
+        columns = {question_id: index for index, question_id in enumerate(statistics.question_ids.tolist())}
+
+        for stats in question_stats:
+            index = columns[stats.question_id]
+            stats.analyzed_attempts = int(statistics.attempts[index])
+            stats.difficulty = _to_float(statistics.difficulty[index])
+            stats.discrimination = _to_float(statistics.discrimination[index])
+            if statistics.irt_difficulty is not None:
+                stats.irt_difficulty = _to_float(statistics.irt_difficulty[index])
+            stats.analyzed_at = analyzed_at
+
+        QuestionStats.objects.bulk_update(
+            question_stats,
+            ['analyzed_attempts', 'difficulty', 'discrimination', 'irt_difficulty', 'analyzed_at'],
+            batch_size=500
+        )
+
+    return len(question_ids)
+
+
+def analyze_quiz(quiz_id: int, irt: bool = False) -> int:
+    statistics = compute_item_statistics(load_outcome_matrix(quiz_id), irt=irt)
+    return save_item_statistics(statistics)
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.quizzes.item_analysis import analyze_quiz
+from apps.quizzes.models import Quiz
+
+
+class Command(BaseCommand):
+    help = 'Compute difficulty and discrimination indices for quiz questions from recorded answers.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('quiz_ids', nargs='*', type=int)
+        parser.add_argument('--all', action='store_true', help='Analyze every quiz.')
+        parser.add_argument('--irt', action='store_true', help='Also fit a 1PL (Rasch) model.')
+
+    def handle(self, *args, **options):
+        if options['all']:
+            quiz_ids = list(Quiz.objects.order_by('id').values_list('id', flat=True))
+        elif options['quiz_ids']:
+            quiz_ids = options['quiz_ids']
+        else:
+            raise CommandError('Pass quiz ids or --all.')
+
+        for quiz_id in quiz_ids:
+            analyzed_count = analyze_quiz(quiz_id, irt=options['irt'])
+            self.stdout.write(f'Quiz {quiz_id}: {analyzed_count} questions analyzed')
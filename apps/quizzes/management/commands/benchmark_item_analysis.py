@@ -0,0 +1,61 @@
+import resource
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from apps.quizzes.item_analysis import OutcomeMatrix, compute_item_statistics, load_outcome_matrix
+
+
+class Command(BaseCommand):
+    help = 'Benchmark item analysis on a synthetic Rasch-distributed outcome matrix or on a stored quiz.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--attempts', type=int, default=100_000)
+        parser.add_argument('--questions', type=int, default=500)
+        parser.add_argument('--answered-rate', type=float, default=1.0)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--quiz', type=int, help='Load the outcome matrix of this quiz from the database.')
+
+    def handle(self, *args, **options):
+        if options['quiz']:
+            return self.benchmark_quiz(options['quiz'])
+
+        rng = np.random.default_rng(options['seed'])
+        attempts, questions = options['attempts'], options['questions']
+
+        ability = rng.normal(size=attempts).astype(np.float32)
+        true_difficulty = rng.normal(size=questions).astype(np.float32)
+        true_difficulty -= true_difficulty.mean()
+
+        started = time.perf_counter()
+        probability = 1 / (1 + np.exp(true_difficulty[None, :] - ability[:, None]))
+        outcomes = (rng.random((attempts, questions), dtype=np.float32) < probability).astype(np.float32)
+        answered = rng.random((attempts, questions), dtype=np.float32) < options['answered_rate']
+        outcomes *= answered
+        del probability
+        self.stdout.write(f'Generated {attempts} x {questions} matrix in {time.perf_counter() - started:.2f}s')
+
+        matrix = OutcomeMatrix(np.arange(questions), outcomes, answered)
+
+        started = time.perf_counter()
+        compute_item_statistics(matrix)
+        self.stdout.write(f'Classical test theory: {time.perf_counter() - started:.2f}s')
+
+        started = time.perf_counter()
+        statistics = compute_item_statistics(matrix, irt=True)
+        self.stdout.write(f'Classical + 1PL IRT: {time.perf_counter() - started:.2f}s')
+
+        correlation = np.corrcoef(statistics.irt_difficulty, true_difficulty)[0, 1]
+        self.stdout.write(f'Correlation of fitted and true difficulty: {correlation:.4f}')
+
+    def benchmark_quiz(self, quiz_id):
+        started = time.perf_counter()
+        matrix = load_outcome_matrix(quiz_id)
+        attempts, questions = matrix.outcomes.shape
+        self.stdout.write(f'Loaded {attempts} x {questions} matrix in {time.perf_counter() - started:.2f}s')
+        self.stdout.write(f'Peak RSS after load: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024} MiB')
+
+        started = time.perf_counter()
+        compute_item_statistics(matrix, irt=True)
+        self.stdout.write(f'Classical + 1PL IRT: {time.perf_counter() - started:.2f}s')
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.quizzes.enums import FileType
+from apps.quizzes.models import Quiz
+from apps.quizzes.utils import import_questions
+
+
+class Command(BaseCommand):
+    help = 'Import questions into a quiz from a CSV or JSON file.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('quiz_id', type=int)
+        parser.add_argument('path')
+        parser.add_argument('--file-type', choices=[file_type.value for file_type in FileType])
+        parser.add_argument('--batch-size', type=int)
+        parser.add_argument('--skip-invalid', action='store_true', help='Import valid rows even if some rows fail.')
+
+    def handle(self, *args, **options):
+        quiz = Quiz.objects.filter(id=options['quiz_id']).first()
+        if quiz is None:
+            raise CommandError(f"Quiz {options['quiz_id']} not found.")
+
+        path = options['path']
+        file_type = FileType(options['file_type'] or path.rsplit('.', 1)[-1].lower())
+
+        with open(path, 'rb') as stream:
+            report = import_questions(
+                quiz, stream, file_type, batch_size=options['batch_size'], skip_invalid=options['skip_invalid']
+            )
+
+        for error in report['errors']:
+            self.stderr.write(f"Row {error['row']}: {' '.join(error['errors'])}")
+
+        self.stdout.write(f"Imported {report['imported']} questions, {report['error_count']} rows failed.")
@@ -0,0 +1,66 @@
+# Generated by Django 5.1.2 on 2026-10-19 04:55
+
+import hashlib
+import json
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def publish_initial_versions(apps, schema_editor):
+    Quiz = apps.get_model('quizzes', 'Quiz')
+    Question = apps.get_model('quizzes', 'Question')
+    QuizVersion = apps.get_model('quizzes', 'QuizVersion')
+
+    for quiz in Quiz.objects.filter(current_version__isnull=True).iterator():
+        content = list(
+            Question.objects.filter(quiz=quiz).order_by('id').values('id', 'text', 'answers', 'correct_answer')
+        )
+        serialized = json.dumps(content, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+        version = QuizVersion.objects.create(
+            quiz=quiz,
+            number=1,
+            content=content,
+            content_hash=hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+        )
+        Quiz.objects.filter(id=quiz.id).update(current_version=version)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0002_quizresult_userquizsession'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField()),
+                ('content', models.JSONField()),
+                ('content_hash', models.CharField(max_length=64)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('quiz', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='versions', to='quizzes.quiz')),
+            ],
+            options={
+                'unique_together': {('quiz', 'number')},
+            },
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='current_version',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='quizzes.quizversion'),
+        ),
+        migrations.AddField(
+            model_name='quizresult',
+            name='version',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='quizzes.quizversion'),
+        ),
+        migrations.AddField(
+            model_name='userquizsession',
+            name='version',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='quizzes.quizversion'),
+        ),
+        migrations.RunPython(publish_initial_versions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.2 on 2026-10-19 05:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0004_questionstats_quizanswer'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='questionstats',
+            name='analyzed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='questionstats',
+            name='analyzed_attempts',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='questionstats',
+            name='difficulty',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='questionstats',
+            name='discrimination',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='questionstats',
+            name='irt_difficulty',
+            field=models.FloatField(blank=True, null=True),
+        ),
+    ]
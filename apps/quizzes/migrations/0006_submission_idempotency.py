@@ -0,0 +1,46 @@
+# Generated by Django 5.1.2 on 2026-10-19 05:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def delete_duplicate_started_sessions(apps, schema_editor):
+    UserQuizSession = apps.get_model('quizzes', 'UserQuizSession')
+    latest_ids = {}
+
+    started_sessions = UserQuizSession.objects.filter(status='started').order_by('start_session_time', 'id')
+    for session_id, user_id, quiz_id in started_sessions.values_list('id', 'user_id', 'quiz_id').iterator():
+        latest_ids[(user_id, quiz_id)] = session_id
+
+    started_sessions.exclude(id__in=latest_ids.values()).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0005_questionstats_analyzed_at_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizresult',
+            name='idempotency_key',
+            field=models.CharField(blank=True, max_length=64, null=True),
+        ),
+        migrations.AddField(
+            model_name='quizresult',
+            name='session',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='result', to='quizzes.userquizsession'),
+        ),
+        migrations.AddConstraint(
+            model_name='quizresult',
+            constraint=models.UniqueConstraint(condition=models.Q(('idempotency_key__isnull', False)), fields=('user', 'idempotency_key'), name='unique_quiz_result_idempotency_key'),
+        ),
+        migrations.RunPython(delete_duplicate_started_sessions, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='userquizsession',
+            constraint=models.UniqueConstraint(condition=models.Q(('status', 'started')), fields=('user', 'quiz'), name='unique_started_quiz_session'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.2 on 2026-10-19 05:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0006_submission_idempotency'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='time_limit_minutes',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='userquizsession',
+            name='status',
+            field=models.CharField(choices=[('started', 'Started'), ('completed', 'Completed'), ('expired', 'Expired')], default='started', max_length=10),
+        ),
+        migrations.AddIndex(
+            model_name='userquizsession',
+            index=models.Index(condition=models.Q(('status', 'started')), fields=['start_session_time'], name='started_session_start_time'),
+        ),
+    ]
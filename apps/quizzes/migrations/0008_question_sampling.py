@@ -0,0 +1,23 @@
+# Generated by Django 5.1.2 on 2026-10-19 05:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0007_session_expiry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='question_sample_size',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='userquizsession',
+            name='question_sample_size',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.2 on 2026-10-19 05:31
+
+import django.contrib.postgres.indexes
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0008_question_sampling'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='quizresult',
+            index=models.Index(fields=['user', 'quiz', '-created_at'], name='quizresult_user_quiz_created'),
+        ),
+        migrations.AddIndex(
+            model_name='quizresult',
+            index=models.Index(fields=['quiz', 'created_at'], name='quizresult_quiz_created'),
+        ),
+        migrations.AddIndex(
+            model_name='quizresult',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['created_at'], name='quizresult_created_brin'),
+        ),
+        migrations.AddIndex(
+            model_name='userquizsession',
+            index=models.Index(fields=['user', 'quiz', 'status'], name='session_user_quiz_status'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.2 on 2026-10-19 05:36
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0009_query_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizresult',
+            name='score_pct',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.functions.comparison.Cast('correct_answers', models.FloatField()), '*', models.Value(100)), '/', django.db.models.functions.comparison.NullIf('total_questions', 0)), output_field=models.FloatField()),
+        ),
+        migrations.AddIndex(
+            model_name='quizresult',
+            index=models.Index(fields=['quiz', 'score_pct'], name='quizresult_quiz_score'),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.conf import settings
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import BrinIndex
 from django.db import models
+from django.db.models.functions import Cast, NullIf
 
 from apps.companies.models import Company
 from tools.models import TimeStampedModel
@@ -10,7 +12,27 @@ class Quiz(TimeStampedModel):
     title = models.CharField(max_length=100)
     description = models.TextField()
     frequency_days = models.IntegerField(default=30)
+    time_limit_minutes = models.PositiveIntegerField(null=True, blank=True)
+    question_sample_size = models.PositiveIntegerField(null=True, blank=True)
     company = models.ForeignKey(Company, on_delete=models.CASCADE, related_name='quizzes')
+    current_version = models.ForeignKey(
+        'QuizVersion',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+
+
+class QuizVersion(models.Model):
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='versions')
+    number = models.PositiveIntegerField()
+    content = models.JSONField()
+    content_hash = models.CharField(max_length=64)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ('quiz', 'number')
 
 
 class Question(TimeStampedModel):
@@ -24,6 +46,7 @@ class UserQuizSession(TimeStampedModel):
     class Status(models.TextChoices):
         STARTED = 'started', 'Started'
         COMPLETED = 'completed', 'Completed'
+        EXPIRED = 'expired', 'Expired'
 
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -31,14 +54,82 @@ class UserQuizSession(TimeStampedModel):
         related_name='quizzes_passing'
     )
     quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE)
+    version = models.ForeignKey(QuizVersion, on_delete=models.SET_NULL, null=True, blank=True)
     status = models.CharField(max_length=10, choices=Status.choices, default=Status.STARTED)
+    question_sample_size = models.PositiveIntegerField(null=True, blank=True)
     start_session_time = models.DateTimeField(auto_now_add=True)
     end_session_time = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'quiz'],
+                condition=models.Q(status='started'),
+                name='unique_started_quiz_session'
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['start_session_time'],
+                condition=models.Q(status='started'),
+                name='started_session_start_time'
+            ),
+            models.Index(fields=['user', 'quiz', 'status'], name='session_user_quiz_status'),
+        ]
     
     
 class QuizResult(TimeStampedModel):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE)
+    version = models.ForeignKey(QuizVersion, on_delete=models.SET_NULL, null=True, blank=True)
+    session = models.OneToOneField(
+        UserQuizSession,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='result'
+    )
+    idempotency_key = models.CharField(max_length=64, null=True, blank=True)
     correct_answers = models.PositiveIntegerField()
     total_questions = models.PositiveIntegerField()
-    quiz_time = models.DurationField() 
+    score_pct = models.GeneratedField(
+        expression=Cast('correct_answers', models.FloatField()) * 100 / NullIf('total_questions', 0),
+        output_field=models.FloatField(),
+        db_persist=True
+    )
+    quiz_time = models.DurationField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'idempotency_key'],
+                condition=models.Q(idempotency_key__isnull=False),
+                name='unique_quiz_result_idempotency_key'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'quiz', '-created_at'], name='quizresult_user_quiz_created'),
+            models.Index(fields=['quiz', 'created_at'], name='quizresult_quiz_created'),
+            BrinIndex(fields=['created_at'], name='quizresult_created_brin'),
+            models.Index(fields=['quiz', 'score_pct'], name='quizresult_quiz_score'),
+        ]
+
+
+class QuizAnswer(models.Model):
+    result = models.ForeignKey(QuizResult, on_delete=models.CASCADE, related_name='answers')
+    quiz = models.ForeignKey(Quiz, on_delete=models.CASCADE, related_name='+')
+    question_id = models.BigIntegerField()
+    selected = ArrayField(models.CharField(max_length=100))
+    is_correct = models.BooleanField()
+
+
+class QuestionStats(models.Model):
+    question = models.OneToOneField(Question, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    attempts = models.PositiveIntegerField(default=0)
+    correct = models.PositiveIntegerField(default=0)
+    choice_counts = models.JSONField(default=dict)
+    analyzed_attempts = models.PositiveIntegerField(default=0)
+    difficulty = models.FloatField(null=True, blank=True)
+    discrimination = models.FloatField(null=True, blank=True)
+    irt_difficulty = models.FloatField(null=True, blank=True)
+    analyzed_at = models.DateTimeField(null=True, blank=True)
@@ -1,6 +1,6 @@
 from rest_framework import permissions
 
-from apps.companies.models import CompanyMember
+from apps.companies.utils import is_company_admin_or_owner
 
 
 class IsCompanyAdminOrOwner(permissions.BasePermission):
@@ -10,10 +10,4 @@ class IsCompanyAdminOrOwner(permissions.BasePermission):
         if not company_id:
             return False
 
-        is_admin_or_owner = CompanyMember.objects.filter(
-            user=request.user,
-            company_id=company_id,
-            role__in=[CompanyMember.Role.OWNER, CompanyMember.Role.ADMIN]
-        ).exists()
-
-        return is_admin_or_owner
+        return is_company_admin_or_owner(request.user, company_id, request)
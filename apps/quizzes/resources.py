@@ -1,10 +1,10 @@
 from django.conf import settings
 from import_export import fields, resources
-from import_export.widgets import ForeignKeyWidget
+from import_export.widgets import ForeignKeyWidget, SimpleArrayWidget
 
 from apps.companies.models import Company
 
-from .models import Quiz, QuizResult
+from .models import Question, Quiz, QuizResult
 
 User = settings.AUTH_USER_MODEL
 
@@ -39,7 +39,35 @@ class QuizResultResource(resources.ModelResource):
         export_order = ('id', 'user', 'company', 'quiz', 'score', 'date_passed')
 
     def dehydrate_score(self, quiz_result):
-        return (quiz_result.correct_answers / quiz_result.total_questions) * 100
+        return quiz_result.score_pct
     
     def dehydrate_date_passed(self, quiz_result):
         return quiz_result.created_at.strftime('%Y-%m-%d %H:%M:%S')
+
+
+class AnswerListWidget(SimpleArrayWidget):
+    def clean(self, value, row=None, **kwargs):
+        if isinstance(value, list):
+            return [str(answer).strip() for answer in value]
+        return [answer.strip() for answer in super().clean(value, row=row, **kwargs)]
+
+
+class QuestionResource(resources.ModelResource):
+    text = fields.Field(column_name='text', attribute='text')
+    answers = fields.Field(
+        column_name='answers',
+        attribute='answers',
+        widget=AnswerListWidget(separator='|')
+    )
+    correct_answer = fields.Field(
+        column_name='correct_answer',
+        attribute='correct_answer',
+        widget=AnswerListWidget(separator='|')
+    )
+
+    class Meta:
+        model = Question
+        fields = ('text', 'answers', 'correct_answer')
+
+    def clean_row(self, row: dict) -> dict:
+        return {name: self.fields[name].clean(row) for name in self._meta.fields}
@@ -1,10 +1,12 @@
-from django.db.models import Q
+from django.conf import settings
 from rest_framework import serializers
 
-from apps.companies.models import CompanyMember
+from apps.companies.utils import is_company_admin_or_owner
 from apps.notifications.utils import send_notifications
 
-from .models import Question, Quiz, QuizResult, UserQuizSession
+from .models import Question, Quiz, QuizResult, QuizVersion, UserQuizSession
+from .utils import QUESTION_SYNC_FIELDS, question_errors, sync_quiz_questions, write_question_changes
+from .versioning import publish_quiz_version
 
 
 class QuestionSerializer(serializers.ModelSerializer):
@@ -23,19 +25,14 @@ class QuizSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Quiz
-        fields = ['id', 'title', 'description', 'created_at', 'frequency_days', 'questions', 'company']
+        fields = ['id', 'title', 'description', 'created_at', 'frequency_days', 'time_limit_minutes',
+                  'question_sample_size', 'questions', 'company']
         
     def create(self, validated_data):
-        user = self.context['request'].user
+        request = self.context['request']
         company = validated_data.get('company') 
 
-        is_admin_owner = CompanyMember.objects.filter(
-            Q(role=CompanyMember.Role.OWNER) | 
-            Q(role=CompanyMember.Role.ADMIN), 
-            user=user, company=company
-            ).exists()
-        
-        if (not is_admin_owner):
+        if not is_company_admin_or_owner(request.user, company, request):
             raise serializers.ValidationError(("User is not Admin or Owner of company."))
         
         questions_data = validated_data.pop('questions')
@@ -62,22 +59,16 @@ class QuizSerializer(serializers.ModelSerializer):
             questions.append(question)
 
         Question.objects.bulk_create(questions)
+        publish_quiz_version(quiz)
         
         send_notifications(company, quiz.title, quiz.company.name)
         
         return quiz
 
     def update(self, instance, validated_data):
-        user = self.context['request'].user
-        company = instance.company
-
-        is_admin_owner = CompanyMember.objects.filter(
-            Q(role=CompanyMember.Role.OWNER) | 
-            Q(role=CompanyMember.Role.ADMIN), 
-            user=user, company=company
-        ).exists()
+        request = self.context['request']
 
-        if not is_admin_owner:
+        if not is_company_admin_or_owner(request.user, instance.company_id, request):
             raise serializers.ValidationError("User is not Admin or Owner of the company.")
         
         new_questions = validated_data.get('questions', [])
@@ -96,50 +87,145 @@ class QuizSerializer(serializers.ModelSerializer):
         instance.title = validated_data.get('title', instance.title)
         instance.description = validated_data.get('description', instance.description)
         instance.frequency_days = validated_data.get('frequency_days', instance.frequency_days)
+        instance.time_limit_minutes = validated_data.get('time_limit_minutes', instance.time_limit_minutes)
+        instance.question_sample_size = validated_data.get('question_sample_size', instance.question_sample_size)
         instance.save()
 
-        current_questions = instance.questions.all()    
-        
-        current_questions_ids = set()
-        for question in current_questions:
-            current_questions_ids.add(question.id)
+        changes = sync_quiz_questions(instance, new_questions)
 
-        questions_to_create = []
-        questions_to_update = []
-        new_question_ids = set()
-
-        for new_question in new_questions:
-            if 'id' in new_question:
-                new_question_ids.add(new_question['id'])
-                question_id = new_question['id']
-                if question_id in current_questions_ids:
-                    old_question = current_questions.get(id=question_id)
-                    old_question.text = new_question['text']
-                    old_question.answers = new_question['answers']
-                    old_question.correct_answer = new_question['correct_answer']
-                    questions_to_update.append(old_question)
-                    
-            else:
-                new_question['quiz'] = instance
-                questions_to_create.append(Question(**new_question))
-            
-        if new_question_ids:
-            instance.questions.filter(~Q(id__in=new_question_ids)).delete()
-            
-        if questions_to_create:
-            Question.objects.bulk_create(questions_to_create)
-            
-        if questions_to_update:
-            Question.objects.bulk_update(questions_to_update, ['text', 'answers', 'correct_answer'])
+        if any(changes.values()):
+            publish_quiz_version(instance)
         
         return instance
 
 
+class QuestionValueSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = Question
+        fields = ['text', 'answers', 'correct_answer']
+
+
+class QuestionOperationSerializer(serializers.Serializer):
+    op = serializers.ChoiceField(choices=['add', 'replace', 'remove'])
+    id = serializers.IntegerField(required=False)
+    value = serializers.DictField(required=False)
+
+    def validate(self, attrs):
+        if attrs['op'] != 'add' and 'id' not in attrs:
+            raise serializers.ValidationError("Question id is required.")
+        if attrs['op'] != 'remove' and 'value' not in attrs:
+            raise serializers.ValidationError("Question value is required.")
+        return attrs
+
+
+class QuestionBatchSerializer(serializers.Serializer):
+    operations = QuestionOperationSerializer(many=True, allow_empty=False)
+
+    def validate(self, attrs):
+        quiz = self.context['quiz']
+        operations = attrs['operations']
+        target_ids = {operation['id'] for operation in operations if operation['op'] != 'add'}
+        questions = {question.id: question for question in quiz.questions.filter(id__in=target_ids)}
+
+        questions_to_create = []
+        questions_to_update = {}
+        changed_fields = set()
+        deleted_ids = set()
+        errors = []
+
+        for operation in operations:
+            errors.append({})
+            question = questions.get(operation.get('id'))
+
+            if operation['op'] != 'add' and (question is None or question.id in deleted_ids):
+                errors[-1] = {'id': ["Question not found."]}
+                continue
+
+            if operation['op'] == 'remove':
+                deleted_ids.add(question.id)
+                questions_to_update.pop(question.id, None)
+                continue
+
+            value_serializer = QuestionValueSerializer(
+                question, data=operation['value'], partial=operation['op'] == 'replace'
+            )
+            if not value_serializer.is_valid():
+                errors[-1] = {'value': value_serializer.errors}
+                continue
+
+            question_data = value_serializer.validated_data
+            if question is not None:
+                question_data = {field: question_data.get(field, getattr(question, field))
+                                 for field in QUESTION_SYNC_FIELDS}
+
+            question_data_errors = question_errors(question_data)
+            if question_data_errors:
+                errors[-1] = {'value': question_data_errors}
+                continue
+
+            if question is None:
+                questions_to_create.append(Question(quiz=quiz, **question_data))
+                continue
+
+            question_changes = [
+                field for field in QUESTION_SYNC_FIELDS if getattr(question, field) != question_data[field]
+            ]
+            for field in question_changes:
+                setattr(question, field, question_data[field])
+
+            if question_changes:
+                changed_fields.update(question_changes)
+                questions_to_update[question.id] = question
+
+        if any(errors):
+            raise serializers.ValidationError({'operations': errors})
+
+        if deleted_ids and quiz.questions.count() - len(deleted_ids) + len(questions_to_create) < 2:
+            raise serializers.ValidationError("A quiz must have at least two questions.")
+
+        return {
+            'created': questions_to_create,
+            'updated': list(questions_to_update.values()),
+            'changed_fields': changed_fields,
+            'deleted': deleted_ids,
+        }
+
+    def create(self, validated_data):
+        quiz = self.context['quiz']
+
+        write_question_changes(
+            validated_data['created'], validated_data['updated'], validated_data['changed_fields'],
+            validated_data['deleted']
+        )
+
+        if validated_data['created'] or validated_data['updated'] or validated_data['deleted']:
+            publish_quiz_version(quiz)
+
+        return validated_data
+
+    def to_representation(self, instance):
+        return {
+            'created': QuestionSerializer(instance['created'], many=True).data,
+            'updated': QuestionSerializer(instance['updated'], many=True).data,
+            'deleted': sorted(instance['deleted']),
+        }
+
+
+class QuizListSerializer(serializers.ModelSerializer):
+    question_count = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Quiz
+        fields = ['id', 'title', 'description', 'created_at', 'frequency_days', 'time_limit_minutes', 'company',
+                  'question_count']
+
+
 class QuizForUserSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = Quiz
-        fields = ['id', 'title', 'description', 'created_at', 'frequency_days']
+        fields = ['id', 'title', 'description', 'created_at', 'frequency_days', 'time_limit_minutes']
         
 
 class UserQuizSessionSerializer(serializers.ModelSerializer):
@@ -148,19 +234,99 @@ class UserQuizSessionSerializer(serializers.ModelSerializer):
         fields = ['id', 'user', 'quiz', 'status', 'start_session_time']
         
 
+class VersionQuestionSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    text = serializers.CharField()
+    answers = serializers.ListField(child=serializers.CharField())
+    correct_answer = serializers.ListField(child=serializers.CharField())
+    quiz = serializers.IntegerField(required=False)
+
+
+class QuizVersionSerializer(serializers.ModelSerializer):
+    version = serializers.IntegerField(source='number')
+    questions = VersionQuestionSerializer(source='content', many=True)
+
+    class Meta:
+        model = QuizVersion
+        fields = ['id', 'quiz', 'version', 'content_hash', 'created_at', 'questions']
+
+
+class SubmittedAnswerSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    correct_answer = serializers.ListField(child=serializers.CharField(max_length=100))
+
+
 class QuizStartSessionSerializer(serializers.Serializer):
     start_session_time = serializers.DateTimeField()
-    session_id = serializers.IntegerField()
-    questions = QuestionSerializer(many=True)
+    session_id = serializers.IntegerField(allow_null=True)
+    token = serializers.CharField(allow_null=True)
+    version = serializers.IntegerField()
+    total_questions = serializers.IntegerField()
+    next_cursor = serializers.IntegerField(allow_null=True)
+    questions = VersionQuestionSerializer(many=True)
+    drafts = SubmittedAnswerSerializer(many=True)
+
+
+class QuizDraftSerializer(serializers.Serializer):
+    session = serializers.IntegerField()
+    answers = SubmittedAnswerSerializer(many=True, allow_empty=False)
+
+
+class QuizSubmissionSerializer(serializers.Serializer):
+    session = serializers.IntegerField(source='session_id')
+    user = serializers.IntegerField(source='user_id')
+    quiz = serializers.IntegerField(source='quiz_id')
+    version = serializers.IntegerField(source='version_id')
+    correct_answers = serializers.IntegerField()
+    total_questions = serializers.IntegerField()
+    end_time = serializers.DateTimeField()
 
 
 class QuizResultSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = QuizResult
-        fields = ['id', 'user', 'quiz', 'correct_answers', 'total_questions', 'quiz_time']
+        fields = ['id', 'user', 'quiz', 'version', 'correct_answers', 'total_questions', 'score_pct', 'quiz_time']
         
         
+class QuizBatchSubmissionItemSerializer(serializers.Serializer):
+    session = serializers.IntegerField()
+    answers = SubmittedAnswerSerializer(many=True, allow_empty=False)
+    idempotency_key = serializers.CharField(max_length=64, required=False)
+
+
+class QuizBatchSubmissionSerializer(serializers.Serializer):
+    submissions = QuizBatchSubmissionItemSerializer(many=True, allow_empty=False)
+
+    def validate_submissions(self, submissions):
+        if len(submissions) > settings.QUIZ_BATCH_SUBMISSION_LIMIT:
+            raise serializers.ValidationError(
+                f"At most {settings.QUIZ_BATCH_SUBMISSION_LIMIT} submissions can be sent at once."
+            )
+        return submissions
+
+
+class QuizSubmissionOutcomeSerializer(serializers.Serializer):
+    STATUS_CODES = {
+        'created': 201,
+        'replayed': 200,
+        'not_found': 404,
+        'expired': 400,
+        'already_completed': 409,
+        'duplicate': 409,
+        'idempotency_key_reused': 409,
+        'queued': 409,
+    }
+
+    session = serializers.IntegerField()
+    status = serializers.CharField()
+    code = serializers.SerializerMethodField()
+    result = QuizResultSerializer(allow_null=True)
+
+    def get_code(self, outcome):
+        return self.STATUS_CODES[outcome['status']]
+
+
 class QuizLastCompletionSerializers(serializers.ModelSerializer):
     quiz_title = serializers.CharField(source='quiz.title', read_only=True)
     
@@ -169,6 +335,38 @@ class QuizLastCompletionSerializers(serializers.ModelSerializer):
         fields = ['id', 'quiz', 'created_at', 'quiz_title', 'correct_answers', 'total_questions']
         
 
+class QuestionStatsSerializer(serializers.ModelSerializer):
+    attempts = serializers.SerializerMethodField()
+    correct_rate = serializers.SerializerMethodField()
+    choice_distribution = serializers.SerializerMethodField()
+    difficulty = serializers.FloatField(source='stats.difficulty', default=None, read_only=True)
+    discrimination = serializers.FloatField(source='stats.discrimination', default=None, read_only=True)
+    irt_difficulty = serializers.FloatField(source='stats.irt_difficulty', default=None, read_only=True)
+
+    class Meta:
+        model = Question
+        fields = ['id', 'text', 'attempts', 'correct_rate', 'choice_distribution',
+                  'difficulty', 'discrimination', 'irt_difficulty']
+
+    def stats_for(self, question):
+        return getattr(question, 'stats', None)
+
+    def get_attempts(self, question):
+        stats = self.stats_for(question)
+        return stats.attempts if stats else 0
+
+    def get_correct_rate(self, question):
+        stats = self.stats_for(question)
+        if not stats or not stats.attempts:
+            return 0
+        return round(stats.correct / stats.attempts * 100, 2)
+
+    def get_choice_distribution(self, question):
+        stats = self.stats_for(question)
+        choice_counts = stats.choice_counts if stats else {}
+        return {answer: choice_counts.get(answer, 0) for answer in question.answers}
+
+
 class DynamicTimeScoreSerializer(serializers.Serializer):
     date = serializers.DateTimeField()
     score = serializers.FloatField()
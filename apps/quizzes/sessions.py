@@ -0,0 +1,93 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import DateTimeField, DurationField, Exists, ExpressionWrapper, F, OuterRef, Q, Value
+from django.db.models.functions import Coalesce, Now
+from django.utils import timezone
+
+from .models import Quiz, QuizResult, UserQuizSession
+
+
+def session_time_limit(quiz: Quiz) -> timedelta:
+    return timedelta(minutes=quiz.time_limit_minutes or settings.QUIZ_SESSION_TIME_LIMIT_MINUTES)
+
+
+def is_session_expired(quiz_session: UserQuizSession, quiz: Quiz) -> bool:
+    return quiz_session.start_session_time + session_time_limit(quiz) < timezone.now()
+
+
+def session_time_limit_expression() -> ExpressionWrapper:
+    return ExpressionWrapper(
+        Coalesce('quiz__time_limit_minutes', Value(settings.QUIZ_SESSION_TIME_LIMIT_MINUTES))
+        * Value(timedelta(minutes=1)),
+        output_field=DurationField()
+    )
+
+
+def session_deadline_expression() -> ExpressionWrapper:
+    return ExpressionWrapper(F('start_session_time') + session_time_limit_expression(), output_field=DateTimeField())
+
+
+def expire_sessions(session_ids: list) -> int:
+    now = timezone.now()
+    return UserQuizSession.objects.filter(id__in=session_ids, status=UserQuizSession.Status.STARTED).update(
+        status=UserQuizSession.Status.EXPIRED, end_session_time=now, updated_at=now
+    )
+
+
+def expire_stale_sessions(batch_size: int | None = None) -> int:
+    batch_size = batch_size or settings.QUIZ_SESSION_SWEEP_BATCH_SIZE
+    time_limit = session_time_limit_expression()
+    stale_sessions = UserQuizSession.objects.filter(
+        status=UserQuizSession.Status.STARTED,
+        start_session_time__lt=ExpressionWrapper(Now() - time_limit, output_field=DateTimeField())
+    ).order_by('start_session_time')
+
+    expired_count = 0
+    while True:
+        session_ids = list(stale_sessions.values_list('id', flat=True)[:batch_size])
+
+        if not session_ids:
+            break
+
+        expired_count += expire_sessions(session_ids)
+
+    return expired_count
+
+
+def expire_overdue_sessions(quiz_sessions, now) -> set:
+    overdue_ids = set(
+        quiz_sessions.annotate(deadline=session_deadline_expression()).filter(
+            status=UserQuizSession.Status.STARTED, deadline__lt=now
+        ).values_list('id', flat=True)
+    )
+
+    if overdue_ids:
+        expire_sessions(list(overdue_ids))
+
+    return overdue_ids
+
+
+def compact_finished_sessions(batch_size: int | None = None) -> int:
+    if not settings.QUIZ_SESSION_COMPACTION_ENABLED:
+        return 0
+
+    batch_size = batch_size or settings.QUIZ_SESSION_SWEEP_BATCH_SIZE
+    cutoff = timezone.now() - timedelta(days=settings.QUIZ_SESSION_RETENTION_DAYS)
+    has_result = Exists(QuizResult.objects.filter(session_id=OuterRef('id')))
+    finished_sessions = UserQuizSession.objects.annotate(has_result=has_result).filter(
+        Q(status=UserQuizSession.Status.COMPLETED, has_result=True) | Q(status=UserQuizSession.Status.EXPIRED),
+        end_session_time__lt=cutoff
+    ).order_by('id')
+
+    purged_count = 0
+    while True:
+        session_ids = list(finished_sessions.values_list('id', flat=True)[:batch_size])
+
+        if not session_ids:
+            break
+
+        UserQuizSession.objects.filter(id__in=session_ids).delete()
+        purged_count += len(session_ids)
+
+    return purged_count
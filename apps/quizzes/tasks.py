@@ -1,3 +1,4 @@
+import logging
 from datetime import timedelta
 
 from celery import shared_task
@@ -8,10 +9,16 @@ from django.core.paginator import Paginator
 from django.db.models import F, Max
 from django.utils.timezone import now
 
+from .ingestion import flush_submission_stream
+from .item_analysis import analyze_quiz
 from .models import Quiz, QuizResult
+from .sessions import compact_finished_sessions, expire_stale_sessions
+from .versioning import collect_unused_versions
 
 User = get_user_model()
 
+logger = logging.getLogger("quiz-sessions")
+
 
 @shared_task
 def send_quiz_reminders():
@@ -60,4 +67,28 @@ def send_quiz_reminders():
                             ),
                             from_email=settings.EMAIL_HOST_USER,
                             recipient_list=[user.email],
-                        )
\ No newline at end of file
+                        )
+
+
+@shared_task
+def collect_quiz_versions():
+    return collect_unused_versions()
+
+
+@shared_task
+def analyze_quiz_items(quiz_id, irt=False):
+    return analyze_quiz(quiz_id, irt=irt)
+
+
+@shared_task
+def flush_quiz_submissions():
+    return flush_submission_stream()
+
+
+@shared_task
+def sweep_quiz_sessions():
+    expired_count = expire_stale_sessions()
+    purged_count = compact_finished_sessions()
+
+    logger.info(f"Quiz sessions: {expired_count} expired, {purged_count} purged")
+    return expired_count
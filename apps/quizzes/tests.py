@@ -1,17 +1,74 @@
+import io
 from datetime import timedelta
+from unittest import mock
 
+import numpy as np
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import IntegrityError, connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
 
 from apps.companies.models import Company, CompanyMember
 
-from .models import Question, Quiz, QuizResult, UserQuizSession
+from .enums import FileType
+from .ingestion import (
+    dead_letter_stream_entries,
+    decode_submission,
+    encode_submission,
+    flush_submission_stream,
+    process_stream_entries,
+)
+from .item_analysis import analyze_quiz, classical_statistics
+from .models import Question, QuestionStats, Quiz, QuizAnswer, QuizResult, QuizVersion, UserQuizSession
+from .sessions import compact_finished_sessions, expire_stale_sessions
+from .utils import (
+    grade_submission,
+    import_questions,
+    iter_json_array,
+    persist_graded_submissions,
+    sync_quiz_questions,
+    update_question_stats,
+)
+from .versioning import collect_unused_versions, publish_quiz_version
+from .views import QuizViewSet
 
 User = get_user_model()
 
 
+class FakeStreamClient:
+    def __init__(self):
+        self.values = {}
+        self.entries = []
+
+    def set(self, key, value, nx=False, ex=None):
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def mget(self, keys):
+        return [self.values.get(key) for key in keys]
+
+    def exists(self, key):
+        return int(key in self.values)
+
+    def delete(self, key):
+        self.values.pop(key, None)
+
+    def xadd(self, stream, fields):
+        self.entries.append((stream, fields))
+        return f'{len(self.entries)}-0'
+
+
 class QuizTestCase(APITestCase):
 
     def setUp(self):
@@ -158,6 +215,99 @@ class QuizTestCase(APITestCase):
         
         assert not Question.objects.filter(id=self.question2.id).exists()
 
+    def test_sync_questions_diff(self):
+        def edit_one_question(quiz):
+            questions_data = [
+                {'id': question.id, 'text': question.text, 'answers': question.answers,
+                 'correct_answer': question.correct_answer}
+                for question in quiz.questions.order_by('id')
+            ]
+            questions_data[0]['text'] = "Edited"
+            questions_data.pop()
+
+            with CaptureQueriesContext(connection) as queries:
+                changes = sync_quiz_questions(Quiz.objects.get(id=quiz.id), questions_data)
+            return changes, len(queries)
+
+        Question.objects.bulk_create([
+            Question(quiz=self.quiz2, text=f"q{i}", answers=["a", "b"], correct_answer=["a"]) for i in range(200)
+        ])
+
+        small_changes, small_queries = edit_one_question(self.quiz)
+        large_changes, large_queries = edit_one_question(self.quiz2)
+
+        self.assertEqual(small_changes, {'created': 0, 'updated': 1, 'deleted': 1})
+        self.assertEqual(large_changes, small_changes)
+        self.assertEqual(small_queries, large_queries)
+        self.assertEqual(self.quiz2.questions.count(), 199)
+        self.assertEqual(self.quiz2.questions.order_by('id').first().text, "Edited")
+
+    def test_patch_single_question(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.patch(
+            f'/api/v1/quizzes/{self.quiz.id}/questions/{self.question3.id}/', {'text': "2 + 2 = ?"}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['text'], "2 + 2 = ?")
+        self.question3.refresh_from_db()
+        self.assertEqual(self.question3.correct_answer, ["4"])
+
+        response = self.client.patch(
+            f'/api/v1/quizzes/{self.quiz.id}/questions/{self.question3.id}/', {'correct_answer': ["7"]}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(user=self.user2)
+        response = self.client.delete(f'/api/v1/quizzes/{self.quiz.id}/questions/{self.question3.id}/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_question_batch_operations(self):
+        self.client.force_authenticate(user=self.user)
+        operations = [
+            {'op': 'add', 'value': {'text': "New", 'answers': ["a", "b"], 'correct_answer': ["b"]}},
+            {'op': 'replace', 'id': self.question1.id, 'value': {'text': "Edited"}},
+            {'op': 'remove', 'id': self.question2.id},
+        ]
+        response = self.client.post(
+            f'/api/v1/quizzes/{self.quiz.id}/questions/batch/', {'operations': operations}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['deleted'], [self.question2.id])
+        self.assertEqual(response.data['updated'][0]['text'], "Edited")
+        self.assertEqual(set(self.quiz.questions.values_list('text', flat=True)), {"Edited", "2 + 2?", "New"})
+        self.quiz.refresh_from_db()
+        self.assertEqual(len(self.quiz.current_version.content), 3)
+
+        operations = [{'op': 'remove', 'id': self.question1.id}, {'op': 'remove', 'id': self.question3.id}]
+        response = self.client.post(f'/api/v1/quizzes/{self.quiz.id}/questions/batch/', operations, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.quiz.questions.count(), 3)
+
+    def test_list_quizzes_without_questions(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get('/api/v1/quizzes/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        quizzes = {quiz['id']: quiz for quiz in response.data['results']}
+        self.assertEqual(set(quizzes), {self.quiz.id, self.quiz2.id})
+        self.assertEqual(quizzes[self.quiz.id]['question_count'], 3)
+        self.assertEqual(quizzes[self.quiz2.id]['question_count'], 0)
+        self.assertNotIn('questions', quizzes[self.quiz.id])
+
+    def test_list_quizzes_expand_questions(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get('/api/v1/quizzes/?expand=questions')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        quizzes = {quiz['id']: quiz for quiz in response.data['results']}
+        self.assertEqual(len(quizzes[self.quiz.id]['questions']), 3)
+
+    def test_company_quizzes_list_for_admin(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(f'/api/v1/quizzes/company-quizzes/?company={self.company.id}&page_size=1')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIn('question_count', response.data['results'][0])
+        self.assertIsNotNone(response.data['next'])
+
     def test_create_quiz_success(self):
         self.client.force_authenticate(user=self.user)
 
@@ -226,6 +376,606 @@ class QuizTestCase(APITestCase):
         self.quiz_passing.refresh_from_db()
         self.assertEqual(self.quiz_passing.status, UserQuizSession.Status.COMPLETED)
 
+    def test_finish_quiz_idempotency_key(self):
+        user_answers = [{"id": self.question3.id, "correct_answer": ["4"]}]
+        self.client.force_authenticate(user=self.user2)
+        data = {'session': self.quiz_passing.id, 'answers': user_answers}
+
+        response = self.client.post('/api/v1/quizzes/finish-quiz/', data, format='json', HTTP_IDEMPOTENCY_KEY="k1")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        result_id = response.data['id']
+
+        response = self.client.post('/api/v1/quizzes/finish-quiz/', data, format='json', HTTP_IDEMPOTENCY_KEY="k1")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['id'], result_id)
+
+        response = self.client.post('/api/v1/quizzes/finish-quiz/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(QuizResult.objects.filter(session=self.quiz_passing).count(), 1)
+
+    def test_finish_quiz_idempotency_key_reused_for_another_session(self):
+        second_session = UserQuizSession.objects.create(user=self.user2, quiz=self.quiz2)
+        user_answers = [{"id": self.question3.id, "correct_answer": ["4"]}]
+        self.client.force_authenticate(user=self.user2)
+
+        response = self.client.post(
+            '/api/v1/quizzes/finish-quiz/', {'session': self.quiz_passing.id, 'answers': user_answers},
+            format='json', HTTP_IDEMPOTENCY_KEY="k1"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        data = {'session': second_session.id, 'answers': [{"id": self.question1.id, "correct_answer": ["x"]}]}
+        response = self.client.post('/api/v1/quizzes/finish-quiz/', data, format='json', HTTP_IDEMPOTENCY_KEY="k1")
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+        # Simulate a concurrent request that stored the key after the initial lookup.
+        real_lookup = QuizViewSet.get_idempotent_result
+        lookups = []
+
+        def lookup(view, user, idempotency_key):
+            lookups.append(idempotency_key)
+            return None if len(lookups) == 1 else real_lookup(view, user, idempotency_key)
+
+        with mock.patch.object(QuizViewSet, 'get_idempotent_result', autospec=True, side_effect=lookup):
+            response = self.client.post('/api/v1/quizzes/finish-quiz/', data, format='json', HTTP_IDEMPOTENCY_KEY="k1")
+
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['detail'], "Idempotency-Key was already used for a different quiz session.")
+        second_session.refresh_from_db()
+        self.assertEqual(second_session.status, UserQuizSession.Status.STARTED)
+
+    def test_persist_graded_submissions_deduplicates(self):
+        user_answers = [{"id": self.question3.id, "correct_answer": ["4"]}]
+        submission = grade_submission(self.quiz_passing, user_answers, timezone.now(), "k1")
+        self.assertEqual(submission['correct_answers'], 1)
+
+        persisted = persist_graded_submissions([submission, dict(submission)])
+        self.assertEqual(list(persisted), [self.quiz_passing.id])
+        self.assertEqual(persist_graded_submissions([submission]), {})
+
+        self.quiz_passing.refresh_from_db()
+        self.assertEqual(self.quiz_passing.status, UserQuizSession.Status.COMPLETED)
+        quiz_result = QuizResult.objects.get(session=self.quiz_passing)
+        self.assertEqual(quiz_result.idempotency_key, "k1")
+        self.assertEqual(quiz_result.answers.count(), 1)
+
+    def test_finish_quiz_batch(self):
+        second_session = UserQuizSession.objects.create(user=self.user2, quiz=self.quiz2)
+        self.client.force_authenticate(user=self.user2)
+        submissions = [
+            {'session': self.quiz_passing.id, 'answers': [{"id": self.question3.id, "correct_answer": ["4"]}]},
+            {'session': self.quiz_passing.id, 'answers': [{"id": self.question3.id, "correct_answer": ["5"]}]},
+            {'session': second_session.id, 'answers': [{"id": self.question1.id, "correct_answer": ["x"]}]},
+            {'session': 0, 'answers': [{"id": self.question1.id, "correct_answer": ["x"]}]},
+        ]
+
+        response = self.client.post('/api/v1/quizzes/finish-quiz/batch/', {'submissions': submissions}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        outcomes = response.data['results']
+        self.assertEqual([outcome['status'] for outcome in outcomes], ['created', 'duplicate', 'created', 'not_found'])
+        self.assertEqual([outcome['code'] for outcome in outcomes], [201, 409, 201, 404])
+        self.assertEqual(outcomes[0]['result']['correct_answers'], 1)
+        self.assertEqual(outcomes[2]['result']['total_questions'], 0)
+        self.assertEqual(QuizResult.objects.filter(user=self.user2).count(), 2)
+
+        response = self.client.post('/api/v1/quizzes/finish-quiz/batch/', {'submissions': submissions}, format='json')
+        self.assertEqual(response.data['results'][0]['status'], 'already_completed')
+
+    def test_finish_quiz_batch_rejects_repeated_idempotency_keys(self):
+        second_session = UserQuizSession.objects.create(user=self.user2, quiz=self.quiz2)
+        self.client.force_authenticate(user=self.user2)
+        submissions = [
+            {'session': self.quiz_passing.id, 'answers': [{"id": self.question3.id, "correct_answer": ["4"]}],
+             'idempotency_key': "k1"},
+            {'session': second_session.id, 'answers': [{"id": self.question1.id, "correct_answer": ["x"]}],
+             'idempotency_key': "k1"},
+        ]
+
+        response = self.client.post('/api/v1/quizzes/finish-quiz/batch/', {'submissions': submissions}, format='json')
+
+        outcomes = response.data['results']
+        self.assertEqual([outcome['status'] for outcome in outcomes], ['created', 'idempotency_key_reused'])
+        self.assertEqual(outcomes[1]['code'], 409)
+        self.assertEqual(QuizResult.objects.get(user=self.user2).idempotency_key, "k1")
+        second_session.refresh_from_db()
+        self.assertEqual(second_session.status, UserQuizSession.Status.STARTED)
+
+    @override_settings(QUIZ_RESULT_WRITE_BEHIND=True)
+    def test_finish_quiz_batch_skips_sessions_queued_by_write_behind(self):
+        stream_client = FakeStreamClient()
+        submission = {'session': self.quiz_passing.id, 'answers': [{"id": self.question3.id, "correct_answer": ["4"]}]}
+        self.client.force_authenticate(user=self.user2)
+
+        with mock.patch('apps.quizzes.ingestion.get_stream_client', return_value=stream_client):
+            response = self.client.post('/api/v1/quizzes/finish-quiz/', submission, format='json')
+            self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+
+            response = self.client.post(
+                '/api/v1/quizzes/finish-quiz/batch/', {'submissions': [submission]}, format='json'
+            )
+
+        self.assertEqual(response.data['results'][0]['status'], 'queued')
+        self.assertEqual(response.data['results'][0]['code'], 409)
+        self.assertFalse(QuizResult.objects.filter(session=self.quiz_passing).exists())
+
+    def test_overdue_session_is_expired_on_submit(self):
+        Quiz.objects.filter(id=self.quiz.id).update(time_limit_minutes=1)
+        UserQuizSession.objects.filter(id=self.quiz_passing.id).update(
+            start_session_time=timezone.now() - timedelta(hours=5)
+        )
+        batch_session = UserQuizSession.objects.create(user=self.user2, quiz=self.quiz2)
+        UserQuizSession.objects.filter(id=batch_session.id).update(
+            start_session_time=timezone.now() - timedelta(days=1)
+        )
+        user_answers = [{"id": self.question3.id, "correct_answer": ["4"]}]
+        self.client.force_authenticate(user=self.user2)
+
+        response = self.client.post(
+            '/api/v1/quizzes/finish-quiz/', {'session': self.quiz_passing.id, 'answers': user_answers}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['detail'], "Quiz session expired.")
+
+        response = self.client.post(
+            '/api/v1/quizzes/finish-quiz/batch/',
+            {'submissions': [{'session': batch_session.id, 'answers': user_answers}]},
+            format='json'
+        )
+        self.assertEqual(response.data['results'][0]['status'], 'expired')
+
+        self.quiz_passing.refresh_from_db()
+        batch_session.refresh_from_db()
+        self.assertEqual(self.quiz_passing.status, UserQuizSession.Status.EXPIRED)
+        self.assertEqual(batch_session.status, UserQuizSession.Status.EXPIRED)
+        self.assertFalse(QuizResult.objects.filter(user=self.user2).exists())
+
+    def test_persist_graded_submissions_rejects_overdue_sessions(self):
+        Quiz.objects.filter(id=self.quiz.id).update(time_limit_minutes=1)
+        UserQuizSession.objects.filter(id=self.quiz_passing.id).update(
+            start_session_time=timezone.now() - timedelta(hours=5)
+        )
+        submission = grade_submission(
+            self.quiz_passing, [{"id": self.question3.id, "correct_answer": ["4"]}], timezone.now()
+        )
+
+        self.assertEqual(persist_graded_submissions([submission]), {})
+
+        self.quiz_passing.refresh_from_db()
+        self.assertEqual(self.quiz_passing.status, UserQuizSession.Status.EXPIRED)
+
+    def test_persist_graded_submissions_keeps_on_time_submissions_of_swept_sessions(self):
+        submission = grade_submission(
+            self.quiz_passing, [{"id": self.question3.id, "correct_answer": ["4"]}], timezone.now()
+        )
+        UserQuizSession.objects.filter(id=self.quiz_passing.id).update(status=UserQuizSession.Status.EXPIRED)
+
+        persisted = persist_graded_submissions([submission])
+
+        self.assertEqual(list(persisted), [self.quiz_passing.id])
+        self.quiz_passing.refresh_from_db()
+        self.assertEqual(self.quiz_passing.status, UserQuizSession.Status.COMPLETED)
+
+    def test_process_stream_entries_logs_dropped_submissions(self):
+        submission = grade_submission(
+            self.quiz_passing, [{"id": self.question3.id, "correct_answer": ["4"]}], timezone.now()
+        )
+        UserQuizSession.objects.filter(id=self.quiz_passing.id).update(status=UserQuizSession.Status.COMPLETED)
+        client = mock.Mock()
+
+        with self.assertLogs('quiz-ingestion', level='WARNING') as logs:
+            persisted = process_stream_entries(client, [('1-0', {'submission': encode_submission(submission)})])
+
+        self.assertEqual(persisted, 0)
+        self.assertIn(f'session {self.quiz_passing.id}', logs.output[0])
+        client.xack.assert_called_once()
+        client.xdel.assert_called_once()
+
+    def test_process_stream_entries_leaves_failing_entries_pending(self):
+        second_session = UserQuizSession.objects.create(user=self.user2, quiz=self.quiz2)
+        submissions = [
+            grade_submission(self.quiz_passing, [{"id": self.question3.id, "correct_answer": ["4"]}], timezone.now()),
+            grade_submission(second_session, [], timezone.now()),
+        ]
+        entries = [(f'{index}-0', {'submission': encode_submission(item)}) for index, item in enumerate(submissions)]
+        client = mock.Mock()
+
+        def persist(items):
+            if len(items) > 1 or items[0]['session_id'] == second_session.id:
+                raise IntegrityError("duplicate key")
+            return persist_graded_submissions(items)
+
+        with mock.patch('apps.quizzes.ingestion.persist_graded_submissions', side_effect=persist), \
+                self.assertLogs('quiz-ingestion', level='ERROR'):
+            self.assertEqual(process_stream_entries(client, entries), 1)
+
+        client.xack.assert_called_once_with(settings.QUIZ_RESULT_STREAM, settings.QUIZ_RESULT_STREAM_GROUP, '0-0')
+        client.xdel.assert_called_once_with(settings.QUIZ_RESULT_STREAM, '0-0')
+
+    def test_dead_letter_stream_entries_moves_exhausted_entries(self):
+        client = mock.Mock()
+        client.xpending_range.return_value = [
+            {'message_id': '1-0', 'times_delivered': settings.QUIZ_RESULT_STREAM_MAX_DELIVERIES},
+            {'message_id': '2-0', 'times_delivered': 1},
+        ]
+        client.xrange.return_value = [('1-0', {'submission': '{}'})]
+
+        with self.assertLogs('quiz-ingestion', level='ERROR'):
+            self.assertEqual(dead_letter_stream_entries(client, 10), 1)
+
+        client.xrange.assert_called_once_with(settings.QUIZ_RESULT_STREAM, min='1-0', max='1-0')
+        client.xadd.assert_called_once_with(
+            settings.QUIZ_RESULT_DEAD_LETTER_STREAM, {'submission': '{}', 'entry_id': '1-0'}
+        )
+        client.xack.assert_called_once_with(settings.QUIZ_RESULT_STREAM, settings.QUIZ_RESULT_STREAM_GROUP, '1-0')
+
+    def test_flush_submission_stream_is_noop_without_write_behind(self):
+        with mock.patch('apps.quizzes.ingestion.get_stream_client') as get_stream_client:
+            self.assertEqual(flush_submission_stream(), 0)
+
+        get_stream_client.assert_not_called()
+
+    @override_settings(QUIZ_RESULT_WRITE_BEHIND=True)
+    def test_finish_quiz_write_behind(self):
+        stream_client = FakeStreamClient()
+        user_answers = [{"id": self.question3.id, "correct_answer": ["4"]}]
+        data = {'session': self.quiz_passing.id, 'answers': user_answers}
+        self.client.force_authenticate(user=self.user2)
+
+        with mock.patch('apps.quizzes.ingestion.get_stream_client', return_value=stream_client):
+            response = self.client.post('/api/v1/quizzes/finish-quiz/', data, format='json', HTTP_IDEMPOTENCY_KEY="k1")
+            self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+            self.assertEqual(response.data['session'], self.quiz_passing.id)
+            self.assertEqual(response.data['correct_answers'], 1)
+
+            replay = self.client.post('/api/v1/quizzes/finish-quiz/', data, format='json', HTTP_IDEMPOTENCY_KEY="k1")
+            self.assertEqual(replay.status_code, status.HTTP_200_OK)
+            self.assertEqual(replay.data, response.data)
+
+            response = self.client.post('/api/v1/quizzes/finish-quiz/', data, format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.assertEqual(len(stream_client.entries), 1)
+        stream, fields = stream_client.entries[0]
+        self.assertEqual(stream, settings.QUIZ_RESULT_STREAM)
+        self.assertEqual(list(fields), ['submission'])
+        submission = decode_submission(fields['submission'])
+        self.assertEqual(submission['session_id'], self.quiz_passing.id)
+        self.assertEqual(submission['user_id'], self.user2.id)
+        self.assertEqual(submission['idempotency_key'], "k1")
+        self.assertEqual(submission['answers'], user_answers)
+        self.assertIsNotNone(submission['end_time'].tzinfo)
+        self.assertIn(f'{settings.QUIZ_RESULT_STREAM}:session:{self.quiz_passing.id}', stream_client.values)
+
+        self.quiz_passing.refresh_from_db()
+        self.assertEqual(self.quiz_passing.status, UserQuizSession.Status.STARTED)
+        self.assertEqual(persist_graded_submissions([submission])[self.quiz_passing.id].correct_answers, 1)
+
+    @override_settings(QUIZ_RESULT_WRITE_BEHIND=True)
+    def test_finish_quiz_write_behind_rejects_expired_session(self):
+        stream_client = FakeStreamClient()
+        Quiz.objects.filter(id=self.quiz.id).update(time_limit_minutes=1)
+        UserQuizSession.objects.filter(id=self.quiz_passing.id).update(
+            start_session_time=timezone.now() - timedelta(hours=5)
+        )
+        self.client.force_authenticate(user=self.user2)
+
+        with mock.patch('apps.quizzes.ingestion.get_stream_client', return_value=stream_client):
+            response = self.client.post(
+                '/api/v1/quizzes/finish-quiz/',
+                {'session': self.quiz_passing.id, 'answers': [{"id": self.question3.id, "correct_answer": ["4"]}]},
+                format='json'
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['detail'], "Quiz session expired.")
+        self.assertEqual(stream_client.entries, [])
+        self.quiz_passing.refresh_from_db()
+        self.assertEqual(self.quiz_passing.status, UserQuizSession.Status.EXPIRED)
+
+    def test_draft_answers_resume_and_submit(self):
+        self.client.force_authenticate(user=self.user2)
+        response = self.client.get(f'/api/v1/quizzes/start-quiz/?quiz={self.quiz.id}')
+        self.assertEqual(response.data['drafts'], [])
+
+        drafts = {'session': self.quiz_passing.id, 'answers': [{"id": self.question3.id, "correct_answer": ["4"]}]}
+        response = self.client.put('/api/v1/quizzes/save-draft/', drafts, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(f'/api/v1/quizzes/start-quiz/?quiz={self.quiz.id}')
+        self.assertEqual(response.data['drafts'], [{"id": self.question3.id, "correct_answer": ["4"]}])
+
+        response = self.client.post('/api/v1/quizzes/finish-quiz/', {'session': self.quiz_passing.id}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['correct_answers'], 1)
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.put('/api/v1/quizzes/save-draft/', drafts, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_drafts_are_scoped_to_the_session_sample(self):
+        Question.objects.bulk_create([
+            Question(quiz=self.quiz, text=f"q{i}", answers=["a", "b"], correct_answer=["a"]) for i in range(20)
+        ])
+        self.quiz.question_sample_size = 5
+        self.quiz.save()
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get('/api/v1/quizzes/start-quiz/', {'quiz': self.quiz.id, 'page_size': 100})
+        session_id = response.data['session_id']
+        sampled_ids = [question['id'] for question in response.data['questions']]
+        unsampled_id = Question.objects.filter(quiz=self.quiz).exclude(id__in=sampled_ids).values_list(
+            'id', flat=True
+        ).first()
+
+        drafts = {'session': session_id, 'answers': [{"id": unsampled_id, "correct_answer": ["a"]}]}
+        response = self.client.put('/api/v1/quizzes/save-draft/', drafts, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        drafts = {'session': session_id, 'answers': [{"id": sampled_ids[0], "correct_answer": ["a"]}]}
+        response = self.client.put('/api/v1/quizzes/save-draft/', drafts, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with mock.patch('apps.quizzes.drafts.cache.get_many', wraps=cache.get_many) as get_many, \
+                mock.patch('apps.quizzes.drafts.cache.delete_many', wraps=cache.delete_many) as delete_many:
+            response = self.client.post('/api/v1/quizzes/finish-quiz/', {'session': session_id}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['correct_answers'], 1)
+        self.assertEqual(len(get_many.call_args.args[0]), 5)
+        self.assertEqual(len(delete_many.call_args.args[0]), 6)
+
+    def test_save_draft_without_session_version(self):
+        self.client.force_authenticate(user=self.user2)
+        cache.clear()
+
+        drafts = {'session': self.quiz_passing.id, 'answers': [{"id": self.question3.id, "correct_answer": ["4"]}]}
+        response = self.client.put('/api/v1/quizzes/save-draft/', drafts, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['detail'], "Quiz version is no longer available.")
+
+    def test_stateless_session_token(self):
+        self.client.force_authenticate(user=self.user)
+        sessions_count = UserQuizSession.objects.count()
+
+        with self.settings(QUIZ_SESSION_STATELESS=True):
+            response = self.client.get(f'/api/v1/quizzes/start-quiz/?quiz={self.quiz.id}')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.data['session_id'])
+        token = response.data['token']
+        self.assertEqual(UserQuizSession.objects.count(), sessions_count)
+
+        data = {'token': token, 'answers': [{"id": self.question3.id, "correct_answer": ["4"]}]}
+        response = self.client.post('/api/v1/quizzes/finish-quiz/', {**data, 'token': token + "x"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        response = self.client.post('/api/v1/quizzes/finish-quiz/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['correct_answers'], 1)
+        self.assertIsNone(QuizResult.objects.get(id=response.data['id']).session)
+
+        response = self.client.post('/api/v1/quizzes/finish-quiz/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.client.force_authenticate(user=self.user2)
+        response = self.client.post('/api/v1/quizzes/finish-quiz/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def page_through_start_quiz(self, stateless=False):
+        question_ids = []
+        tokens = set()
+        cursor = 0
+        params = {'quiz': self.quiz.id, 'page_size': 4}
+
+        with self.settings(QUIZ_SESSION_STATELESS=stateless):
+            while cursor is not None:
+                response = self.client.get('/api/v1/quizzes/start-quiz/', {**params, 'cursor': cursor})
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(response.data['total_questions'], 10)
+                question_ids.extend(question['id'] for question in response.data['questions'])
+                cursor = response.data['next_cursor']
+                if stateless:
+                    params['token'] = response.data['token']
+                    tokens.add(response.data['token'])
+
+        self.assertEqual(len(question_ids), 10)
+        self.assertEqual(question_ids, sorted(set(question_ids)))
+        if stateless:
+            self.assertEqual(len(tokens), 1)
+
+        return response, [{"id": question_id, "correct_answer": ["a"]} for question_id in question_ids]
+
+    def test_start_quiz_paged_sample(self):
+        Question.objects.bulk_create([
+            Question(quiz=self.quiz, text=f"q{i}", answers=["a", "b"], correct_answer=["a"]) for i in range(20)
+        ])
+        self.quiz.question_sample_size = 10
+        self.quiz.save()
+        self.client.force_authenticate(user=self.user)
+
+        response, user_answers = self.page_through_start_quiz()
+        response = self.client.post(
+            '/api/v1/quizzes/finish-quiz/', {'session': response.data['session_id'], 'answers': user_answers},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['total_questions'], 10)
+
+        response, user_answers = self.page_through_start_quiz(stateless=True)
+        response = self.client.post(
+            '/api/v1/quizzes/finish-quiz/', {'token': response.data['token'], 'answers': user_answers}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['total_questions'], 10)
+
+        with self.settings(QUIZ_SESSION_STATELESS=True):
+            token = self.client.get('/api/v1/quizzes/start-quiz/', {'quiz': self.quiz.id}).data['token']
+            response = self.client.get('/api/v1/quizzes/start-quiz/', {'quiz': self.quiz2.id, 'token': token})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_failed_and_top_results(self):
+        QuizResult.objects.create(
+            user=self.user2, quiz=self.quiz, correct_answers=2, total_questions=10, quiz_time=timedelta(minutes=5)
+        )
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get(f'/api/v1/quizzes/{self.quiz.id}/failed-results/?below=50')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([result['score_pct'] for result in response.data], [20.0])
+
+        response = self.client.get(f'/api/v1/quizzes/{self.quiz.id}/top-results/?limit=1')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 1)
+        self.assertEqual(response.data[0]['id'], self.user_quiz1_result.id)
+        self.assertEqual(response.data[0]['score_pct'], 80.0)
+
+    def test_single_started_session_per_quiz(self):
+        self.client.force_authenticate(user=self.user2)
+        response = self.client.get(f'/api/v1/quizzes/start-quiz/?quiz={self.quiz.id}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['session_id'], self.quiz_passing.id)
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            UserQuizSession.objects.create(user=self.user2, quiz=self.quiz)
+
+    def test_question_stats(self):
+        user_answers = [
+            {"id": self.question1.id, "correct_answer": ["answers4", "answers6"]},
+            {"id": self.question2.id, "correct_answer": ["answers2"]}
+        ]
+        self.client.force_authenticate(user=self.user2)
+        response = self.client.post(
+            '/api/v1/quizzes/finish-quiz/',
+            {'session': self.quiz_passing.id, 'answers': user_answers},
+            format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(QuizAnswer.objects.filter(result_id=response.data['id']).count(), 2)
+
+        response = self.client.get(f'/api/v1/quizzes/{self.quiz.id}/question-stats/')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(f'/api/v1/quizzes/{self.quiz.id}/question-stats/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        stats = {question['id']: question for question in response.data}
+        self.assertEqual(stats[self.question1.id]['attempts'], 1)
+        self.assertEqual(stats[self.question1.id]['correct_rate'], 100)
+        self.assertEqual(stats[self.question2.id]['correct_rate'], 0)
+        self.assertEqual(
+            stats[self.question2.id]['choice_distribution'],
+            {"answers1": 0, "answers2": 1, "answers3": 0}
+        )
+        self.assertEqual(stats[self.question3.id]['attempts'], 0)
+
+    def test_update_question_stats_merges_counts_without_row_locks(self):
+        QuestionStats.objects.create(question=self.question2, attempts=2, correct=1, choice_counts={"answers1": 2})
+        quiz_answers = [
+            QuizAnswer(question_id=self.question2.id, selected=["answers1"], is_correct=True),
+            QuizAnswer(question_id=self.question2.id, selected=["answers2", "answers3"], is_correct=False),
+            QuizAnswer(question_id=self.question3.id, selected=["answers3"], is_correct=False),
+            QuizAnswer(question_id=0, selected=["answers3"], is_correct=False),
+        ]
+
+        with CaptureQueriesContext(connection) as queries:
+            update_question_stats(quiz_answers)
+
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('FOR UPDATE', queries[0]['sql'])
+        stats = {stats.question_id: stats for stats in QuestionStats.objects.all()}
+        self.assertEqual(set(stats), {self.question2.id, self.question3.id})
+        self.assertEqual((stats[self.question2.id].attempts, stats[self.question2.id].correct), (4, 2))
+        self.assertEqual(stats[self.question2.id].choice_counts, {"answers1": 3, "answers2": 1, "answers3": 1})
+        self.assertEqual(stats[self.question3.id].choice_counts, {"answers3": 1})
+
+    def test_result_graded_against_session_version(self):
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(f'/api/v1/quizzes/start-quiz/?quiz={self.quiz.id}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['version'], 1)
+        session_id = response.data['session_id']
+
+        updated_data = {
+            "title": "new title",
+            "questions": [
+                {"id": self.question1.id, "text": "Updated", "answers": ["a", "b"], "correct_answer": ["a"]},
+                {"id": self.question2.id, "text": "text4", "answers": ["a", "b"], "correct_answer": ["b"]},
+            ]
+        }
+        response = self.client.patch(f'/api/v1/quizzes/{self.quiz.id}/', updated_data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.quiz.refresh_from_db()
+        self.assertEqual(self.quiz.current_version.number, 2)
+
+        user_answers = [
+            {"id": self.question1.id, "correct_answer": ["answers4", "answers6"]},
+            {"id": self.question3.id, "correct_answer": ["4"]}
+        ]
+        response = self.client.post(
+            '/api/v1/quizzes/finish-quiz/', {'session': session_id, 'answers': user_answers}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        quiz_result = QuizResult.objects.get(id=response.data['id'])
+        self.assertEqual(quiz_result.version.number, 1)
+        self.assertEqual(quiz_result.total_questions, 3)
+        self.assertEqual(quiz_result.correct_answers, 2)
+
+    def test_unchanged_quiz_keeps_version(self):
+        version = publish_quiz_version(self.quiz)
+        self.assertEqual(publish_quiz_version(self.quiz), version)
+        self.assertEqual(QuizVersion.objects.filter(quiz=self.quiz).count(), 1)
+
+    def test_quiz_version_etag(self):
+        version = publish_quiz_version(self.quiz)
+        self.client.force_authenticate(user=self.user)
+        url = f'/api/v1/quizzes/{self.quiz.id}/versions/{version.number}/'
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['questions']), 3)
+        self.assertEqual(response['ETag'], f'"{version.content_hash}"')
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=f'"{version.content_hash}"')
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.force_authenticate(user=self.user2)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_collect_unused_versions(self):
+        first_version = publish_quiz_version(self.quiz)
+        self.quiz_passing.version = first_version
+        self.quiz_passing.save()
+        Question.objects.filter(id=self.question3.id).update(text="changed")
+        second_version = publish_quiz_version(self.quiz)
+        Question.objects.filter(id=self.question3.id).update(text="changed again")
+        current_version = publish_quiz_version(self.quiz)
+
+        self.assertEqual(collect_unused_versions(), 0)
+
+        QuizVersion.objects.filter(id=current_version.id).update(created_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(collect_unused_versions(), 1)
+        self.assertFalse(QuizVersion.objects.filter(id=second_version.id).exists())
+        self.assertTrue(QuizVersion.objects.filter(id=first_version.id).exists())
+        self.assertTrue(QuizVersion.objects.filter(id=current_version.id).exists())
+
+    def test_collect_unused_versions_keeps_versions_of_live_tokens(self):
+        self.client.force_authenticate(user=self.user)
+        with self.settings(QUIZ_SESSION_STATELESS=True):
+            response = self.client.get(f'/api/v1/quizzes/start-quiz/?quiz={self.quiz.id}')
+        token = response.data['token']
+
+        Question.objects.filter(id=self.question3.id).update(text="changed")
+        publish_quiz_version(self.quiz)
+        self.assertEqual(collect_unused_versions(), 0)
+
+        data = {'token': token, 'answers': [{"id": self.question3.id, "correct_answer": ["4"]}]}
+        response = self.client.post('/api/v1/quizzes/finish-quiz/', data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['correct_answers'], 1)
+
     def test_user_company_score(self):
         self.client.force_authenticate(user=self.user)
         response = self.client.get(f'/api/v1/quizzes/user-company-score/?company_id={self.company.id}')
@@ -339,3 +1089,213 @@ class AnaliticTestCase(APITestCase):
             total_questions=10,
             quiz_time=timedelta(minutes=18)
         )
+
+
+class ItemAnalysisTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="user",
+            password="1Q_az_2wsx_3edc",
+            email="user@example.com"
+        )
+        self.company = Company.objects.create(name="Company", description="description", owner=self.user)
+        self.quiz = Quiz.objects.create(title="Quiz", description="description", company=self.company)
+        self.questions = [
+            Question.objects.create(quiz=self.quiz, text=f"q{i}", answers=["a", "b"], correct_answer=["a"])
+            for i in range(3)
+        ]
+        self.outcomes = [[1, 1, 0], [1, 0, 0], [1, 1, 1], [0, 0, 0]]
+
+        for row in self.outcomes:
+            result = QuizResult.objects.create(
+                user=self.user,
+                quiz=self.quiz,
+                correct_answers=sum(row),
+                total_questions=3,
+                quiz_time=timedelta(minutes=5)
+            )
+            QuizAnswer.objects.bulk_create([
+                QuizAnswer(
+                    result=result,
+                    quiz=self.quiz,
+                    question_id=question.id,
+                    selected=["a"] if correct else ["b"],
+                    is_correct=bool(correct)
+                )
+                for question, correct in zip(self.questions, row)
+            ])
+
+    def test_classical_statistics(self):
+        outcomes = np.array(self.outcomes, dtype=np.float32)
+        attempts, difficulty, discrimination = classical_statistics(outcomes, np.ones(outcomes.shape, dtype=bool))
+
+        self.assertEqual(attempts.tolist(), [4, 4, 4])
+        np.testing.assert_allclose(difficulty, [0.75, 0.5, 0.25])
+        self.assertTrue((discrimination > 0).all())
+
+    def test_discrimination_only_uses_attempts_that_answered_the_item(self):
+        rng = np.random.default_rng(0)
+        answered = rng.random((400, 6)) < 0.4
+        outcomes = ((rng.random((400, 6)) < 0.6) & answered).astype(np.float32)
+        outcomes[:, 0] = answered[:, 0] & (outcomes[:, 1:].sum(axis=1) >= 1)
+
+        _, _, discrimination = classical_statistics(outcomes, answered)
+
+        totals = outcomes.sum(axis=1)
+        for column in range(outcomes.shape[1]):
+            rows = answered[:, column]
+            expected = np.corrcoef(outcomes[rows, column], totals[rows] - outcomes[rows, column])[0, 1]
+            self.assertAlmostEqual(discrimination[column], expected, places=6)
+
+    def test_analyze_quiz_writes_question_stats(self):
+        self.assertEqual(analyze_quiz(self.quiz.id, irt=True), 3)
+
+        stats = {stats.question_id: stats for stats in QuestionStats.objects.filter(question__quiz=self.quiz)}
+        self.assertEqual(stats[self.questions[0].id].analyzed_attempts, 4)
+        self.assertEqual(stats[self.questions[1].id].difficulty, 0.5)
+        self.assertLess(stats[self.questions[0].id].irt_difficulty, stats[self.questions[2].id].irt_difficulty)
+        self.assertIsNotNone(stats[self.questions[2].id].analyzed_at)
+
+
+class QuestionImportTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="owner",
+            password="1Q_az_2wsx_3edc",
+            email="owner@example.com"
+        )
+        self.user2 = User.objects.create_user(
+            username="user",
+            password="1Q_az_2wsx_3edc",
+            email="user@example.com"
+        )
+        self.company = Company.objects.create(name="Company", description="description", owner=self.user)
+        CompanyMember.objects.create(user=self.user, company=self.company, role=CompanyMember.Role.ADMIN)
+        CompanyMember.objects.create(user=self.user2, company=self.company, role=CompanyMember.Role.MEMBER)
+        self.quiz = Quiz.objects.create(title="Quiz", description="description", company=self.company)
+        self.url = f'/api/v1/quizzes/{self.quiz.id}/import-questions/'
+
+    def test_import_csv(self):
+        stream = io.BytesIO(
+            b"text,answers,correct_answer\n"
+            b"Q1,a|b|c,a\n"
+            b"Q2,x|y,x|y\n"
+        )
+        report = import_questions(self.quiz, stream, FileType.CSV, batch_size=1)
+
+        self.assertEqual(report, {'imported': 2, 'error_count': 0, 'errors': []})
+        question = Question.objects.get(quiz=self.quiz, text="Q2")
+        self.assertEqual(question.correct_answer, ["x", "y"])
+        self.quiz.refresh_from_db()
+        self.assertEqual(len(self.quiz.current_version.content), 2)
+
+    def test_import_json_endpoint(self):
+        self.client.force_authenticate(user=self.user)
+        upload = SimpleUploadedFile(
+            "questions.json",
+            b'[{"text": "Q1", "answers": ["a", "b"], "correct_answer": ["b"]},'
+            b' {"text": "Q2", "answers": ["c", "d"], "correct_answer": ["c"]}]'
+        )
+
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['imported'], 2)
+        self.assertEqual(Question.objects.filter(quiz=self.quiz).count(), 2)
+
+    def test_import_rolls_back_on_invalid_rows(self):
+        self.client.force_authenticate(user=self.user)
+        upload = SimpleUploadedFile(
+            "questions.csv",
+            b"text,answers,correct_answer\nQ1,a|b,a\nQ2,a,z\n"
+        )
+
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['errors'][0]['row'], 2)
+        self.assertFalse(Question.objects.filter(quiz=self.quiz).exists())
+
+    def test_import_forbidden_for_member(self):
+        self.client.force_authenticate(user=self.user2)
+        upload = SimpleUploadedFile("questions.csv", b"text,answers,correct_answer\nQ1,a|b,a\n")
+
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_iter_json_array_keeps_values_split_across_reads(self):
+        document = ' [12345, "a,]\\"b", {"c": [1, 2]}, true, null]'
+
+        for read_size in (1, 2, 3, 7):
+            self.assertEqual(
+                list(iter_json_array(io.StringIO(document), read_size=read_size)),
+                [12345, 'a,]"b', {"c": [1, 2]}, True, None]
+            )
+
+    def test_iter_json_array_fails_on_first_malformed_element(self):
+        stream = io.StringIO('[1, tru e, ' + ', '.join(['2'] * 10000) + ']')
+        items = iter_json_array(stream, read_size=16)
+
+        self.assertEqual(next(items), 1)
+        with self.assertRaises(ValueError):
+            next(items)
+        self.assertLess(stream.tell(), 64)
+
+
+class QuizSessionSweepTestCase(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="user",
+            password="1Q_az_2wsx_3edc",
+            email="user@example.com"
+        )
+        self.company = Company.objects.create(name="Company", description="description", owner=self.user)
+        self.quiz = Quiz.objects.create(title="Quiz", description="description", company=self.company)
+        self.short_quiz = Quiz.objects.create(
+            title="Short quiz", description="description", company=self.company, time_limit_minutes=10
+        )
+
+    def create_session(self, quiz, started_minutes_ago, **kwargs):
+        quiz_session = UserQuizSession.objects.create(user=self.user, quiz=quiz, **kwargs)
+        UserQuizSession.objects.filter(id=quiz_session.id).update(
+            start_session_time=timezone.now() - timedelta(minutes=started_minutes_ago)
+        )
+        return quiz_session
+
+    def test_expire_stale_sessions(self):
+        with self.settings(QUIZ_SESSION_TIME_LIMIT_MINUTES=60):
+            fresh_session = self.create_session(self.quiz, 30)
+            stale_session = self.create_session(self.short_quiz, 30)
+
+            self.assertEqual(expire_stale_sessions(batch_size=1), 1)
+
+        fresh_session.refresh_from_db()
+        stale_session.refresh_from_db()
+        self.assertEqual(fresh_session.status, UserQuizSession.Status.STARTED)
+        self.assertEqual(stale_session.status, UserQuizSession.Status.EXPIRED)
+        self.assertIsNotNone(stale_session.end_session_time)
+
+    def test_compact_finished_sessions(self):
+        old_end_time = timezone.now() - timedelta(days=200)
+        with_result = self.create_session(
+            self.quiz, 300000, status=UserQuizSession.Status.COMPLETED, end_session_time=old_end_time
+        )
+        without_result = self.create_session(
+            self.short_quiz, 300000, status=UserQuizSession.Status.COMPLETED, end_session_time=old_end_time
+        )
+        quiz_result = QuizResult.objects.create(
+            user=self.user, quiz=self.quiz, session=with_result, correct_answers=1, total_questions=1,
+            quiz_time=timedelta(minutes=5)
+        )
+        QuizResult.objects.create(
+            user=self.user, quiz=self.short_quiz, correct_answers=1, total_questions=1, quiz_time=timedelta(minutes=5)
+        )
+
+        with self.settings(QUIZ_SESSION_COMPACTION_ENABLED=True, QUIZ_SESSION_RETENTION_DAYS=90):
+            self.assertEqual(compact_finished_sessions(), 1)
+
+        self.assertFalse(UserQuizSession.objects.filter(id=with_result.id).exists())
+        self.assertTrue(UserQuizSession.objects.filter(id=without_result.id).exists())
+        quiz_result.refresh_from_db()
+        self.assertIsNone(quiz_result.session)
@@ -0,0 +1,55 @@
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from uuid import uuid4
+
+from django.core import signing
+from django.core.cache import cache
+from django.utils import timezone
+
+from .models import Quiz, QuizVersion
+from .sessions import session_time_limit
+
+SESSION_TOKEN_SALT = 'apps.quizzes.session-token'
+CONSUMED_TOKEN_GRACE_SECONDS = 60
+
+
+def issue_session_token(user_id: int, quiz: Quiz, version: QuizVersion) -> tuple[str, dict]:
+    claims = {
+        'jti': uuid4().hex,
+        'user': user_id,
+        'quiz': quiz.id,
+        'version': version.id,
+        'start': timezone.now().timestamp(),
+        'limit': int(session_time_limit(quiz).total_seconds()),
+        'sample': quiz.question_sample_size,
+    }
+    return signing.dumps(claims, salt=SESSION_TOKEN_SALT, compress=True), claims
+
+
+def load_session_token(token: str, user_id: int) -> dict | None:
+    try:
+        claims = signing.loads(token, salt=SESSION_TOKEN_SALT)
+    except signing.BadSignature:
+        return None
+
+    if claims.get('user') != user_id:
+        return None
+
+    return claims
+
+
+def token_start_time(claims: dict) -> datetime:
+    return datetime.fromtimestamp(claims['start'], tz=dt_timezone.utc)
+
+
+def is_token_expired(claims: dict, end_time: datetime) -> bool:
+    return (end_time - token_start_time(claims)).total_seconds() > claims['limit']
+
+
+def consume_session_token(claims: dict, end_time: datetime) -> bool:
+    remaining = claims['start'] + claims['limit'] - end_time.timestamp()
+    return cache.add(f"quiz_token:{claims['jti']}", True, max(int(remaining), 0) + CONSUMED_TOKEN_GRACE_SECONDS)
+
+
+def release_session_token(claims: dict) -> None:
+    cache.delete(f"quiz_token:{claims['jti']}")
@@ -1,11 +1,26 @@
-from typing import Union
+import csv
+import io
+import json
+import re
+from itertools import islice
+from typing import Iterator, Union
 
+from django.conf import settings
+from django.db import connection, transaction
 from django.db.models.query import QuerySet
 from django.http import HttpResponse
+from django.utils import timezone
 
 from .enums import FileType, ScoreIdType
-from .models import QuizResult
-from .resources import QuizResultResource
+from .models import Question, QuestionStats, Quiz, QuizAnswer, QuizResult, UserQuizSession
+from .resources import QuestionResource, QuizResultResource
+from .sessions import expire_overdue_sessions, session_deadline_expression
+from .versioning import get_quiz_version, get_session_answer_key, get_session_version, publish_quiz_version
+
+MAX_REPORTED_IMPORT_ERRORS = 1000
+JSON_READ_SIZE = 64 * 1024
+JSON_STRUCTURE_TOKENS = re.compile(r'["\[\]{},]')
+JSON_STRING_TOKENS = re.compile(r'["\\]')
 
 
 def export_quiz_results(quiz_results: Union[QuerySet, list], file_type: FileType):
@@ -34,10 +49,7 @@ def create_users_analytics(dynamic_scores_data: QuerySet[QuizResult], id_type: S
     for record in dynamic_scores_data:
         group_id = record[id_type.value]
         date = record['created_at']
-        correct_answers = record['correct_answers']
-        total_questions = record['total_questions']
-
-        score = round((correct_answers / total_questions) * 100, 2)
+        score = round(record['score_pct'] or 0, 2)
 
         if group_id not in dynamic_scores:
             dynamic_scores[group_id] = {'scores': [], 'total_score': 0, 'count': 0}
@@ -63,10 +75,7 @@ def create_current_user_analytics(dynamic_scores_data: QuerySet[QuizResult]) ->
 
     for record in dynamic_scores_data:
         date = record['created_at']
-        correct_answers = record['correct_answers']
-        total_questions = record['total_questions']
-
-        score = round((correct_answers / total_questions) * 100, 2)
+        score = round(record['score_pct'] or 0, 2)
 
         total_score += score
         count += 1
@@ -74,4 +83,517 @@ def create_current_user_analytics(dynamic_scores_data: QuerySet[QuizResult]) ->
         average_score = round(total_score / count, 2)
         user_scores.append({'date': date, 'score': average_score})
 
-    return user_scores
\ No newline at end of file
+    return user_scores
+
+
+QUESTION_SYNC_FIELDS = ('text', 'answers', 'correct_answer')
+
+
+def sync_quiz_questions(quiz: Quiz, questions_data: list) -> dict:
+    current_questions = {question.id: question for question in quiz.questions.all()}
+    submitted_ids = set()
+    questions_to_create = []
+    questions_to_update = []
+    changed_fields = set()
+
+    for question_data in questions_data:
+        question_id = question_data.get('id')
+
+        if question_id is None:
+            questions_to_create.append(
+                Question(quiz=quiz, **{field: question_data[field] for field in QUESTION_SYNC_FIELDS})
+            )
+            continue
+
+        submitted_ids.add(question_id)
+        question = current_questions.get(question_id)
+        if question is None:
+            continue
+
+        question_changes = [
+            field for field in QUESTION_SYNC_FIELDS if getattr(question, field) != question_data[field]
+        ]
+        for field in question_changes:
+            setattr(question, field, question_data[field])
+
+        if question_changes:
+            changed_fields.update(question_changes)
+            questions_to_update.append(question)
+
+    deleted_ids = set(current_questions) - submitted_ids if submitted_ids else set()
+    write_question_changes(questions_to_create, questions_to_update, changed_fields, deleted_ids)
+
+    return {
+        'created': len(questions_to_create),
+        'updated': len(questions_to_update),
+        'deleted': len(deleted_ids),
+    }
+
+
+def write_question_changes(questions_to_create: list, questions_to_update: list, changed_fields: set,
+                           deleted_ids: set) -> None:
+    with transaction.atomic():
+        if deleted_ids:
+            Question.objects.filter(id__in=deleted_ids).delete()
+
+        if questions_to_create:
+            Question.objects.bulk_create(questions_to_create)
+
+        if questions_to_update:
+            Question.objects.bulk_update(
+                questions_to_update, [field for field in QUESTION_SYNC_FIELDS if field in changed_fields]
+            )
+
+
+def grade_answers(answer_key: dict, user_answers: list) -> int:
+    submitted = {user_answer['id']: sorted(user_answer['correct_answer']) for user_answer in user_answers}
+    return sum(1 for question_id, answers in submitted.items() if answer_key.get(question_id) == answers)
+
+
+def build_quiz_answers(quiz_result: QuizResult, answer_key: dict, user_answers: list) -> list:
+    submitted = {user_answer['id']: sorted(user_answer['correct_answer']) for user_answer in user_answers}
+
+    return [
+        QuizAnswer(
+            result=quiz_result,
+            quiz_id=quiz_result.quiz_id,
+            question_id=question_id,
+            selected=answers,
+            is_correct=answer_key[question_id] == answers
+        )
+        for question_id, answers in submitted.items() if question_id in answer_key
+    ]
+
+
+def update_question_stats(quiz_answers: list) -> None:
+    deltas = {}
+    for quiz_answer in quiz_answers:
+        delta = deltas.setdefault(
+            quiz_answer.question_id,
+            {'question_id': quiz_answer.question_id, 'attempts': 0, 'correct': 0, 'choice_counts': {}}
+        )
+        delta['attempts'] += 1
+        delta['correct'] += quiz_answer.is_correct
+        for choice in quiz_answer.selected:
+            delta['choice_counts'][choice] = delta['choice_counts'].get(choice, 0) + 1
+
+    if not deltas:
+        return
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {QuestionStats._meta.db_table} AS stats "
+            "(question_id, attempts, correct, choice_counts, analyzed_attempts) "
+            "SELECT delta.question_id, delta.attempts, delta.correct, delta.choice_counts, 0 "
+            "FROM jsonb_to_recordset(%s::jsonb) "
+            "AS delta(question_id bigint, attempts integer, correct integer, choice_counts jsonb) "
+            f"JOIN {Question._meta.db_table} AS question ON question.id = delta.question_id "
+            "ORDER BY delta.question_id "
+            "ON CONFLICT (question_id) DO UPDATE SET "
+            "attempts = stats.attempts + EXCLUDED.attempts, "
+            "correct = stats.correct + EXCLUDED.correct, "
+            "choice_counts = stats.choice_counts || ("
+            "SELECT COALESCE(jsonb_object_agg("
+            "choice.key, COALESCE((stats.choice_counts ->> choice.key)::integer, 0) + choice.value::integer"
+            "), '{}'::jsonb) "
+            "FROM jsonb_each_text(EXCLUDED.choice_counts) AS choice"
+            ")",
+            [json.dumps(list(deltas.values()))]
+        )
+
+
+def record_quiz_answers(quiz_result: QuizResult, answer_key: dict, user_answers: list) -> None:
+    quiz_answers = build_quiz_answers(quiz_result, answer_key, user_answers)
+
+    with transaction.atomic():
+        QuizAnswer.objects.bulk_create(quiz_answers)
+        update_question_stats(quiz_answers)
+
+
+def question_errors(question_data: dict) -> list:
+    errors = []
+    answers = question_data.get('answers') or []
+    correct_answer = question_data.get('correct_answer') or []
+
+    if not question_data.get('text'):
+        errors.append("Question text is required.")
+    if len(answers) < 2:
+        errors.append("Each question must have at least two answer options.")
+    if any(len(answer) > 100 for answer in answers):
+        errors.append("Answer options must be at most 100 characters long.")
+    if len(correct_answer) == 0:
+        errors.append("Each question must have at least one correct answer.")
+    if not set(correct_answer).issubset(set(answers)):
+        errors.append("Correct answers must be among the answer options.")
+
+    return errors
+
+
+def find_json_element_end(buffer: str) -> int | None:
+    depth = 0
+    position = 0
+    in_string = False
+
+    while match := (JSON_STRING_TOKENS if in_string else JSON_STRUCTURE_TOKENS).search(buffer, position):
+        char = match.group()
+        position = match.end()
+
+        if in_string:
+            if char == '\\':
+                position += 1
+            else:
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '[{':
+            depth += 1
+        elif depth and char in ']}':
+            depth -= 1
+        elif not depth:
+            return match.start()
+
+    return None
+
+
+def iter_json_array(stream, read_size: int = JSON_READ_SIZE) -> Iterator:
+    decoder = json.JSONDecoder()
+    buffer = ''
+    exhausted = False
+
+    while not buffer and (chunk := stream.read(read_size)):
+        buffer = chunk.lstrip()
+
+    if not buffer.startswith('['):
+        raise ValueError("Expected a JSON array.")
+    buffer = buffer[1:]
+
+    while True:
+        end = find_json_element_end(buffer)
+
+        if end is None:
+            if exhausted:
+                raise ValueError("Invalid JSON document.")
+            chunk = stream.read(read_size)
+            exhausted = not chunk
+            buffer += chunk
+            continue
+
+        element, delimiter, buffer = buffer[:end].strip(), buffer[end], buffer[end + 1:]
+
+        if element:
+            try:
+                item = decoder.decode(element)
+            except json.JSONDecodeError:
+                raise ValueError("Invalid JSON document.")
+            yield item
+        elif delimiter == ',':
+            raise ValueError("Invalid JSON document.")
+
+        if delimiter == ']':
+            return
+        if delimiter != ',':
+            raise ValueError("Invalid JSON document.")
+
+
+def iter_question_rows(stream, file_type: FileType) -> Iterator:
+    text_stream = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+
+    if file_type == FileType.CSV:
+        return csv.DictReader(text_stream)
+    elif file_type == FileType.JSON:
+        return iter_json_array(text_stream)
+    raise ValueError("Unsupported type")
+
+
+def import_questions(quiz: Quiz, stream, file_type: FileType, batch_size: int | None = None,
+                     skip_invalid: bool = False) -> dict:
+    batch_size = batch_size or settings.QUIZ_IMPORT_BATCH_SIZE
+    resource = QuestionResource()
+    rows = enumerate(iter_question_rows(stream, file_type), start=1)
+    errors = []
+    error_count = 0
+    imported_count = 0
+
+    with transaction.atomic():
+        while chunk := list(islice(rows, batch_size)):
+            questions = []
+
+            for row_number, row in chunk:
+                if not isinstance(row, dict):
+                    row_errors = ["Row must be an object."]
+                else:
+                    try:
+                        question_data = resource.clean_row(row)
+                        row_errors = question_errors(question_data)
+                    except (KeyError, ValueError, AttributeError) as e:
+                        row_errors = [str(e.args[0]) if e.args else str(e)]
+
+                if row_errors:
+                    error_count += 1
+                    if len(errors) < MAX_REPORTED_IMPORT_ERRORS:
+                        errors.append({'row': row_number, 'errors': row_errors})
+                    continue
+
+                questions.append(Question(quiz=quiz, **question_data))
+
+            if error_count and not skip_invalid:
+                continue
+
+            Question.objects.bulk_create(questions)
+            imported_count += len(questions)
+
+        if error_count and not skip_invalid:
+            transaction.set_rollback(True)
+            imported_count = 0
+        elif imported_count:
+            publish_quiz_version(quiz)
+
+    return {'imported': imported_count, 'error_count': error_count, 'errors': errors}
+
+
+def complete_quiz_session(session_id: int, user_id: int, end_time) -> UserQuizSession | None:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {UserQuizSession._meta.db_table} AS quiz_session "
+            "SET status = %s, end_session_time = %s, updated_at = %s "
+            f"FROM {Quiz._meta.db_table} AS quiz "
+            "WHERE quiz_session.id = %s AND quiz_session.user_id = %s AND quiz_session.status = %s "
+            "AND quiz.id = quiz_session.quiz_id "
+            "AND quiz_session.start_session_time + COALESCE(quiz.time_limit_minutes, %s) * interval '1 minute' >= %s "
+            "RETURNING quiz_session.quiz_id, quiz_session.version_id, quiz_session.question_sample_size, "
+            "quiz_session.start_session_time",
+            [
+                UserQuizSession.Status.COMPLETED, end_time, end_time,
+                session_id, user_id, UserQuizSession.Status.STARTED,
+                settings.QUIZ_SESSION_TIME_LIMIT_MINUTES, end_time
+            ]
+        )
+        row = cursor.fetchone()
+
+    if row is None:
+        return None
+
+    quiz_id, version_id, question_sample_size, start_session_time = row
+    return UserQuizSession(
+        id=session_id,
+        user_id=user_id,
+        quiz_id=quiz_id,
+        version_id=version_id,
+        question_sample_size=question_sample_size,
+        status=UserQuizSession.Status.COMPLETED,
+        start_session_time=start_session_time,
+        end_session_time=end_time
+    )
+
+
+def submit_quiz_session(user_id: int, session_id: int, user_answers: list,
+                        idempotency_key: str | None = None) -> QuizResult | None:
+    end_time = timezone.now()
+
+    with transaction.atomic():
+        quiz_session = complete_quiz_session(session_id, user_id, end_time)
+
+        if quiz_session is None:
+            expire_overdue_sessions(UserQuizSession.objects.filter(id=session_id, user_id=user_id), end_time)
+            return None
+
+        version = get_session_version(quiz_session)
+        answer_key = get_session_answer_key(version, quiz_session.id, quiz_session.question_sample_size)
+
+        quiz_result = QuizResult.objects.create(
+            user_id=user_id,
+            quiz_id=quiz_session.quiz_id,
+            version=version,
+            session_id=quiz_session.id,
+            idempotency_key=idempotency_key,
+            correct_answers=grade_answers(answer_key, user_answers),
+            total_questions=len(answer_key),
+            quiz_time=quiz_session.end_session_time - quiz_session.start_session_time
+        )
+        record_quiz_answers(quiz_result, answer_key, user_answers)
+
+    return quiz_result
+
+
+def grade_submission(quiz_session: UserQuizSession, user_answers: list, end_time,
+                     idempotency_key: str | None = None) -> dict:
+    version = get_session_version(quiz_session)
+    answer_key = get_session_answer_key(version, quiz_session.id, quiz_session.question_sample_size)
+
+    return {
+        'session_id': quiz_session.id,
+        'user_id': quiz_session.user_id,
+        'quiz_id': quiz_session.quiz_id,
+        'version_id': version.id,
+        'question_sample_size': quiz_session.question_sample_size,
+        'answers': user_answers,
+        'correct_answers': grade_answers(answer_key, user_answers),
+        'total_questions': len(answer_key),
+        'end_time': end_time,
+        'idempotency_key': idempotency_key,
+    }
+
+
+def persist_graded_submissions(submissions: list) -> dict:
+    submissions_by_session = {}
+    for submission in submissions:
+        submissions_by_session.setdefault(submission['session_id'], submission)
+
+    with transaction.atomic():
+        quiz_sessions = list(
+            UserQuizSession.objects.select_for_update(of=('self',)).filter(
+                id__in=submissions_by_session,
+                status__in=[UserQuizSession.Status.STARTED, UserQuizSession.Status.EXPIRED]
+            ).annotate(deadline=session_deadline_expression()).order_by('id')
+        )
+        idempotency_keys = {
+            (submission['user_id'], submission['idempotency_key'])
+            for submission in submissions_by_session.values() if submission['idempotency_key']
+        }
+        used_keys = set(
+            QuizResult.objects.filter(
+                user_id__in={user_id for user_id, _ in idempotency_keys},
+                idempotency_key__in={key for _, key in idempotency_keys}
+            ).values_list('user_id', 'idempotency_key')
+        ) if idempotency_keys else set()
+
+        now = timezone.now()
+        updated_sessions = []
+        quiz_results = []
+
+        for quiz_session in quiz_sessions:
+            submission = submissions_by_session[quiz_session.id]
+            if quiz_session.user_id != submission['user_id']:
+                continue
+
+            if submission['end_time'] > quiz_session.deadline:
+                if quiz_session.status == UserQuizSession.Status.STARTED:
+                    quiz_session.status = UserQuizSession.Status.EXPIRED
+                    quiz_session.end_session_time = now
+                    quiz_session.updated_at = now
+                    updated_sessions.append(quiz_session)
+                continue
+
+            idempotency_key = submission['idempotency_key']
+            if (quiz_session.user_id, idempotency_key) in used_keys:
+                idempotency_key = None
+            elif idempotency_key:
+                used_keys.add((quiz_session.user_id, idempotency_key))
+
+            quiz_session.status = UserQuizSession.Status.COMPLETED
+            quiz_session.end_session_time = submission['end_time']
+            quiz_session.updated_at = now
+            updated_sessions.append(quiz_session)
+            quiz_results.append(QuizResult(
+                user_id=quiz_session.user_id,
+                quiz_id=quiz_session.quiz_id,
+                version_id=submission['version_id'],
+                session_id=quiz_session.id,
+                idempotency_key=idempotency_key,
+                correct_answers=submission['correct_answers'],
+                total_questions=submission['total_questions'],
+                quiz_time=submission['end_time'] - quiz_session.start_session_time
+            ))
+
+        UserQuizSession.objects.bulk_update(updated_sessions, ['status', 'end_session_time', 'updated_at'])
+        QuizResult.objects.bulk_create(quiz_results)
+
+        quiz_answers = []
+        for quiz_result in quiz_results:
+            submission = submissions_by_session[quiz_result.session_id]
+            answer_key = get_session_answer_key(
+                get_quiz_version(quiz_result.version_id), quiz_result.session_id, submission.get('question_sample_size')
+            )
+            quiz_answers.extend(build_quiz_answers(quiz_result, answer_key, submission['answers']))
+
+        QuizAnswer.objects.bulk_create(quiz_answers)
+        update_question_stats(quiz_answers)
+
+    return {quiz_result.session_id: quiz_result for quiz_result in quiz_results}
+
+
+def submit_quiz_sessions_batch(user_id: int, items: list, queued_session_ids: set = frozenset()) -> list:
+    session_ids = {item['session'] for item in items}
+    idempotency_keys = {item['idempotency_key'] for item in items if item.get('idempotency_key')}
+
+    quiz_sessions = {
+        quiz_session.id: quiz_session
+        for quiz_session in UserQuizSession.objects.filter(id__in=session_ids, user_id=user_id).only(
+            'id', 'user_id', 'quiz_id', 'version_id', 'question_sample_size', 'status'
+        )
+    }
+    previous_results = {
+        quiz_result.idempotency_key: quiz_result
+        for quiz_result in QuizResult.objects.filter(user_id=user_id, idempotency_key__in=idempotency_keys)
+    } if idempotency_keys else {}
+
+    end_time = timezone.now()
+    overdue_ids = expire_overdue_sessions(
+        UserQuizSession.objects.filter(id__in=session_ids, user_id=user_id), end_time
+    )
+    outcomes = []
+    submissions = []
+    seen_session_ids = set()
+    seen_idempotency_keys = set()
+
+    for item in items:
+        session_id = item['session']
+        idempotency_key = item.get('idempotency_key')
+        quiz_session = quiz_sessions.get(session_id)
+        outcome = {'session': session_id, 'status': 'created', 'result': None}
+        outcomes.append(outcome)
+
+        if idempotency_key in previous_results:
+            outcome.update(status='replayed', result=previous_results[idempotency_key])
+        elif session_id in seen_session_ids:
+            outcome['status'] = 'duplicate'
+        elif idempotency_key and idempotency_key in seen_idempotency_keys:
+            outcome['status'] = 'idempotency_key_reused'
+        elif quiz_session is None:
+            outcome['status'] = 'not_found'
+        elif quiz_session.status == UserQuizSession.Status.EXPIRED or session_id in overdue_ids:
+            outcome['status'] = 'expired'
+        elif quiz_session.status != UserQuizSession.Status.STARTED:
+            outcome['status'] = 'already_completed'
+        elif session_id in queued_session_ids:
+            outcome['status'] = 'queued'
+        else:
+            submissions.append(grade_submission(quiz_session, item['answers'], end_time, idempotency_key))
+
+        seen_session_ids.add(session_id)
+        if idempotency_key:
+            seen_idempotency_keys.add(idempotency_key)
+
+    persisted = persist_graded_submissions(submissions) if submissions else {}
+
+    for outcome in outcomes:
+        if outcome['status'] == 'created':
+            outcome['result'] = persisted.get(outcome['session'])
+            if outcome['result'] is None:
+                outcome['status'] = 'already_completed'
+
+    return outcomes
+
+
+def submit_quiz_token(user_id: int, claims: dict, user_answers: list, start_session_time, end_time,
+                      idempotency_key: str | None = None) -> QuizResult | None:
+    version = get_quiz_version(claims['version'])
+
+    if version is None:
+        return None
+
+    answer_key = get_session_answer_key(version, claims['jti'], claims.get('sample'))
+
+    with transaction.atomic():
+        quiz_result = QuizResult.objects.create(
+            user_id=user_id,
+            quiz_id=claims['quiz'],
+            version=version,
+            idempotency_key=idempotency_key,
+            correct_answers=grade_answers(answer_key, user_answers),
+            total_questions=len(answer_key),
+            quiz_time=end_time - start_session_time
+        )
+        record_quiz_answers(quiz_result, answer_key, user_answers)
+
+    return quiz_result
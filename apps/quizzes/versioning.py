@@ -0,0 +1,138 @@
+import hashlib
+import json
+import random
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from tools.metrics import record_cache_lookup
+
+from .models import Question, Quiz, QuizResult, QuizVersion, UserQuizSession
+
+
+def _version_cache_key(version_id: int) -> str:
+    return f'quiz_version:{version_id}'
+
+
+def build_quiz_content(quiz: Quiz) -> list:
+    questions = Question.objects.filter(quiz=quiz).order_by('id').values('id', 'text', 'answers', 'correct_answer')
+    return list(questions)
+
+
+def hash_quiz_content(content: list) -> str:
+    serialized = json.dumps(content, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
+
+def publish_quiz_version(quiz: Quiz) -> QuizVersion:
+    content = build_quiz_content(quiz)
+    content_hash = hash_quiz_content(content)
+
+    with transaction.atomic():
+        current_version_id = Quiz.objects.select_for_update().filter(
+            id=quiz.id
+        ).values_list('current_version', flat=True).first()
+
+        current_version = get_quiz_version(current_version_id) if current_version_id else None
+        if current_version and current_version.content_hash == content_hash:
+            quiz.current_version = current_version
+            return current_version
+
+        last_number = QuizVersion.objects.filter(quiz=quiz).aggregate(Max('number'))['number__max'] or 0
+        version = QuizVersion.objects.create(
+            quiz=quiz,
+            number=last_number + 1,
+            content=content,
+            content_hash=content_hash
+        )
+        Quiz.objects.filter(id=quiz.id).update(current_version=version)
+
+    quiz.current_version = version
+    cache.set(_version_cache_key(version.id), version, timeout=None)
+    return version
+
+
+def get_quiz_version(version_id: int) -> QuizVersion | None:
+    key = _version_cache_key(version_id)
+    version = cache.get(key)
+    record_cache_lookup('quiz_version', version is not None)
+
+    if version is None:
+        version = QuizVersion.objects.filter(id=version_id).first()
+        if version is not None:
+            cache.set(key, version, timeout=None)
+
+    return version
+
+
+def get_current_quiz_version(quiz: Quiz) -> QuizVersion:
+    if quiz.current_version_id:
+        version = get_quiz_version(quiz.current_version_id)
+        if version is not None:
+            return version
+
+    return publish_quiz_version(quiz)
+
+
+def get_session_version(quiz_session: UserQuizSession, quiz: Quiz | None = None) -> QuizVersion:
+    version = get_quiz_version(quiz_session.version_id) if quiz_session.version_id else None
+    return version or get_current_quiz_version(quiz or quiz_session.quiz)
+
+
+def get_answer_key(version: QuizVersion, questions: list | None = None) -> dict:
+    questions = version.content if questions is None else questions
+    return {question['id']: sorted(question['correct_answer']) for question in questions}
+
+
+def get_session_questions(version: QuizVersion, seed, sample_size: int | None = None) -> list:
+    questions = version.content
+
+    if sample_size and sample_size < len(questions):
+        indexes = random.Random(f'{version.id}:{seed}').sample(range(len(questions)), sample_size)
+        questions = [questions[index] for index in sorted(indexes)]
+
+    return questions
+
+
+def get_session_answer_key(version: QuizVersion, seed, sample_size: int | None = None) -> dict:
+    return get_answer_key(version, get_session_questions(version, seed, sample_size))
+
+
+def version_retention_cutoff():
+    longest_limit = max(
+        settings.QUIZ_SESSION_TIME_LIMIT_MINUTES,
+        Quiz.objects.aggregate(Max('time_limit_minutes'))['time_limit_minutes__max'] or 0
+    )
+    return timezone.now() - timedelta(minutes=longest_limit, seconds=settings.QUIZ_SESSION_CLOCK_SKEW_SECONDS)
+
+
+def collect_unused_versions(batch_size: int = 500) -> int:
+    replaced_at = QuizVersion.objects.filter(
+        quiz=OuterRef('quiz'), number__gt=OuterRef('number')
+    ).order_by('number').values('created_at')[:1]
+    unused_versions = QuizVersion.objects.annotate(
+        replaced_at=Coalesce(Subquery(replaced_at), 'created_at')
+    ).filter(
+        ~Exists(Quiz.objects.filter(current_version=OuterRef('pk'))),
+        ~Exists(UserQuizSession.objects.filter(version=OuterRef('pk'))),
+        ~Exists(QuizResult.objects.filter(version=OuterRef('pk'))),
+        replaced_at__lt=version_retention_cutoff(),
+    ).order_by('id')
+
+    deleted_count = 0
+    while True:
+        ids = list(unused_versions.values_list('id', flat=True)[:batch_size])
+
+        if not ids:
+            break
+
+        QuizVersion.objects.filter(id__in=ids).delete()
+        cache.delete_many([_version_cache_key(version_id) for version_id in ids])
+        deleted_count += len(ids)
+
+    return deleted_count
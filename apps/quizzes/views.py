@@ -1,57 +1,263 @@
-from django.db.models import Max, Q, Sum
+import csv
+
+from django.conf import settings
+from django.db import IntegrityError
+from django.db.models import Count, Sum
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 from django.utils.timezone import make_aware
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.exceptions import PermissionDenied
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 
-from apps.companies.models import Company, CompanyMember
-
+from apps.companies.models import Company
+from apps.companies.utils import ADMIN_ROLES, get_member_role, is_company_admin_or_owner, is_company_member
+from tools.pagination import CreatedAtCursorPagination
+from tools.profiling import ProfiledViewMixin
+
+from .drafts import (
+    clear_drafts,
+    get_draft_answers,
+    get_draft_session,
+    merge_draft_answers,
+    remember_draft_session,
+    save_draft_answers,
+)
 from .enums import FileType, ScoreIdType
-from .models import Quiz, QuizResult, UserQuizSession
+from .ingestion import enqueue_quiz_submission, get_queued_session_ids
+from .models import Question, Quiz, QuizResult, QuizVersion, UserQuizSession
 from .permissions import IsCompanyAdminOrOwner
 from .serializers import (
     DynamicScoreSerializer,
     DynamicTimeScoreSerializer,
+    QuestionBatchSerializer,
+    QuestionSerializer,
+    QuestionStatsSerializer,
+    QuizBatchSubmissionSerializer,
+    QuizDraftSerializer,
     QuizForUserSerializer,
     QuizLastCompletionSerializers,
+    QuizListSerializer,
     QuizResultSerializer,
     QuizSerializer,
     QuizStartSessionSerializer,
+    QuizSubmissionOutcomeSerializer,
+    QuizSubmissionSerializer,
+    QuizVersionSerializer,
+)
+from .sessions import expire_sessions, is_session_expired, session_time_limit
+from .tokens import (
+    consume_session_token,
+    is_token_expired,
+    issue_session_token,
+    load_session_token,
+    release_session_token,
+    token_start_time,
+)
+from .utils import (
+    create_current_user_analytics,
+    create_users_analytics,
+    export_quiz_results,
+    import_questions,
+    submit_quiz_session,
+    submit_quiz_sessions_batch,
+    submit_quiz_token,
 )
-from .utils import create_current_user_analytics, create_users_analytics, export_quiz_results
+from .versioning import get_current_quiz_version, get_quiz_version, get_session_questions, get_session_version
 
 
-class QuizViewSet(viewsets.ModelViewSet):
+class QuizViewSet(ProfiledViewMixin, viewsets.ModelViewSet):
     queryset = Quiz.objects.all()
     serializer_class = QuizSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = CreatedAtCursorPagination
+    profiled_actions = (
+        'user_company_average_score', 'user_rating', 'export_result', 'export_company_results',
+        'quizzes_last_completions', 'users_dynamic_scores', 'current_user_dynamic_scores', 'user_last_completions',
+    )
     
     def get_queryset(self):
         user = self.request.user
         company_ids = Company.objects.filter(memberships__user=user).values_list('id', flat=True)
-        quizzes = Quiz.objects.filter(company__id__in=company_ids).prefetch_related('questions')
-        
-        return quizzes   
+        quizzes = Quiz.objects.filter(company__id__in=company_ids)
+
+        if self.action == 'list' and not self.is_questions_expanded():
+            return quizzes.annotate(question_count=Count('questions'))
+
+        if self.action in ('list', 'retrieve', 'update', 'partial_update'):
+            return quizzes.prefetch_related('questions')
+
+        return quizzes
+
+    def get_serializer_class(self):
+        if self.action == 'list' and not self.is_questions_expanded():
+            return QuizListSerializer
+        return QuizSerializer
+
+    def is_questions_expanded(self) -> bool:
+        return 'questions' in self.request.query_params.get('expand', '').split(',')
 
     def perform_destroy(self, instance):
         user = self.request.user
-        company = instance.company
-
-        is_admin_owner = CompanyMember.objects.filter(
-            Q(role=CompanyMember.Role.OWNER) | 
-            Q(role=CompanyMember.Role.ADMIN), 
-            user=user, company=company
-        ).exists()
 
-        if not is_admin_owner:
+        if not is_company_admin_or_owner(user, instance.company_id, self.request):
             raise PermissionDenied("User is not Admin or Owner of the company.")
 
         instance.delete()
 
+    @action(detail=True, methods=['get'], url_path=r'versions/(?P<number>\d+)')
+    def version(self, request, number=None, pk=None):
+        quiz = self.get_object()
+
+        if not is_company_admin_or_owner(request.user, quiz.company_id, request):
+            raise PermissionDenied("User is not Admin or Owner of the company.")
+
+        version_id = QuizVersion.objects.filter(quiz=quiz, number=number).values_list('id', flat=True).first()
+        version = get_quiz_version(version_id) if version_id else None
+
+        if version is None:
+            return Response({"detail": "Quiz version not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        etag = f'"{version.content_hash}"'
+        headers = {'ETag': etag, 'Cache-Control': 'private, max-age=31536000, immutable'}
+
+        if request.headers.get('If-None-Match') == etag:
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        serializer = QuizVersionSerializer(version)
+        return Response(serializer.data, status=status.HTTP_200_OK, headers=headers)
+
+    def get_editable_quiz(self, request) -> Quiz:
+        quiz = self.get_object()
+
+        if not is_company_admin_or_owner(request.user, quiz.company_id, request):
+            raise PermissionDenied("User is not Admin or Owner of the company.")
+
+        return quiz
+
+    def apply_question_operations(self, request, quiz: Quiz, operations: list) -> dict:
+        serializer = QuestionBatchSerializer(
+            data={'operations': operations}, context={'request': request, 'quiz': quiz}
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return serializer.data
+
+    @action(detail=True, methods=['post'], url_path='questions')
+    def add_question(self, request, pk=None):
+        quiz = self.get_editable_quiz(request)
+        changes = self.apply_question_operations(request, quiz, [{'op': 'add', 'value': request.data}])
+        return Response(changes['created'][0], status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['patch', 'delete'], url_path=r'questions/(?P<question_id>\d+)')
+    def question_detail(self, request, question_id=None, pk=None):
+        quiz = self.get_editable_quiz(request)
+        question = Question.objects.filter(id=question_id, quiz=quiz).first()
+
+        if question is None:
+            return Response({"detail": "Question not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        if request.method == 'DELETE':
+            self.apply_question_operations(request, quiz, [{'op': 'remove', 'id': question.id}])
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
+        changes = self.apply_question_operations(
+            request, quiz, [{'op': 'replace', 'id': question.id, 'value': request.data}]
+        )
+
+        if not changes['updated']:
+            return Response(QuestionSerializer(question).data, status=status.HTTP_200_OK)
+
+        return Response(changes['updated'][0], status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['post'], url_path='questions/batch')
+    def question_batch(self, request, pk=None):
+        quiz = self.get_editable_quiz(request)
+        operations = request.data.get('operations') if isinstance(request.data, dict) else request.data
+        changes = self.apply_question_operations(request, quiz, operations)
+        return Response(changes, status=status.HTTP_200_OK)
+
+    def get_result_limit(self, request) -> int:
+        return min(
+            max(int(request.query_params.get('limit', settings.QUIZ_RESULT_QUERY_LIMIT)), 1),
+            settings.QUIZ_RESULT_QUERY_MAX_LIMIT
+        )
+
+    @action(detail=True, methods=['get'], url_path='failed-results')
+    def failed_results(self, request, pk=None):
+        quiz = self.get_editable_quiz(request)
+
+        try:
+            threshold = float(request.query_params.get('below', settings.QUIZ_PASS_SCORE_PCT))
+            limit = self.get_result_limit(request)
+        except ValueError:
+            return Response({"detail": "below and limit must be numbers."}, status=status.HTTP_400_BAD_REQUEST)
+
+        quiz_results = QuizResult.objects.filter(quiz=quiz, score_pct__lt=threshold).order_by('score_pct')[:limit]
+
+        serializer = QuizResultSerializer(quiz_results, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['get'], url_path='top-results')
+    def top_results(self, request, pk=None):
+        quiz = self.get_editable_quiz(request)
+
+        try:
+            limit = self.get_result_limit(request)
+        except ValueError:
+            return Response({"detail": "limit must be a number."}, status=status.HTTP_400_BAD_REQUEST)
+
+        quiz_results = QuizResult.objects.filter(
+            quiz=quiz, score_pct__isnull=False
+        ).order_by('-score_pct')[:limit]
+
+        serializer = QuizResultSerializer(quiz_results, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['get'], url_path='question-stats')
+    def question_stats(self, request, pk=None):
+        quiz = self.get_object()
+
+        if not is_company_admin_or_owner(request.user, quiz.company_id, request):
+            raise PermissionDenied("User is not Admin or Owner of the company.")
+
+        questions = Question.objects.filter(quiz=quiz).select_related('stats').order_by('id')
+
+        serializer = QuestionStatsSerializer(questions, many=True)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['post'], url_path='import-questions', parser_classes=[MultiPartParser])
+    def import_quiz_questions(self, request, pk=None):
+        quiz = self.get_object()
+
+        if not is_company_admin_or_owner(request.user, quiz.company_id, request):
+            raise PermissionDenied("User is not Admin or Owner of the company.")
+
+        upload = request.FILES.get('file')
+
+        if upload is None:
+            return Response({"detail": "File is required."}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            file_type = FileType(request.data.get('file_type') or upload.name.rsplit('.', 1)[-1].lower())
+        except ValueError:
+            return Response({"error": "Unsupported type."}, status=status.HTTP_400_BAD_REQUEST)
+
+        skip_invalid = request.data.get('skip_invalid') in ('1', 'true', 'True')
+
+        try:
+            report = import_questions(quiz, upload.file, file_type, skip_invalid=skip_invalid)
+        except (ValueError, UnicodeDecodeError, csv.Error) as e:
+            return Response({"detail": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if report['error_count'] and not skip_invalid:
+            return Response(report, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(report, status=status.HTTP_201_CREATED)
+
     @action(detail=False, methods=['get'], url_path='company-quizzes')
     def company_quizzes_list(self, request):
         company_id = request.query_params.get('company')
@@ -60,21 +266,26 @@ class QuizViewSet(viewsets.ModelViewSet):
         if not company_id:
             return Response({"detail": "Company ID is required."}, status=status.HTTP_400_BAD_REQUEST)
         
-        role = CompanyMember.objects.filter(user=user, company_id=company_id).values_list('role', flat=True).first()
+        role = get_member_role(user, company_id, request)
 
         if not role:
             return Response({"detail": "User is not a member of this company."}, status=status.HTTP_404_NOT_FOUND)
 
-        if role == CompanyMember.Role.OWNER or role == CompanyMember.Role.ADMIN:
-            quizzes = Quiz.objects.filter(company__id=company_id).prefetch_related('questions')
+        if role in ADMIN_ROLES and self.is_questions_expanded():
+            quizzes = self.paginate_queryset(Quiz.objects.filter(company__id=company_id).prefetch_related('questions'))
             serializer = QuizSerializer(quizzes, many=True)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+        elif role in ADMIN_ROLES:
+            quizzes = self.paginate_queryset(
+                Quiz.objects.filter(company__id=company_id).annotate(question_count=Count('questions'))
+            )
+            serializer = QuizListSerializer(quizzes, many=True)
         else:
-            quizzes = Quiz.objects.filter(company__id=company_id).only(
-                'id', 'title', 'description', 'created_at', 'frequency_days'
-                )
+            quizzes = self.paginate_queryset(Quiz.objects.filter(company__id=company_id).only(
+                'id', 'title', 'description', 'created_at', 'frequency_days', 'time_limit_minutes'
+                ))
             serializer = QuizForUserSerializer(quizzes, many=True, context={'request': request, 'role': role})
-            return Response(serializer.data, status=status.HTTP_200_OK)
+
+        return self.get_paginated_response(serializer.data)
         
     @action(detail=False, methods=['get'], url_path='start-quiz')
     def start_quiz(self, request):
@@ -84,32 +295,102 @@ class QuizViewSet(viewsets.ModelViewSet):
         if not quiz_id:
             return Response({"detail": "Quize ID is required."}, status=status.HTTP_400_BAD_REQUEST)
         
-        if not Quiz.objects.filter(id=quiz_id).exists():
+        quiz = Quiz.objects.filter(id=quiz_id).only(
+            'id', 'company_id', 'current_version_id', 'time_limit_minutes', 'question_sample_size'
+        ).first()
+
+        if quiz is None:
             return Response({"detail": "Quiz not found."}, status=status.HTTP_404_NOT_FOUND)
-        
-        quiz = Quiz.objects.select_related('company').prefetch_related('questions').get(id=quiz_id)
-        
-        company_id = quiz.company.id
-        
-        membership = CompanyMember.objects.filter(user=user, company_id=company_id).exists()
 
-        if not membership:
+        if not is_company_member(user, quiz.company_id, request):
             return Response({"detail": "User is not a member of this company."},
                             status=status.HTTP_404_NOT_FOUND)
 
-        quiz_session = UserQuizSession.objects.filter(user=user, quiz=quiz,
-            status=UserQuizSession.Status.STARTED).only('id', 'start_session_time').first()
+        try:
+            cursor = max(int(request.query_params.get('cursor', 0)), 0)
+            page_size = min(
+                max(int(request.query_params.get('page_size', settings.QUIZ_QUESTION_PAGE_SIZE)), 1),
+                settings.QUIZ_QUESTION_MAX_PAGE_SIZE
+            )
+        except ValueError:
+            return Response({"detail": "cursor and page_size must be integers."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if settings.QUIZ_SESSION_STATELESS:
+            token = request.query_params.get('token')
 
-        if not quiz_session:
-            quiz_session = UserQuizSession.objects.create(user=user, quiz=quiz)
-        
-        for question in quiz.questions.all():
-            question.correct_answer = []
+            if token:
+                claims = load_session_token(token, user.id)
+
+                if claims is None or claims['quiz'] != quiz.id:
+                    return Response({"detail": "Invalid quiz session token."}, status=status.HTTP_400_BAD_REQUEST)
+
+                if is_token_expired(claims, timezone.now()):
+                    return Response({"detail": "Quiz session expired."}, status=status.HTTP_400_BAD_REQUEST)
+
+                version = get_quiz_version(claims['version'])
+
+                if version is None:
+                    return Response(
+                        {"detail": "Quiz version is no longer available."}, status=status.HTTP_400_BAD_REQUEST
+                    )
+            else:
+                version = get_current_quiz_version(quiz)
+                token, claims = issue_session_token(user.id, quiz, version)
+
+            questions = get_session_questions(version, claims['jti'], claims['sample'])
+            page = questions[cursor:cursor + page_size]
+
+            response_data = QuizStartSessionSerializer({
+                'start_session_time': token_start_time(claims),
+                'session_id': None,
+                'token': token,
+                'version': version.number,
+                'total_questions': len(questions),
+                'next_cursor': cursor + page_size if cursor + page_size < len(questions) else None,
+                'questions': [{**question, 'correct_answer': [], 'quiz': quiz.id} for question in page],
+                'drafts': []
+            }).data
+
+            return Response(response_data, status=status.HTTP_200_OK)
+
+        quiz_session = UserQuizSession.objects.filter(user=user, quiz=quiz, status=UserQuizSession.Status.STARTED).only(
+            'id', 'start_session_time', 'version_id', 'question_sample_size'
+        ).first()
+
+        if quiz_session and is_session_expired(quiz_session, quiz):
+            expire_sessions([quiz_session.id])
+            quiz_session = None
+
+        if quiz_session:
+            version = get_session_version(quiz_session, quiz)
+        else:
+            version = get_current_quiz_version(quiz)
+            quiz_session, created = UserQuizSession.objects.get_or_create(
+                user=user,
+                quiz=quiz,
+                status=UserQuizSession.Status.STARTED,
+                defaults={'version': version, 'question_sample_size': quiz.question_sample_size}
+            )
+            if not created:
+                version = get_session_version(quiz_session, quiz)
+
+        questions = get_session_questions(version, quiz_session.id, quiz_session.question_sample_size)
+        page = questions[cursor:cursor + page_size]
+
+        remember_draft_session(
+            quiz_session.id, user.id, version, [question['id'] for question in questions],
+            int(session_time_limit(quiz).total_seconds())
+        )
 
         response_data = QuizStartSessionSerializer({
             'start_session_time': quiz_session.start_session_time,
             'session_id': quiz_session.id,
-            'questions': quiz.questions.all()
+            'token': None,
+            'version': version.number,
+            'total_questions': len(questions),
+            'next_cursor': cursor + page_size if cursor + page_size < len(questions) else None,
+            'questions': [{**question, 'correct_answer': [], 'quiz': quiz.id} for question in page],
+            'drafts': get_draft_answers(quiz_session.id, [question['id'] for question in page])
         }).data    
         
         return Response(response_data, status=status.HTTP_200_OK)
@@ -117,46 +398,173 @@ class QuizViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['post'], url_path='finish-quiz')
     def finish_quiz(self, request):
         quiz_session_id = request.data.get('session')
+        token = request.data.get('token')
         user_answers = request.data.get('answers', [])
         user = request.user
+
+        if not quiz_session_id and not token:
+            return Response({"detail": "Quiz session_id ID and answers are required."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        idempotency_key = request.headers.get('Idempotency-Key')
+
+        if idempotency_key and len(idempotency_key) > QuizResult._meta.get_field('idempotency_key').max_length:
+            return Response({"detail": "Idempotency-Key is too long."}, status=status.HTTP_400_BAD_REQUEST)
+
+        previous_result = self.get_idempotent_result(user, idempotency_key)
+        if previous_result is not None:
+            return self.replay_result(previous_result, None if token else quiz_session_id)
+
+        if token:
+            return self.finish_stateless_quiz(user, token, user_answers, idempotency_key)
+
+        try:
+            quiz_session_id = int(quiz_session_id)
+        except (TypeError, ValueError):
+            return Response({"detail": "Quiz session_id must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        user_answers = merge_draft_answers(quiz_session_id, user.id, user_answers)
+
+        if not user_answers:
+            return Response({"detail": "Quiz session_id ID and answers are required."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        if settings.QUIZ_RESULT_WRITE_BEHIND:
+            submission, created = enqueue_quiz_submission(user.id, quiz_session_id, user_answers, idempotency_key)
+
+            if submission is not None:
+                clear_drafts(quiz_session_id)
+                return Response(
+                    QuizSubmissionSerializer(submission).data,
+                    status=status.HTTP_202_ACCEPTED if created else status.HTTP_200_OK
+                )
+
+            quiz_result = None
+        else:
+            try:
+                quiz_result = submit_quiz_session(user.id, quiz_session_id, user_answers, idempotency_key)
+            except IntegrityError:
+                previous_result = self.get_idempotent_result(user, idempotency_key)
+                if previous_result is None:
+                    raise
+                return self.replay_result(previous_result, quiz_session_id)
+
+        if quiz_result is None:
+            previous_result = self.get_idempotent_result(user, idempotency_key)
+            if previous_result is not None:
+                return self.replay_result(previous_result, quiz_session_id)
+
+            session_status = UserQuizSession.objects.filter(
+                id=quiz_session_id, user=user
+            ).values_list('status', flat=True).first()
+
+            if session_status is None:
+                return Response({"detail": "Quiz session_id not found."}, status=status.HTTP_404_NOT_FOUND)
+
+            if session_status == UserQuizSession.Status.EXPIRED:
+                return Response({"detail": "Quiz session expired."}, status=status.HTTP_400_BAD_REQUEST)
+
+            return Response({"detail": "Quiz already completed."}, status=status.HTTP_400_BAD_REQUEST)
+
+        clear_drafts(quiz_session_id)
+
+        serializer = QuizResultSerializer(quiz_result)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def finish_stateless_quiz(self, user, token: str, user_answers: list, idempotency_key: str | None):
         end_time = timezone.now()
 
-        if not quiz_session_id or not user_answers:
+        if not user_answers:
             return Response({"detail": "Quiz session_id ID and answers are required."},
                             status=status.HTTP_400_BAD_REQUEST)
 
-        if not UserQuizSession.objects.filter(id=quiz_session_id, user=user).exists():
-            return Response({"detail": "Quiz session_id not found."}, status=status.HTTP_404_NOT_FOUND)
-        
-        quiz_session = UserQuizSession.objects.prefetch_related('quiz__questions').get(id=quiz_session_id)
+        claims = load_session_token(token, user.id)
+
+        if claims is None:
+            return Response({"detail": "Invalid quiz session token."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if is_token_expired(claims, end_time):
+            return Response({"detail": "Quiz session expired."}, status=status.HTTP_400_BAD_REQUEST)
 
-        if quiz_session.status == UserQuizSession.Status.COMPLETED:
+        if not consume_session_token(claims, end_time):
             return Response({"detail": "Quiz already completed."}, status=status.HTTP_400_BAD_REQUEST)
 
-        quiz_session.status = UserQuizSession.Status.COMPLETED
-        quiz_session.end_session_time = end_time
-        quiz_session.save()
-        
-        questions = quiz_session.quiz.questions.all()
-            
-        correct_count = 0    
-        for user_answer in user_answers:
-            for question in questions:
-                if user_answer['id'] == question.id:
-                    if sorted(user_answer['correct_answer']) == sorted(question.correct_answer):
-                        correct_count += 1
-                    break
-
-        quiz_result = QuizResult.objects.create(
-            user=user,
-            quiz=quiz_session.quiz,
-            correct_answers=correct_count,
-            total_questions=len(questions),
-            quiz_time=quiz_session.end_session_time - quiz_session.start_session_time
-        )
+        try:
+            quiz_result = submit_quiz_token(
+                user.id, claims, user_answers, token_start_time(claims), end_time, idempotency_key
+            )
+        except IntegrityError:
+            release_session_token(claims)
+            if self.get_idempotent_result(user, idempotency_key) is None:
+                raise
+            return self.reused_idempotency_key_response()
+        except Exception:
+            release_session_token(claims)
+            raise
+
+        if quiz_result is None:
+            release_session_token(claims)
+            return Response({"detail": "Quiz version is no longer available."}, status=status.HTTP_400_BAD_REQUEST)
 
         serializer = QuizResultSerializer(quiz_result)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['put'], url_path='save-draft')
+    def save_draft(self, request):
+        serializer = QuizDraftSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        quiz_session_id = serializer.validated_data['session']
+        user_answers = serializer.validated_data['answers']
+
+        draft_session = get_draft_session(quiz_session_id, request.user.id)
+
+        if draft_session is None:
+            return Response({"detail": "Quiz session_id not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        if draft_session['question_ids'] is None:
+            return Response({"detail": "Quiz version is no longer available."}, status=status.HTTP_400_BAD_REQUEST)
+
+        question_ids = set(draft_session['question_ids'])
+
+        if any(answer['id'] not in question_ids for answer in user_answers):
+            return Response({"detail": "Question is not part of this quiz."}, status=status.HTTP_400_BAD_REQUEST)
+
+        save_draft_answers(quiz_session_id, draft_session, user_answers)
+
+        return Response({'saved': len(user_answers)}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], url_path='finish-quiz/batch')
+    def finish_quiz_batch(self, request):
+        serializer = QuizBatchSubmissionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        submissions = serializer.validated_data['submissions']
+        queued_session_ids = set()
+        if settings.QUIZ_RESULT_WRITE_BEHIND:
+            queued_session_ids = get_queued_session_ids(sorted({item['session'] for item in submissions}))
+
+        outcomes = submit_quiz_sessions_batch(request.user.id, submissions, queued_session_ids)
+
+        return Response(
+            {'results': QuizSubmissionOutcomeSerializer(outcomes, many=True).data},
+            status=status.HTTP_200_OK
+        )
+
+    def get_idempotent_result(self, user, idempotency_key: str | None) -> QuizResult | None:
+        if not idempotency_key:
+            return None
+        return QuizResult.objects.filter(user=user, idempotency_key=idempotency_key).first()
+
+    def replay_result(self, previous_result: QuizResult, quiz_session_id) -> Response:
+        if quiz_session_id is not None and str(previous_result.session_id) != str(quiz_session_id):
+            return self.reused_idempotency_key_response()
+        return Response(QuizResultSerializer(previous_result).data, status=status.HTTP_200_OK)
+
+    def reused_idempotency_key_response(self) -> Response:
+        return Response(
+            {"detail": "Idempotency-Key was already used for a different quiz session."},
+            status=status.HTTP_409_CONFLICT
+        )
     
     @action(detail=False, methods=['get'], url_path='user-company-score')
     def user_company_average_score(self, request):
@@ -172,12 +580,14 @@ class QuizViewSet(viewsets.ModelViewSet):
         company_quiz_results = QuizResult.objects.filter(
             user=user,
             quiz__company_id=company_id
-        ).values('correct_answers', 'total_questions')
-        correct_questions_count = sum(result['correct_answers'] for result in company_quiz_results)
-        questions_count = sum(result['total_questions'] for result in company_quiz_results)
+        ).aggregate(
+            total_correct_answers=Sum('correct_answers'),
+            total_questions=Sum('total_questions')
+        )
 
-        if questions_count:
-            average_score = (correct_questions_count / questions_count) * 100
+        if company_quiz_results['total_questions']:
+            average_score = (
+                company_quiz_results['total_correct_answers'] / company_quiz_results['total_questions']) * 100
         else:
             average_score = 0
 
@@ -213,14 +623,14 @@ class QuizViewSet(viewsets.ModelViewSet):
         quiz_id = request.query_params.get('quiz')
         user = self.request.user
         
-        try:
-            quiz = Quiz.objects.filter(id=quiz_id).select_related('company').only(
-                'id', 'title', 'description', 'created_at', 'frequency_days', 'company__id'
-            ).first()
-        except Quiz.DoesNotExist:
+        quiz = Quiz.objects.filter(id=quiz_id).only(
+            'id', 'title', 'description', 'created_at', 'frequency_days', 'time_limit_minutes', 'company_id'
+        ).first()
+
+        if quiz is None:
             return Response({"detail": "Quiz not found."}, status=status.HTTP_404_NOT_FOUND)
-        
-        if not CompanyMember.objects.filter(company=quiz.company.id, user=user).exists():
+
+        if not is_company_member(user, quiz.company_id, request):
             return Response(
                 {"detail": "User is not a member of this company."},
                 status=status.HTTP_403_FORBIDDEN
@@ -243,7 +653,9 @@ class QuizViewSet(viewsets.ModelViewSet):
         except ValueError:
             return Response({"error": "Unsupported type."}, status=400)
         
-        quiz_result = QuizResult.objects.filter(id=result_id, user=user).latest('created_at')
+        quiz_result = QuizResult.objects.filter(id=result_id, user=user).select_related(
+            'user', 'quiz__company'
+        ).latest('created_at')
         
         if not quiz_result:
             return Response({"detail": "Result not found."}, status=404)
@@ -268,10 +680,9 @@ class QuizViewSet(viewsets.ModelViewSet):
         except ValueError:
             return Response({"error": "Unsupported type."}, status=400)
 
+        quiz_results = QuizResult.objects.filter(quiz__company_id=company_id).select_related('user', 'quiz__company')
         if user_id:
-            quiz_results = QuizResult.objects.filter(quiz__company_id=company_id, user_id=user_id)
-        else:
-            quiz_results = QuizResult.objects.filter(quiz__company_id=company_id)
+            quiz_results = quiz_results.filter(user_id=user_id)
             
         if not quiz_results:
             return Response({"detail": "Result not found."}, status=404)
@@ -288,11 +699,12 @@ class QuizViewSet(viewsets.ModelViewSet):
         if not Company.objects.filter(id=company_id).exists():
             return Response({"detail": "Company not found."}, status=status.HTTP_404_NOT_FOUND)
         
-        quizzes = Quiz.objects.filter(company_id=company_id).values_list('id', flat=True)
-
-        quizzes_results = QuizResult.objects.filter(
-            quiz__in=quizzes
-        ).values('quiz').annotate(last_completion=Max('created_at'))
+        quizzes_results = (
+            QuizResult.objects.filter(quiz__company_id=company_id)
+            .select_related('quiz')
+            .order_by('quiz', '-created_at')
+            .distinct('quiz')
+        )
 
         serializer = QuizLastCompletionSerializers(quizzes_results, many=True, context={'request': request})
         return Response(serializer.data, status=status.HTTP_200_OK)
@@ -337,8 +749,7 @@ class QuizViewSet(viewsets.ModelViewSet):
         dynamic_scores = QuizResult.objects.filter(**filters).values(
             scores_type.value,
             'created_at',
-            'correct_answers',
-            'total_questions',
+            'score_pct',
         ).order_by('created_at')
 
         if not dynamic_scores:
@@ -371,7 +782,7 @@ class QuizViewSet(viewsets.ModelViewSet):
         dynamic_scores = QuizResult.objects.filter(
             created_at__range=[start_date, end_date], user=user
         ).values(
-            'created_at', 'correct_answers', 'total_questions'
+            'created_at', 'score_pct'
         ).order_by('created_at')
 
         if not dynamic_scores:
@@ -387,6 +798,7 @@ class QuizViewSet(viewsets.ModelViewSet):
 
         users_results = (
             QuizResult.objects.filter(user=user)
+            .select_related('quiz')
             .order_by('quiz', '-created_at')
             .distinct('quiz')
         )
@@ -5,4 +5,9 @@ from tools.models import TimeStampedModel
 
 
 class User (AbstractUser, TimeStampedModel):
-    image_path = models.ImageField(upload_to='avatars/', blank=True, null=True) 
\ No newline at end of file
+    image_path = models.ImageField(upload_to='avatars/', blank=True, null=True)
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=['-created_at', '-id'], name='user_created_id'),
+        ]
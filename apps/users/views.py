@@ -1,13 +1,14 @@
 from rest_framework import viewsets
-from rest_framework.pagination import PageNumberPagination
+
+from tools.pagination import CreatedAtCursorPagination
 
 from .models import User
 from .serializers import UserListSerializer, UserSerializer
 
 
 class UserViewSet(viewsets.ModelViewSet):
-    queryset = User.objects.all().order_by('-created_at')
-    pagination_class = PageNumberPagination
+    queryset = User.objects.prefetch_related('groups', 'user_permissions').order_by('-created_at', '-id')
+    pagination_class = CreatedAtCursorPagination
     
     def get_serializer_class(self):       
         if self.action == 'list':
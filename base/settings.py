@@ -64,6 +64,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'tools.middleware.MetricsMiddleware',
+    'tools.middleware.SQLTelemetryMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -120,6 +122,8 @@ CACHES = {
     }
 }
 
+COMPANY_ACCESS_CACHE_TIMEOUT = env.int('COMPANY_ACCESS_CACHE_TIMEOUT', default=300)
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
@@ -138,6 +142,16 @@ LOGGING = {
             "level": os.getenv("DJANGO_LOG_LEVEL", "INFO"),
             "propagate": False,
         },
+        "celery-telemetry": {
+            "handlers": ["console"],
+            "level": "WARNING",
+            "propagate": False,
+        },
+        "sql-telemetry": {
+            "handlers": ["console"],
+            "level": "WARNING",
+            "propagate": False,
+        },
         "user_change": {
             "handlers": ["console"], 
             "level": "INFO",
@@ -253,4 +267,80 @@ CELERY_BEAT_SCHEDULE = {
          'schedule': crontab(minute=0, hour=0),
         
     },
+    'collect_quiz_versions': {
+        'task': 'apps.quizzes.tasks.collect_quiz_versions',
+        'schedule': crontab(minute=0, hour=3),
+    },
+    'sweep_quiz_sessions': {
+        'task': 'apps.quizzes.tasks.sweep_quiz_sessions',
+        'schedule': crontab(minute='*/10'),
+    },
+    'archive_read_notifications': {
+        'task': 'apps.notifications.tasks.archive_read_notifications',
+        'schedule': crontab(minute=30, hour=2),
+    },
 }
+
+NOTIFICATION_RETENTION_DAYS = env.int('NOTIFICATION_RETENTION_DAYS', default=90)
+NOTIFICATION_ARCHIVE_ENABLED = env.bool('NOTIFICATION_ARCHIVE_ENABLED', default=True)
+NOTIFICATION_ARCHIVE_RETENTION_DAYS = env.int('NOTIFICATION_ARCHIVE_RETENTION_DAYS', default=365)
+NOTIFICATION_RETENTION_BATCH_SIZE = env.int('NOTIFICATION_RETENTION_BATCH_SIZE', default=1000)
+
+QUIZ_IMPORT_BATCH_SIZE = env.int('QUIZ_IMPORT_BATCH_SIZE', default=1000)
+
+QUIZ_RESULT_WRITE_BEHIND = env.bool('QUIZ_RESULT_WRITE_BEHIND', default=False)
+QUIZ_RESULT_STREAM_URL = os.getenv('QUIZ_RESULT_STREAM_URL', os.getenv('REDIS_HOST'))
+QUIZ_RESULT_STREAM = os.getenv('QUIZ_RESULT_STREAM', 'quiz-submissions')
+QUIZ_RESULT_STREAM_GROUP = os.getenv('QUIZ_RESULT_STREAM_GROUP', 'quiz-results')
+QUIZ_RESULT_STREAM_BATCH_SIZE = env.int('QUIZ_RESULT_STREAM_BATCH_SIZE', default=500)
+QUIZ_RESULT_STREAM_CLAIM_IDLE_MS = env.int('QUIZ_RESULT_STREAM_CLAIM_IDLE_MS', default=60000)
+QUIZ_RESULT_STREAM_MAX_DELIVERIES = env.int('QUIZ_RESULT_STREAM_MAX_DELIVERIES', default=5)
+QUIZ_RESULT_DEAD_LETTER_STREAM = os.getenv('QUIZ_RESULT_DEAD_LETTER_STREAM', f'{QUIZ_RESULT_STREAM}:dead-letter')
+QUIZ_RESULT_SUBMISSION_TTL = env.int('QUIZ_RESULT_SUBMISSION_TTL', default=86400)
+QUIZ_BATCH_SUBMISSION_LIMIT = env.int('QUIZ_BATCH_SUBMISSION_LIMIT', default=100)
+
+if QUIZ_RESULT_WRITE_BEHIND:
+    CELERY_BEAT_SCHEDULE['flush_quiz_submissions'] = {
+        'task': 'apps.quizzes.tasks.flush_quiz_submissions',
+        'schedule': env.int('QUIZ_RESULT_FLUSH_INTERVAL', default=5),
+    }
+
+QUIZ_QUESTION_PAGE_SIZE = env.int('QUIZ_QUESTION_PAGE_SIZE', default=100)
+QUIZ_QUESTION_MAX_PAGE_SIZE = env.int('QUIZ_QUESTION_MAX_PAGE_SIZE', default=500)
+QUIZ_SESSION_STATELESS = env.bool('QUIZ_SESSION_STATELESS', default=False)
+QUIZ_SESSION_TIME_LIMIT_MINUTES = env.int('QUIZ_SESSION_TIME_LIMIT_MINUTES', default=240)
+QUIZ_SESSION_CLOCK_SKEW_SECONDS = env.int('QUIZ_SESSION_CLOCK_SKEW_SECONDS', default=300)
+QUIZ_SESSION_SWEEP_BATCH_SIZE = env.int('QUIZ_SESSION_SWEEP_BATCH_SIZE', default=1000)
+QUIZ_SESSION_COMPACTION_ENABLED = env.bool('QUIZ_SESSION_COMPACTION_ENABLED', default=False)
+QUIZ_SESSION_RETENTION_DAYS = env.int('QUIZ_SESSION_RETENTION_DAYS', default=90)
+
+QUIZ_PASS_SCORE_PCT = env.float('QUIZ_PASS_SCORE_PCT', default=60.0)
+QUIZ_RESULT_QUERY_LIMIT = env.int('QUIZ_RESULT_QUERY_LIMIT', default=50)
+QUIZ_RESULT_QUERY_MAX_LIMIT = env.int('QUIZ_RESULT_QUERY_MAX_LIMIT', default=500)
+
+SQL_TELEMETRY_SAMPLE_RATE = env.float('SQL_TELEMETRY_SAMPLE_RATE', default=0.0)
+SQL_TELEMETRY_SERVER_TIMING = env.bool('SQL_TELEMETRY_SERVER_TIMING', default=True)
+SQL_TELEMETRY_SLOW_MS = env.float('SQL_TELEMETRY_SLOW_MS', default=500.0)
+SQL_TELEMETRY_MAX_QUERIES = env.int('SQL_TELEMETRY_MAX_QUERIES', default=50)
+SQL_TELEMETRY_REPEAT_THRESHOLD = env.int('SQL_TELEMETRY_REPEAT_THRESHOLD', default=10)
+
+PROFILER_ENABLED = env.bool('PROFILER_ENABLED', default=False)
+PROFILER_USER_LIMIT = env.int('PROFILER_USER_LIMIT', default=5)
+PROFILER_GLOBAL_LIMIT = env.int('PROFILER_GLOBAL_LIMIT', default=20)
+PROFILER_RATE_WINDOW = env.int('PROFILER_RATE_WINDOW', default=3600)
+PROFILER_TTL = env.int('PROFILER_TTL', default=86400)
+
+METRICS_ENABLED = env.bool('METRICS_ENABLED', default=True)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+CELERY_METRICS_PORT = env.int('CELERY_METRICS_PORT', default=0)
+
+CELERY_TELEMETRY_ENABLED = env.bool('CELERY_TELEMETRY_ENABLED', default=False)
+CELERY_TELEMETRY_WINDOW_SECONDS = env.int('CELERY_TELEMETRY_WINDOW_SECONDS', default=3600)
+CELERY_TELEMETRY_MAX_SAMPLES = env.int('CELERY_TELEMETRY_MAX_SAMPLES', default=1000)
+CELERY_TELEMETRY_QUEUES = env.list('CELERY_TELEMETRY_QUEUES', default=['celery'])
+CELERY_TELEMETRY_PROFILE_TASKS = env.list('CELERY_TELEMETRY_PROFILE_TASKS', default=[])
+CELERY_TELEMETRY_PROFILE_THRESHOLD_MS = env.float('CELERY_TELEMETRY_PROFILE_THRESHOLD_MS', default=5000.0)
+
+HEALTH_CHECK_PROBES = env.list('HEALTH_CHECK_PROBES', default=['database', 'cache', 'channel_layer', 'broker'])
+HEALTH_CHECK_TIMEOUT = env.float('HEALTH_CHECK_TIMEOUT', default=1.0)
+HEALTH_CHECK_CACHE_SECONDS = env.float('HEALTH_CHECK_CACHE_SECONDS', default=5.0)
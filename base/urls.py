@@ -25,6 +25,7 @@ from rest_framework_simplejwt.views import (
 )
 
 from apps.users.views import UserViewSet
+from tools.views import ProfileDownloadView
 
 router = routers.DefaultRouter()
 router.register(r'users', UserViewSet)
@@ -40,6 +41,7 @@ urlpatterns = [
 
     path('api/v1/auth/jwt/create/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/v1/auth/jwt/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/v1/profiles/<str:profile_id>/', ProfileDownloadView.as_view(), name='profile-download'),
 
     
 ]
@@ -0,0 +1,34 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from tools.task_stats import task_stats_report
+
+
+class Command(BaseCommand):
+    help = 'Report Celery queue depths and per-task lag/runtime percentiles over a sliding window.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--window', type=int, help='Window in seconds.')
+        parser.add_argument('--json', action='store_true', help='Print the report as JSON.')
+
+    def handle(self, *args, **options):
+        report = task_stats_report(options['window'])
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+
+        self.stdout.write(f"Window: {report['window_seconds']}s")
+        for queue, depth in report['queues'].items():
+            self.stdout.write(f'Queue {queue}: {depth} pending')
+
+        for task_name, stats in report['tasks'].items():
+            lag, runtime = stats['lag_ms'], stats['runtime_ms']
+            self.stdout.write(
+                f"{task_name}: {stats['count']} runs, {stats['failures']} failed, {stats['retries']} retries | "
+                f"lag ms p50={lag['p50']} p95={lag['p95']} p99={lag['p99']} | "
+                f"runtime ms p50={runtime['p50']} p95={runtime['p95']} p99={runtime['p99']}"
+            )
+            for profile_id in stats['profiles']:
+                self.stdout.write(f'  profile: {profile_id}')
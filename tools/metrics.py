@@ -0,0 +1,78 @@
+import os
+import time
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+http_request_duration = Histogram(
+    'http_request_duration_seconds', 'HTTP request latency', ['method', 'view', 'status']
+)
+http_request_queries = Histogram(
+    'http_request_db_queries', 'Database queries per HTTP request', ['view'], buckets=QUERY_COUNT_BUCKETS
+)
+cache_lookups = Counter('cache_lookups_total', 'Read-through cache lookups', ['cache', 'result'])
+celery_task_duration = Histogram('celery_task_duration_seconds', 'Celery task run time', ['task', 'state'])
+celery_task_failures = Counter('celery_task_failures_total', 'Failed Celery tasks', ['task', 'exception'])
+notification_fanout_duration = Histogram(
+    'notification_fanout_duration_seconds', 'Time to fan a notification out to company members'
+)
+notification_fanout_failures = Counter(
+    'notification_fanout_failures_total', 'Notification deliveries that failed during fan-out'
+)
+websocket_connections = Gauge(
+    'websocket_connections', 'Open WebSocket connections', ['consumer'], multiprocess_mode='livesum'
+)
+
+
+def is_multiprocess() -> bool:
+    return 'PROMETHEUS_MULTIPROC_DIR' in os.environ
+
+
+def record_cache_lookup(cache_name: str, hit: bool) -> None:
+    cache_lookups.labels(cache=cache_name, result='hit' if hit else 'miss').inc()
+
+
+def get_registry() -> CollectorRegistry:
+    if not is_multiprocess():
+        return REGISTRY
+
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def render_metrics() -> bytes:
+    return generate_latest(get_registry())
+
+
+def start_metrics_server(port: int) -> None:
+    start_http_server(port, registry=get_registry())
+
+
+def mark_process_dead(pid: int | None = None) -> None:
+    if is_multiprocess():
+        multiprocess.mark_process_dead(pid or os.getpid())
+
+
+class QueryCounter:
+    def __init__(self):
+        self.queries = 0
+        self.started_at = time.perf_counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        self.queries += 1
+        return execute(sql, params, many, context)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started_at
@@ -0,0 +1,57 @@
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from .metrics import QueryCounter, http_request_duration, http_request_queries
+from .telemetry import QueryTelemetry, should_sample
+
+
+class MetricsMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.METRICS_ENABLED:
+            return self.get_response(request)
+
+        counter = QueryCounter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(counter))
+            response = self.get_response(request)
+
+        view = getattr(request.resolver_match, 'view_name', None) or 'unresolved'
+        http_request_duration.labels(method=request.method, view=view, status=response.status_code).observe(
+            counter.elapsed
+        )
+        http_request_queries.labels(view=view).observe(counter.queries)
+        return response
+
+
+class SQLTelemetryMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not should_sample():
+            return self.get_response(request)
+
+        telemetry = QueryTelemetry()
+        with telemetry.capture():
+            response = self.get_response(request)
+
+        if settings.SQL_TELEMETRY_SERVER_TIMING:
+            server_timing = telemetry.server_timing()
+            if response.has_header('Server-Timing'):
+                server_timing = f"{response['Server-Timing']}, {server_timing}"
+            response['Server-Timing'] = server_timing
+
+        telemetry.report(
+            kind='request',
+            method=request.method,
+            path=request.path,
+            view=getattr(request.resolver_match, 'view_name', None),
+            status=response.status_code,
+        )
+        return response
@@ -0,0 +1,133 @@
+import cProfile
+import os
+import pstats
+import uuid
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+PROFILE_HEADER = 'X-Profile'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+PROFILE_MAX_DEPTH = 64
+PROFILE_MIN_SECONDS = 0.0001
+
+
+def _profile_key(profile_id: str) -> str:
+    return f'profiler:profile:{profile_id}'
+
+
+def _frame_label(func: tuple) -> str:
+    filename, lineno, name = func
+    if filename == '~':
+        return name
+    return f'{name} ({os.path.basename(filename)}:{lineno})'
+
+
+def collapsed_stacks(stats: pstats.Stats) -> str:
+    entries = stats.stats
+    callees = defaultdict(dict)
+    for func, (_, _, _, _, callers) in entries.items():
+        for caller, caller_stats in callers.items():
+            callees[caller][func] = caller_stats[3]
+
+    stacks = Counter()
+
+    def walk(func, path, share):
+        self_time = entries[func][2]
+        path = (*path, _frame_label(func))
+
+        self_us = round(self_time * share * 1_000_000)
+        if self_us:
+            stacks[';'.join(path)] += self_us
+
+        if len(path) >= PROFILE_MAX_DEPTH:
+            return
+
+        for callee, edge_time in callees[func].items():
+            callee_time = entries[callee][3]
+            callee_share = share * edge_time / callee_time if callee_time else 0
+            if _frame_label(callee) in path or callee_time * callee_share < PROFILE_MIN_SECONDS:
+                continue
+            walk(callee, path, callee_share)
+
+    for func, (_, _, _, _, callers) in entries.items():
+        if not callers:
+            walk(func, (), 1.0)
+
+    return '\n'.join(f'{stack} {value}' for stack, value in stacks.most_common())
+
+
+def _consume_slot(key: str, limit: int) -> bool:
+    window = settings.PROFILER_RATE_WINDOW
+    cache.add(key, 0, window)
+    try:
+        used = cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, window)
+        used = 1
+    return used <= limit
+
+
+def acquire_profile_slot(user_id: int) -> bool:
+    return (
+        _consume_slot(f'profiler:user:{user_id}', settings.PROFILER_USER_LIMIT)
+        and _consume_slot('profiler:global', settings.PROFILER_GLOBAL_LIMIT)
+    )
+
+
+def store_profile(profiler: cProfile.Profile, **meta) -> str:
+    profile_id = uuid.uuid4().hex
+    profile = {
+        **meta,
+        'created_at': timezone.now().isoformat(),
+        'stacks': collapsed_stacks(pstats.Stats(profiler)),
+    }
+    cache.set(_profile_key(profile_id), profile, settings.PROFILER_TTL)
+    return profile_id
+
+
+def get_profile(profile_id: str) -> dict | None:
+    return cache.get(_profile_key(profile_id))
+
+
+class ProfiledViewMixin:
+    profiled_actions = ()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.profiler = None
+
+        if not self.is_profiling_requested(request) or not acquire_profile_slot(request.user.id):
+            return
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            return
+        self.profiler = profiler
+
+    def is_profiling_requested(self, request) -> bool:
+        return (
+            settings.PROFILER_ENABLED
+            and self.action in self.profiled_actions
+            and request.user.is_staff
+            and '1' in (request.headers.get(PROFILE_HEADER), request.query_params.get('profile'))
+        )
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        profiler = getattr(self, 'profiler', None)
+        if profiler is not None:
+            profiler.disable()
+            self.profiler = None
+            response[PROFILE_ID_HEADER] = store_profile(
+                profiler,
+                user=request.user.id,
+                action=self.action,
+                path=request.get_full_path(),
+                status=response.status_code,
+            )
+
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,103 @@
+import cProfile
+import time
+
+from celery.signals import (
+    before_task_publish,
+    task_failure,
+    task_postrun,
+    task_prerun,
+    worker_init,
+    worker_process_shutdown,
+)
+from django.conf import settings
+
+from .metrics import celery_task_duration, celery_task_failures, mark_process_dead, start_metrics_server
+from .profiling import store_profile
+from .task_stats import PUBLISHED_AT_HEADER, build_task_sample, logger, record_task_sample
+from .telemetry import QueryTelemetry, should_sample
+
+active_telemetry = {}
+
+
+@before_task_publish.connect
+def stamp_published_at(headers=None, **kwargs):
+    if settings.CELERY_TELEMETRY_ENABLED and headers is not None:
+        headers.setdefault(PUBLISHED_AT_HEADER, time.time())
+
+
+@task_prerun.connect
+def start_task_timer(task_id=None, task=None, **kwargs):
+    profiler = None
+    if settings.CELERY_TELEMETRY_ENABLED and getattr(task, 'name', None) in settings.CELERY_TELEMETRY_PROFILE_TASKS:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            profiler = None
+
+    task.request.task_timer = (time.perf_counter(), time.time(), profiler)
+
+
+@task_postrun.connect
+def observe_task_duration(task_id=None, task=None, state=None, **kwargs):
+    started = getattr(task.request, 'task_timer', None)
+    if started is None:
+        return
+
+    task.request.task_timer = None
+
+    started_at, started_wall_time, profiler = started
+    runtime = time.perf_counter() - started_at
+    task_name = getattr(task, 'name', None)
+    celery_task_duration.labels(task=task_name, state=state).observe(runtime)
+
+    if profiler is not None:
+        profiler.disable()
+
+    if not settings.CELERY_TELEMETRY_ENABLED:
+        return
+
+    sample = build_task_sample(task, task_id, state, started_wall_time, runtime)
+    if profiler is not None and sample['runtime_ms'] >= settings.CELERY_TELEMETRY_PROFILE_THRESHOLD_MS:
+        sample['profile_id'] = store_profile(profiler, task=task_name, task_id=task_id, state=state)
+        logger.warning('Slow task %s took %.1f ms, profile %s', task_name, sample['runtime_ms'], sample['profile_id'])
+
+    record_task_sample(task_name, sample)
+
+
+@task_failure.connect
+def count_task_failure(sender=None, exception=None, **kwargs):
+    celery_task_failures.labels(task=getattr(sender, 'name', None), exception=type(exception).__name__).inc()
+
+
+@worker_init.connect
+def serve_worker_metrics(**kwargs):
+    if settings.CELERY_METRICS_PORT:
+        start_metrics_server(settings.CELERY_METRICS_PORT)
+
+
+@worker_process_shutdown.connect
+def release_worker_metrics(pid=None, **kwargs):
+    mark_process_dead(pid)
+
+
+@task_prerun.connect
+def start_task_telemetry(task_id=None, task=None, **kwargs):
+    if not should_sample():
+        return
+
+    telemetry = QueryTelemetry()
+    capture = telemetry.capture()
+    capture.__enter__()
+    active_telemetry[task_id] = (telemetry, capture)
+
+
+@task_postrun.connect
+def finish_task_telemetry(task_id=None, task=None, state=None, **kwargs):
+    active = active_telemetry.pop(task_id, None)
+    if active is None:
+        return
+
+    telemetry, capture = active
+    capture.__exit__(None, None, None)
+    telemetry.report(kind='task', task=getattr(task, 'name', None), task_id=task_id, state=state)
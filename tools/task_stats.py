@@ -0,0 +1,123 @@
+import json
+import logging
+import time
+from functools import lru_cache
+
+import numpy as np
+import redis
+from django.conf import settings
+
+logger = logging.getLogger("celery-telemetry")
+
+PUBLISHED_AT_HEADER = 'published_at'
+TASK_NAMES_KEY = 'celery-telemetry:tasks'
+PRIORITY_SEPARATOR = '\x06\x16'
+PRIORITY_STEPS = (3, 6, 9)
+PERCENTILES = (50, 95, 99)
+
+
+@lru_cache
+def get_broker_client() -> redis.Redis:
+    return redis.Redis.from_url(settings.CELERY_BROKER_URL, decode_responses=True)
+
+
+def samples_key(task_name: str) -> str:
+    return f'celery-telemetry:samples:{task_name}'
+
+
+def build_task_sample(task, task_id: str, state: str, started_at: float, runtime: float) -> dict:
+    request = getattr(task, 'request', None)
+    published_at = getattr(request, PUBLISHED_AT_HEADER, None)
+
+    return {
+        'task_id': task_id,
+        'state': state,
+        'finished_at': started_at + runtime,
+        'lag_ms': round((started_at - published_at) * 1000, 1) if published_at else None,
+        'runtime_ms': round(runtime * 1000, 1),
+        'retries': getattr(request, 'retries', 0) or 0,
+    }
+
+
+def record_task_sample(task_name: str, sample: dict) -> None:
+    key = samples_key(task_name)
+
+    try:
+        with get_broker_client().pipeline(transaction=False) as pipe:
+            pipe.sadd(TASK_NAMES_KEY, task_name)
+            pipe.lpush(key, json.dumps(sample))
+            pipe.ltrim(key, 0, settings.CELERY_TELEMETRY_MAX_SAMPLES - 1)
+            pipe.expire(key, settings.CELERY_TELEMETRY_WINDOW_SECONDS)
+            pipe.execute()
+    except redis.RedisError:
+        logger.warning('Could not record telemetry for %s', task_name, exc_info=True)
+
+
+def load_task_samples(window_seconds: int) -> dict[str, list[dict]]:
+    client = get_broker_client()
+    task_names = sorted(client.smembers(TASK_NAMES_KEY))
+    since = time.time() - window_seconds
+
+    with client.pipeline(transaction=False) as pipe:
+        for task_name in task_names:
+            pipe.lrange(samples_key(task_name), 0, -1)
+        raw_samples = pipe.execute()
+
+    task_samples = {}
+    for task_name, raw in zip(task_names, raw_samples):
+        samples = [sample for sample in map(json.loads, raw) if sample['finished_at'] >= since]
+        if samples:
+            task_samples[task_name] = samples
+
+    return task_samples
+
+
+def percentiles(values: list[float]) -> dict:
+    if not values:
+        return {f'p{percentile}': None for percentile in PERCENTILES}
+
+    return {
+        f'p{percentile}': round(float(value), 1)
+        for percentile, value in zip(PERCENTILES, np.percentile(values, PERCENTILES))
+    }
+
+
+def summarize_samples(samples: list[dict]) -> dict:
+    return {
+        'count': len(samples),
+        'failures': sum(sample['state'] != 'SUCCESS' for sample in samples),
+        'retries': sum(sample['retries'] for sample in samples),
+        'lag_ms': percentiles([sample['lag_ms'] for sample in samples if sample['lag_ms'] is not None]),
+        'runtime_ms': percentiles([sample['runtime_ms'] for sample in samples]),
+        'profiles': [sample['profile_id'] for sample in samples if sample.get('profile_id')],
+    }
+
+
+def sample_queue_depths(queues: list[str] | None = None) -> dict[str, int]:
+    queues = queues or settings.CELERY_TELEMETRY_QUEUES
+    client = get_broker_client()
+
+    with client.pipeline(transaction=False) as pipe:
+        for queue in queues:
+            pipe.llen(queue)
+            for step in PRIORITY_STEPS:
+                pipe.llen(f'{queue}{PRIORITY_SEPARATOR}{step}')
+        lengths = pipe.execute()
+
+    keys_per_queue = len(PRIORITY_STEPS) + 1
+    return {
+        queue: sum(lengths[index * keys_per_queue:(index + 1) * keys_per_queue])
+        for index, queue in enumerate(queues)
+    }
+
+
+def task_stats_report(window_seconds: int | None = None) -> dict:
+    window_seconds = window_seconds or settings.CELERY_TELEMETRY_WINDOW_SECONDS
+    return {
+        'window_seconds': window_seconds,
+        'queues': sample_queue_depths(),
+        'tasks': {
+            task_name: summarize_samples(samples)
+            for task_name, samples in load_task_samples(window_seconds).items()
+        },
+    }
@@ -0,0 +1,101 @@
+import hashlib
+import json
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger("sql-telemetry")
+
+LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+IN_LIST_RE = re.compile(r'\((?:\s*%s\s*,)+\s*%s\s*\)')
+WHITESPACE_RE = re.compile(r'\s+')
+
+
+def normalize_sql(sql: str) -> str:
+    sql = LITERAL_RE.sub('%s', sql)
+    sql = IN_LIST_RE.sub('(%s, ...)', sql)
+    return WHITESPACE_RE.sub(' ', sql).strip()
+
+
+def sql_fingerprint(sql: str) -> str:
+    return hashlib.sha1(sql.encode(), usedforsecurity=False).hexdigest()[:16]
+
+
+def should_sample() -> bool:
+    rate = settings.SQL_TELEMETRY_SAMPLE_RATE
+    return rate > 0 and random.random() < rate
+
+
+class QueryTelemetry:
+    def __init__(self):
+        self.queries = 0
+        self.sql_seconds = 0.0
+        self.fingerprints = Counter()
+        self.statements = {}
+        self.started_at = time.perf_counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_seconds += time.perf_counter() - start
+            self.queries += 1
+
+            statement = normalize_sql(sql)
+            fingerprint = sql_fingerprint(statement)
+            self.fingerprints[fingerprint] += 1
+            self.statements.setdefault(fingerprint, statement)
+
+    @contextmanager
+    def capture(self):
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            yield self
+
+    @property
+    def sql_ms(self) -> float:
+        return self.sql_seconds * 1000
+
+    @property
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.started_at) * 1000
+
+    def repeated_statements(self) -> list[dict]:
+        return [
+            {'fingerprint': fingerprint, 'count': repeats, 'sql': self.statements[fingerprint][:500]}
+            for fingerprint, repeats in self.fingerprints.most_common()
+            if repeats >= settings.SQL_TELEMETRY_REPEAT_THRESHOLD
+        ]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.sql_ms:.1f};desc="{self.queries} queries", app;dur={self.elapsed_ms:.1f}'
+
+    def record(self, **context) -> dict:
+        return {
+            **context,
+            'duration_ms': round(self.elapsed_ms, 1),
+            'queries': self.queries,
+            'sql_ms': round(self.sql_ms, 1),
+            'repeated': self.repeated_statements(),
+        }
+
+    def report(self, **context) -> dict | None:
+        record = self.record(**context)
+        is_notable = (
+            record['duration_ms'] >= settings.SQL_TELEMETRY_SLOW_MS
+            or record['queries'] >= settings.SQL_TELEMETRY_MAX_QUERIES
+            or record['repeated']
+        )
+        if not is_notable:
+            return None
+
+        logger.warning(json.dumps(record, default=str))
+        return record
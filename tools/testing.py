@@ -0,0 +1,72 @@
+import json
+from functools import lru_cache
+from pathlib import Path
+
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+QUERY_BUDGETS_PATH = Path(__file__).with_name('query_budgets.json')
+
+
+def explain_without_seqscan(queryset) -> str:
+    with connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_seqscan = off')
+    return queryset.explain()
+
+
+@lru_cache
+def load_query_budgets() -> dict:
+    with open(QUERY_BUDGETS_PATH) as budgets_file:
+        return json.load(budgets_file)
+
+
+class QueryPlanAssertionsMixin:
+    def assertUsesIndex(self, queryset, index_name: str | None = None):
+        plan = explain_without_seqscan(queryset)
+
+        self.assertNotIn('Seq Scan', plan, msg=f'Query fell back to a sequential scan:\n{plan}')
+        if index_name:
+            self.assertIn(index_name, plan, msg=f'Query does not use {index_name}:\n{plan}')
+
+        return plan
+
+
+class QueryBudgetAssertionsMixin:
+    query_budget_rows = 3
+    query_budget_scale = 10
+
+    def count_queries(self, send_request) -> int:
+        cache.clear()
+
+        with CaptureQueriesContext(connection) as context:
+            response = send_request()
+
+        self.assertLess(
+            response.status_code, 400,
+            msg=f'Request failed with {response.status_code}: {getattr(response, "data", response.content)}'
+        )
+        return len(context.captured_queries)
+
+    def assertQueryBudget(self, endpoint: str, send_request, seed_rows):
+        budgets = load_query_budgets()
+        self.assertIn(endpoint, budgets, msg=f'No query budget for {endpoint} in {QUERY_BUDGETS_PATH.name}')
+
+        small_rows = self.query_budget_rows
+        large_rows = small_rows * self.query_budget_scale
+
+        seed_rows(small_rows)
+        small_count = self.count_queries(send_request)
+        seed_rows(large_rows - small_rows)
+        large_count = self.count_queries(send_request)
+
+        self.assertEqual(
+            small_count, large_count,
+            msg=f'{endpoint} ran {small_count} queries for {small_rows} rows and {large_count} for {large_rows}'
+        )
+        self.assertLessEqual(
+            large_count, budgets[endpoint],
+            msg=f'{endpoint} ran {large_count} queries, budget is {budgets[endpoint]}'
+        )
+
+        return large_count
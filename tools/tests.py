@@ -1,2 +1,740 @@
+import cProfile
+import pstats
+import time
+from datetime import timedelta
+from itertools import count
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from prometheus_client import REGISTRY
+from rest_framework.test import APITestCase
+
+from apps.companies.models import Company, CompanyInvitation, CompanyMember, CompanyRequest
+from apps.companies.utils import get_company_info
+from apps.notifications.models import Notification
+from apps.quizzes.models import Question, QuestionStats, Quiz, QuizResult, UserQuizSession
+from apps.quizzes.versioning import publish_quiz_version
+
+from .profiling import collapsed_stacks
+from .signals import (
+    count_task_failure,
+    finish_task_telemetry,
+    observe_task_duration,
+    stamp_published_at,
+    start_task_telemetry,
+    start_task_timer,
+)
+from .task_stats import build_task_sample, summarize_samples
+from .telemetry import QueryTelemetry, normalize_sql
+from .testing import QueryBudgetAssertionsMixin, QueryPlanAssertionsMixin, load_query_budgets
+
+User = get_user_model()
+
+
+class QueryPlanTestCase(QueryPlanAssertionsMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.users = User.objects.bulk_create([
+            User(username=f"user{i}", email=f"user{i}@example.com", password="1Q_az_2wsx_3edc") for i in range(100)
+        ])
+        cls.user = cls.users[0]
+        cls.company = Company.objects.create(name="Company", description="description", owner=cls.user)
+        cls.quizzes = Quiz.objects.bulk_create([
+            Quiz(title=f"Quiz {i}", description="description", company=cls.company) for i in range(50)
+        ])
+        cls.quiz = cls.quizzes[0]
+
+        CompanyMember.objects.bulk_create([
+            CompanyMember(user=user, company=cls.company, role=CompanyMember.Role.MEMBER) for user in cls.users
+        ])
+        Notification.objects.bulk_create([
+            Notification(
+                user=user, text="text", status=Notification.Status.UNREAD if i == 0 else Notification.Status.READ
+            )
+            for user in cls.users for i in range(20)
+        ])
+
+        user_ids = [user.id for user in cls.users]
+        quiz_ids = [quiz.id for quiz in cls.quizzes]
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {QuizResult._meta.db_table} "
+                "(user_id, quiz_id, correct_answers, total_questions, quiz_time, created_at, updated_at) "
+                "SELECT (%s::bigint[])[1 + g %% 100], (%s::bigint[])[1 + (g / 100) %% 50], 1, 2, "
+                "interval '5 minutes', now() - (50000 - g) * interval '1 minute', now() "
+                "FROM generate_series(0, 49999) AS g",
+                [user_ids, quiz_ids]
+            )
+            cursor.execute(
+                f"INSERT INTO {UserQuizSession._meta.db_table} "
+                "(user_id, quiz_id, status, start_session_time, created_at, updated_at) "
+                "SELECT (%s::bigint[])[1 + g %% 100], (%s::bigint[])[1 + (g / 100) %% 50], 'completed', now(), "
+                "now(), now() FROM generate_series(0, 19999) AS g",
+                [user_ids, quiz_ids]
+            )
+            cursor.execute('ANALYZE')
+
+    def test_user_quiz_results_by_date(self):
+        self.assertUsesIndex(
+            QuizResult.objects.filter(user=self.user, quiz=self.quiz).order_by('-created_at'),
+            'quizresult_user_quiz_created'
+        )
+
+    def test_company_results_since(self):
+        self.assertUsesIndex(
+            QuizResult.objects.filter(
+                quiz__company=self.company, created_at__gte=timezone.now() - timedelta(days=30)
+            ).values('correct_answers', 'total_questions')
+        )
+
+    def test_results_created_range_uses_brin(self):
+        self.assertUsesIndex(
+            QuizResult.objects.filter(created_at__gte=timezone.now() - timedelta(days=1)).values('id'),
+            'quizresult_created_brin'
+        )
+
+    def test_user_quiz_sessions_by_status(self):
+        self.assertUsesIndex(
+            UserQuizSession.objects.filter(user=self.user, quiz=self.quiz, status=UserQuizSession.Status.COMPLETED),
+            'session_user_quiz_status'
+        )
+
+    def test_company_members_by_role(self):
+        self.assertUsesIndex(
+            CompanyMember.objects.filter(company=self.company, role=CompanyMember.Role.ADMIN),
+            'member_company_role'
+        )
+
+    def test_user_notifications_by_status(self):
+        self.assertUsesIndex(
+            Notification.objects.filter(user=self.user, status=Notification.Status.UNREAD),
+            'notification_user_status'
+        )
+
+    def test_quiz_top_results_by_score(self):
+        self.assertUsesIndex(
+            QuizResult.objects.filter(quiz=self.quiz, score_pct__isnull=False).order_by('-score_pct')[:10],
+            'quizresult_quiz_score'
+        )
+
+
+class QueryBudgetTestCase(QueryBudgetAssertionsMixin, APITestCase):
+    def setUp(self):
+        self.sequence = count()
+        self.user = User.objects.create_user(
+            username="owner", password="1Q_az_2wsx_3edc", email="owner@example.com"
+        )
+        self.member = User.objects.create_user(
+            username="member", password="1Q_az_2wsx_3edc", email="member@example.com"
+        )
+        self.company = Company.objects.create(name="Company", description="description", owner=self.user)
+        CompanyMember.objects.create(user=self.user, company=self.company, role=CompanyMember.Role.OWNER)
+        CompanyMember.objects.create(user=self.member, company=self.company, role=CompanyMember.Role.MEMBER)
+        self.quiz = Quiz.objects.create(title="Quiz", description="description", company=self.company)
+
+        self.client.force_authenticate(user=self.user)
+
+    def create_users(self, number):
+        return User.objects.bulk_create([
+            User(username=f"user{index}", email=f"user{index}@example.com", password="1Q_az_2wsx_3edc")
+            for index in (next(self.sequence) for _ in range(number))
+        ])
+
+    def create_quizzes(self, number):
+        return Quiz.objects.bulk_create([
+            Quiz(title=f"Quiz {index}", description="description", company=self.company)
+            for index in (next(self.sequence) for _ in range(number))
+        ])
+
+    def create_results(self, user, quiz, number, correct_answers=1):
+        QuizResult.objects.bulk_create([
+            QuizResult(
+                user=user, quiz=quiz, correct_answers=correct_answers, total_questions=4, quiz_time=timedelta(minutes=5)
+            )
+            for _ in range(number)
+        ])
+
+    def seed_companies(self, number):
+        Company.objects.bulk_create([
+            Company(name=f"Company {user.id}", description="description", owner=user)
+            for user in self.create_users(number)
+        ])
+
+    def seed_owned_companies(self, number):
+        Company.objects.bulk_create([
+            Company(name="Company", description="description", owner=self.user) for _ in range(number)
+        ])
+
+    def seed_sent_invitations(self, number):
+        CompanyInvitation.objects.bulk_create([
+            CompanyInvitation(sender=self.user, receiver=receiver, company=self.company)
+            for receiver in self.create_users(number)
+        ])
+
+    def seed_received_invitations(self, number):
+        CompanyInvitation.objects.bulk_create([
+            CompanyInvitation(sender=sender, receiver=self.user, company=self.company)
+            for sender in self.create_users(number)
+        ])
+
+    def seed_received_requests(self, number):
+        CompanyRequest.objects.bulk_create([
+            CompanyRequest(sender=sender, receiver=self.user, company=self.company)
+            for sender in self.create_users(number)
+        ])
+
+    def seed_sent_requests(self, number):
+        companies = Company.objects.bulk_create([
+            Company(name=f"Company {owner.id}", description="description", owner=owner)
+            for owner in self.create_users(number)
+        ])
+        CompanyRequest.objects.bulk_create([
+            CompanyRequest(sender=self.user, receiver=company.owner, company=company) for company in companies
+        ])
+
+    def seed_members(self, number, role=CompanyMember.Role.MEMBER):
+        users = self.create_users(number)
+        CompanyMember.objects.bulk_create([
+            CompanyMember(user=user, company=self.company, role=role) for user in users
+        ])
+        for user in users:
+            self.create_results(user, self.quiz, 1)
+
+    def seed_admins(self, number):
+        self.seed_members(number, role=CompanyMember.Role.ADMIN)
+
+    def seed_notifications(self, number):
+        Notification.objects.bulk_create([Notification(user=self.user, text="text") for _ in range(number)])
+
+    def seed_quizzes_with_questions(self, number):
+        for quiz in self.create_quizzes(number):
+            Question.objects.bulk_create([
+                Question(quiz=quiz, text="text", answers=["a", "b"], correct_answer=["a"]) for _ in range(2)
+            ])
+
+    def seed_company_results(self, number):
+        for quiz in self.create_quizzes(number):
+            self.create_results(self.member, quiz, 2)
+
+    def seed_user_results(self, number):
+        for quiz in self.create_quizzes(number):
+            self.create_results(self.user, quiz, 2)
+
+    def seed_quiz_results(self, number):
+        for user in self.create_users(number):
+            self.create_results(user, self.quiz, 1, correct_answers=1)
+            self.create_results(user, self.quiz, 1, correct_answers=4)
+
+    def seed_question_stats(self, number):
+        questions = Question.objects.bulk_create([
+            Question(quiz=self.quiz, text="text", answers=["a", "b"], correct_answer=["a"]) for _ in range(number)
+        ])
+        QuestionStats.objects.bulk_create([
+            QuestionStats(question=question, attempts=2, correct=1, choice_counts={"a": 1}) for question in questions
+        ])
+
+    def seed_companies_questions(self, number):
+        Question.objects.bulk_create([
+            Question(quiz=self.quiz, text="text", answers=["a", "b"], correct_answer=["a"]) for _ in range(number)
+        ])
+
+    def seed_quiz_versions(self, number):
+        self.seed_companies_questions(number)
+        self.version_number = publish_quiz_version(self.quiz).number
+
+    def seed_member_companies(self, number):
+        companies = Company.objects.bulk_create([
+            Company(name="Company", description="description", owner=self.user) for _ in range(number)
+        ])
+        CompanyMember.objects.bulk_create([
+            CompanyMember(user=self.member, company=company, role=CompanyMember.Role.MEMBER) for company in companies
+        ])
+
+    def seed_user_memberships(self, number):
+        companies = Company.objects.bulk_create([
+            Company(name="Company", description="description", owner=owner) for owner in self.create_users(number)
+        ])
+        CompanyMember.objects.bulk_create([
+            CompanyMember(user=self.user, company=company, role=CompanyMember.Role.MEMBER) for company in companies
+        ])
+
+    def seed_own_results(self, number):
+        self.create_results(self.user, self.quiz, number)
+
+    def test_budgets_cover_only_known_endpoints(self):
+        tested = {name.removeprefix("test_").replace("_", "-") for name in dir(self) if name.startswith("test_")}
+        self.assertLessEqual(set(load_query_budgets()), tested)
+
+    def test_companies_list(self):
+        self.assertQueryBudget("companies-list", lambda: self.client.get("/api/v1/companies/"), self.seed_companies)
+
+    def test_companies_detail(self):
+        self.assertQueryBudget(
+            "companies-detail", lambda: self.client.get(f"/api/v1/companies/{self.company.id}/"), self.seed_members
+        )
+
+    def test_companies_user_companies(self):
+        self.assertQueryBudget(
+            "companies-user-companies",
+            lambda: self.client.get("/api/v1/companies/user-companies/", {"user": self.member.id}),
+            self.seed_member_companies
+        )
+
+    def test_companies_my_companies(self):
+        self.assertQueryBudget(
+            "companies-my-companies",
+            lambda: self.client.get("/api/v1/companies/my-companies/"),
+            self.seed_owned_companies
+        )
+
+    def test_invitations_list(self):
+        self.assertQueryBudget(
+            "invitations-list", lambda: self.client.get("/api/v1/invitations/"), self.seed_sent_invitations
+        )
+
+    def test_invitations_user_invitations(self):
+        self.assertQueryBudget(
+            "invitations-user-invitations",
+            lambda: self.client.get("/api/v1/invitations/user-invitations/"),
+            self.seed_received_invitations
+        )
+
+    def test_requests_list(self):
+        self.assertQueryBudget(
+            "requests-list", lambda: self.client.get("/api/v1/requests/"), self.seed_received_requests
+        )
+
+    def test_requests_user_requests(self):
+        self.assertQueryBudget(
+            "requests-user-requests",
+            lambda: self.client.get("/api/v1/requests/user-requests/"),
+            self.seed_sent_requests
+        )
+
+    def test_company_members_admins(self):
+        self.assertQueryBudget(
+            "company-members-admins",
+            lambda: self.client.get("/api/v1/company-members/admins/", {"company": self.company.id}),
+            self.seed_admins
+        )
+
+    def test_company_members_members(self):
+        self.assertQueryBudget(
+            "company-members-members",
+            lambda: self.client.get("/api/v1/company-members/members/", {"company": self.company.id}),
+            self.seed_members
+        )
+
+    def test_company_members_user_memberships(self):
+        self.assertQueryBudget(
+            "company-members-user-memberships",
+            lambda: self.client.get("/api/v1/company-members/user-memberships/"),
+            self.seed_user_memberships
+        )
+
+    def test_company_members_member_role(self):
+        self.assertQueryBudget(
+            "company-members-member-role",
+            lambda: self.client.get("/api/v1/company-members/member-role/", {"company": self.company.id}),
+            self.seed_members
+        )
+
+    def test_company_members_members_as_member(self):
+        self.client.force_authenticate(user=self.member)
+        self.assertQueryBudget(
+            "company-members-members-as-member",
+            lambda: self.client.get("/api/v1/company-members/members/", {"company": self.company.id}),
+            self.seed_members
+        )
+
+    def test_invitations_detail(self):
+        invitation = CompanyInvitation.objects.create(sender=self.user, receiver=self.member, company=self.company)
+        self.assertQueryBudget(
+            "invitations-detail",
+            lambda: self.client.get(f"/api/v1/invitations/{invitation.id}/"),
+            self.seed_sent_invitations
+        )
+
+    def test_requests_detail(self):
+        company_request = CompanyRequest.objects.create(sender=self.member, receiver=self.user, company=self.company)
+        self.assertQueryBudget(
+            "requests-detail",
+            lambda: self.client.get(f"/api/v1/requests/{company_request.id}/"),
+            self.seed_received_requests
+        )
+
+    def test_notifications_detail(self):
+        notification = Notification.objects.create(user=self.user, text="text")
+        self.assertQueryBudget(
+            "notifications-detail",
+            lambda: self.client.get(f"/api/v1/notifications/{notification.id}/"),
+            self.seed_notifications
+        )
+
+    def test_users_list(self):
+        self.assertQueryBudget("users-list", lambda: self.client.get("/api/v1/users/"), self.create_users)
+
+    def test_users_detail(self):
+        self.assertQueryBudget(
+            "users-detail", lambda: self.client.get(f"/api/v1/users/{self.member.id}/"), self.create_users
+        )
+
+    def test_notifications_list(self):
+        self.assertQueryBudget(
+            "notifications-list", lambda: self.client.get("/api/v1/notifications/"), self.seed_notifications
+        )
+
+    def test_quizzes_list(self):
+        self.assertQueryBudget(
+            "quizzes-list", lambda: self.client.get("/api/v1/quizzes/"), self.seed_quizzes_with_questions
+        )
+
+    def test_quizzes_detail(self):
+        self.assertQueryBudget(
+            "quizzes-detail", lambda: self.client.get(f"/api/v1/quizzes/{self.quiz.id}/"), self.seed_companies_questions
+        )
+
+    def test_quizzes_version(self):
+        self.assertQueryBudget(
+            "quizzes-version",
+            lambda: self.client.get(f"/api/v1/quizzes/{self.quiz.id}/versions/{self.version_number}/"),
+            self.seed_quiz_versions
+        )
+
+    def test_quizzes_quiz_info(self):
+        self.assertQueryBudget(
+            "quizzes-quiz-info",
+            lambda: self.client.get("/api/v1/quizzes/quiz-info/", {"quiz": self.quiz.id}),
+            self.seed_companies_questions
+        )
+
+    def test_quizzes_list_expanded(self):
+        self.assertQueryBudget(
+            "quizzes-list-expanded",
+            lambda: self.client.get("/api/v1/quizzes/", {"expand": "questions"}),
+            self.seed_quizzes_with_questions
+        )
+
+    def test_quizzes_company_quizzes(self):
+        self.assertQueryBudget(
+            "quizzes-company-quizzes",
+            lambda: self.client.get("/api/v1/quizzes/company-quizzes/", {"company": self.company.id}),
+            self.seed_quizzes_with_questions
+        )
+
+    def test_quizzes_company_quizzes_as_member(self):
+        self.client.force_authenticate(user=self.member)
+        self.assertQueryBudget(
+            "quizzes-company-quizzes-as-member",
+            lambda: self.client.get("/api/v1/quizzes/company-quizzes/", {"company": self.company.id}),
+            self.seed_quizzes_with_questions
+        )
+
+    def test_quizzes_quiz_last_completions(self):
+        self.assertQueryBudget(
+            "quizzes-quiz-last-completions",
+            lambda: self.client.get("/api/v1/quizzes/quiz-last-completions/", {"company_id": self.company.id}),
+            self.seed_company_results
+        )
+
+    def test_quizzes_user_company_score(self):
+        self.assertQueryBudget(
+            "quizzes-user-company-score",
+            lambda: self.client.get("/api/v1/quizzes/user-company-score/", {"company_id": self.company.id}),
+            self.seed_user_results
+        )
+
+    def test_quizzes_user_rating(self):
+        self.assertQueryBudget(
+            "quizzes-user-rating",
+            lambda: self.client.get("/api/v1/quizzes/user-rating/", {"user_id": self.user.id}),
+            self.seed_user_results
+        )
+
+    def test_quizzes_export_result(self):
+        self.assertQueryBudget(
+            "quizzes-export-result",
+            lambda: self.client.get(
+                "/api/v1/quizzes/export-result/",
+                {"result_id": QuizResult.objects.filter(user=self.user).latest("id").id, "file_type": "csv"}
+            ),
+            self.seed_own_results
+        )
+
+    def test_quizzes_export_company_results(self):
+        self.assertQueryBudget(
+            "quizzes-export-company-results",
+            lambda: self.client.get(
+                "/api/v1/quizzes/export-company-results/", {"company_id": self.company.id, "file_type": "csv"}
+            ),
+            self.seed_quiz_results
+        )
+
+    def test_quizzes_users_dynamic_scores(self):
+        self.assertQueryBudget(
+            "quizzes-users-dynamic-scores",
+            lambda: self.client.get("/api/v1/quizzes/users-dynamic-scores/", {"company_id": self.company.id}),
+            self.seed_company_results
+        )
+
+    def test_quizzes_current_user_dynamic_scores(self):
+        self.assertQueryBudget(
+            "quizzes-current-user-dynamic-scores",
+            lambda: self.client.get("/api/v1/quizzes/current-user-dynamic-scores/"),
+            self.seed_user_results
+        )
+
+    def test_quizzes_user_last_completions(self):
+        self.assertQueryBudget(
+            "quizzes-user-last-completions",
+            lambda: self.client.get("/api/v1/quizzes/user-last-completions/"),
+            self.seed_user_results
+        )
+
+    def test_quizzes_failed_results(self):
+        self.assertQueryBudget(
+            "quizzes-failed-results",
+            lambda: self.client.get(f"/api/v1/quizzes/{self.quiz.id}/failed-results/"),
+            self.seed_quiz_results
+        )
+
+    def test_quizzes_top_results(self):
+        self.assertQueryBudget(
+            "quizzes-top-results",
+            lambda: self.client.get(f"/api/v1/quizzes/{self.quiz.id}/top-results/"),
+            self.seed_quiz_results
+        )
+
+    def test_quizzes_question_stats(self):
+        self.assertQueryBudget(
+            "quizzes-question-stats",
+            lambda: self.client.get(f"/api/v1/quizzes/{self.quiz.id}/question-stats/"),
+            self.seed_question_stats
+        )
+
+
+class SQLTelemetryTestCase(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="testuser", password="1Q_az_2wsx_3edc", email="testuser@example.com"
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_normalize_sql_collapses_literals_and_in_lists(self):
+        self.assertEqual(
+            normalize_sql("SELECT *  FROM t WHERE id IN (%s, %s, %s) AND name = 'x' AND n = 5"),
+            "SELECT * FROM t WHERE id IN (%s, ...) AND name = %s AND n = %s"
+        )
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t WHERE id IN (%s, %s)"),
+            normalize_sql("SELECT * FROM t WHERE id IN (%s,%s,%s)")
+        )
+
+    @override_settings(SQL_TELEMETRY_REPEAT_THRESHOLD=3)
+    def test_repeated_statements_are_reported(self):
+        telemetry = QueryTelemetry()
+
+        with telemetry.capture():
+            for user_id in range(3):
+                User.objects.filter(id=user_id).exists()
+
+        with self.assertLogs("sql-telemetry", level="WARNING"):
+            record = telemetry.report(kind="test")
+
+        self.assertEqual(record["queries"], 3)
+        self.assertEqual(record["repeated"][0]["count"], 3)
+
+    def test_quiet_requests_are_not_reported(self):
+        telemetry = QueryTelemetry()
+
+        with telemetry.capture():
+            User.objects.filter(id=self.user.id).exists()
+
+        self.assertEqual(telemetry.queries, 1)
+        self.assertIsNone(telemetry.report(kind="test"))
+
+    @override_settings(SQL_TELEMETRY_SAMPLE_RATE=0.0)
+    def test_unsampled_requests_have_no_server_timing(self):
+        response = self.client.get("/api/v1/notifications/")
+
+        self.assertNotIn("Server-Timing", response)
+
+    @override_settings(SQL_TELEMETRY_SAMPLE_RATE=1.0, SQL_TELEMETRY_MAX_QUERIES=1)
+    def test_sampled_requests_add_server_timing_and_log(self):
+        with self.assertLogs("sql-telemetry", level="WARNING") as logs:
+            response = self.client.get("/api/v1/notifications/")
+
+        self.assertIn('db;dur=', response["Server-Timing"])
+        self.assertIn('"view": "notification-list"', logs.output[0])
+
+    @override_settings(SQL_TELEMETRY_SAMPLE_RATE=1.0, SQL_TELEMETRY_MAX_QUERIES=1)
+    def test_task_hooks_report_task_queries(self):
+        start_task_telemetry(task_id="task-id")
+        User.objects.filter(id=self.user.id).exists()
+
+        with self.assertLogs("sql-telemetry", level="WARNING") as logs:
+            finish_task_telemetry(task_id="task-id", state="SUCCESS")
+
+        self.assertIn('"task_id": "task-id"', logs.output[0])
+
+
+def profiled_inner():
+    return sum(number * number for number in range(20000))
+
+
+def profiled_outer():
+    return profiled_inner()
+
+
+@override_settings(PROFILER_ENABLED=True, PROFILER_USER_LIMIT=2)
+class ProfilerTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.staff = User.objects.create_user(
+            username="staff", password="1Q_az_2wsx_3edc", email="staff@example.com", is_staff=True
+        )
+        self.user = User.objects.create_user(
+            username="testuser", password="1Q_az_2wsx_3edc", email="testuser@example.com"
+        )
+        self.client.force_authenticate(user=self.staff)
+
+    def test_collapsed_stacks_follow_call_paths(self):
+        profiler = cProfile.Profile()
+        profiler.runcall(profiled_outer)
+
+        stacks = collapsed_stacks(pstats.Stats(profiler))
+
+        self.assertRegex(stacks, r"profiled_outer \(tests.py:\d+\);profiled_inner \(tests.py:\d+\).* \d+")
+
+    def test_staff_request_is_profiled_and_downloadable(self):
+        response = self.client.get("/api/v1/quizzes/user-last-completions/", HTTP_X_PROFILE="1")
+        profile_id = response["X-Profile-Id"]
+
+        download = self.client.get(f"/api/v1/profiles/{profile_id}/")
+
+        self.assertEqual(download.status_code, 200)
+        self.assertIn("user_last_completions", download.content.decode())
+
+    def test_query_flag_enables_profiling(self):
+        response = self.client.get("/api/v1/quizzes/user-last-completions/", {"profile": "1"})
+
+        self.assertIn("X-Profile-Id", response)
+
+    def test_non_staff_requests_are_not_profiled(self):
+        self.client.force_authenticate(user=self.user)
+
+        response = self.client.get("/api/v1/quizzes/user-last-completions/", HTTP_X_PROFILE="1")
+        download = self.client.get("/api/v1/profiles/missing/")
+
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertEqual(download.status_code, 403)
+
+    def test_unlisted_actions_are_not_profiled(self):
+        response = self.client.get("/api/v1/quizzes/", HTTP_X_PROFILE="1")
+
+        self.assertNotIn("X-Profile-Id", response)
+
+    def test_profiles_are_rate_limited(self):
+        responses = [
+            self.client.get("/api/v1/quizzes/user-last-completions/", HTTP_X_PROFILE="1") for _ in range(3)
+        ]
+
+        self.assertEqual(["X-Profile-Id" in response for response in responses], [True, True, False])
+
+
+class MetricsTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username="testuser", password="1Q_az_2wsx_3edc", email="testuser@example.com"
+        )
+        self.company = Company.objects.create(name="Company", description="description", owner=self.user)
+
+    def sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, labels) or 0
+
+    def test_request_latency_and_queries_are_observed(self):
+        self.client.force_authenticate(user=self.user)
+        before = self.sample("http_request_db_queries_count", view="notification-list")
+
+        self.client.get("/api/v1/notifications/")
+
+        self.assertEqual(self.sample("http_request_db_queries_count", view="notification-list"), before + 1)
+        self.assertGreater(
+            self.sample("http_request_duration_seconds_count", method="GET", view="notification-list", status="200"), 0
+        )
+
+    def test_cache_lookups_are_counted(self):
+        hits = self.sample("cache_lookups_total", cache="company_info", result="hit")
+        misses = self.sample("cache_lookups_total", cache="company_info", result="miss")
+
+        get_company_info(self.company.id)
+        get_company_info(self.company.id)
+
+        self.assertEqual(self.sample("cache_lookups_total", cache="company_info", result="miss"), misses + 1)
+        self.assertEqual(self.sample("cache_lookups_total", cache="company_info", result="hit"), hits + 1)
+
+    def test_celery_task_duration_and_failures_are_recorded(self):
+        request = type("Request", (), {})()
+        task = type("Task", (), {"name": "apps.quizzes.tasks.send_quiz_reminders", "request": request})()
+        runs = self.sample("celery_task_duration_seconds_count", task=task.name, state="FAILURE")
+        failures = self.sample("celery_task_failures_total", task=task.name, exception="RuntimeError")
+
+        start_task_timer(task_id="task-id", task=task)
+        count_task_failure(sender=task, exception=RuntimeError())
+        observe_task_duration(task_id="task-id", task=task, state="FAILURE")
+
+        self.assertEqual(self.sample("celery_task_duration_seconds_count", task=task.name, state="FAILURE"), runs + 1)
+        self.assertEqual(
+            self.sample("celery_task_failures_total", task=task.name, exception="RuntimeError"), failures + 1
+        )
+        self.assertIsNone(request.task_timer)
+
+
+class TaskStatsTestCase(TestCase):
+    @override_settings(CELERY_TELEMETRY_ENABLED=True)
+    def test_published_at_is_stamped_on_publish(self):
+        headers = {}
+
+        stamp_published_at(headers=headers)
+
+        self.assertAlmostEqual(headers["published_at"], time.time(), delta=5)
+
+    @override_settings(CELERY_TELEMETRY_ENABLED=False)
+    def test_published_at_is_not_stamped_when_disabled(self):
+        headers = {}
+
+        stamp_published_at(headers=headers)
+
+        self.assertEqual(headers, {})
+
+    def test_task_sample_measures_lag_runtime_and_retries(self):
+        request = type("Request", (), {"published_at": 100.0, "retries": 2})()
+        task = type("Task", (), {"request": request})()
+
+        sample = build_task_sample(task, "task-id", "SUCCESS", started_at=100.25, runtime=0.5)
+
+        self.assertEqual(sample["lag_ms"], 250.0)
+        self.assertEqual(sample["runtime_ms"], 500.0)
+        self.assertEqual(sample["retries"], 2)
+        self.assertEqual(sample["finished_at"], 100.75)
+
+    def test_summary_reports_percentiles(self):
+        samples = [
+            {"state": "SUCCESS", "lag_ms": float(value), "runtime_ms": float(value * 10), "retries": 0}
+            for value in range(1, 101)
+        ]
+        samples[0].update(state="FAILURE", retries=1, lag_ms=None, profile_id="profile")
+
+        summary = summarize_samples(samples)
+
+        self.assertEqual(summary["count"], 100)
+        self.assertEqual(summary["failures"], 1)
+        self.assertEqual(summary["retries"], 1)
+        self.assertEqual(summary["runtime_ms"], {"p50": 505.0, "p95": 950.5, "p99": 990.1})
+        self.assertEqual(summary["lag_ms"]["p50"], 51.0)
+        self.assertEqual(summary["profiles"], ["profile"])
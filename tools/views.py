@@ -0,0 +1,23 @@
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .profiling import get_profile
+
+
+class ProfileDownloadView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, profile_id):
+        profile = get_profile(profile_id)
+
+        if profile is None:
+            return Response({"detail": "Profile not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        return HttpResponse(
+            profile['stacks'],
+            content_type='text/plain',
+            headers={'Content-Disposition': f'attachment; filename="{profile_id}.folded"'}
+        )